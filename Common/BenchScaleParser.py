@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""Throughput benchmark for Common.ScaleParser.FramedLineParser.
+
+Feeds recorded Scout output through the parser in port-sized chunks and
+compares it with the old string buffer + split("\r\n", 1) loop.
+
+    python Common/BenchScaleParser.py                       # generated Scout stream
+    python Common/BenchScaleParser.py --file scout_raw.bin  # a raw capture from the port
+    python Common/BenchScaleParser.py --record scout_raw.bin --seconds 30 --port COM5
+
+Without --file a stream in the Scout continuous format is generated: a load
+settling on a weight, about 1% malformed lines, and the odd unstable '?' mark.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+from Common.ScaleParser import FramedLineParser
+
+
+def GenerateScoutStream(lines: int, seed: int = 1) -> bytes:
+    rnd = random.Random(seed)
+    out = []
+    target = 0.0
+    weight = 0.0
+    for i in range(lines):
+        if i % 200 == 0:
+            target = round(rnd.uniform(50, 2000), 1)
+        weight += (target - weight) * 0.3
+        shown = weight + rnd.gauss(0, 0.2)
+        if rnd.random() < 0.01:
+            out.append(b"  ---- \r\n")
+        elif abs(shown - target) > 1:
+            out.append(f"{shown:10.1f} g  ?\r\n".encode())
+        else:
+            out.append(f"{shown:10.1f} g\r\n".encode())
+    return b"".join(out)
+
+
+def RecordScout(path: str, port: str, seconds: float):
+    import serial
+    with serial.Serial(port=port, baudrate=9600, timeout=0.2) as s, open(path, "wb") as f:
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            f.write(s.read(s.in_waiting or 1))
+    print(f"Recorded {os.path.getsize(path)} bytes to {path}")
+
+
+def Chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def RunParser(chunks):
+    parser = FramedLineParser()
+    last = None
+    for chunk in chunks:
+        reading = parser.feed(chunk)
+        if reading is not None:
+            last = reading[0]
+    return last, parser.dropped
+
+
+def RunLegacy(chunks):
+    # the previous GetScoutWeight loop, with the float() guarded so bad lines don't stop it
+    buffer = ""
+    last = None
+    for chunk in chunks:
+        buffer += chunk.decode(errors="ignore")
+        while "\r\n" in buffer:
+            line, buffer = buffer.split("\r\n", 1)
+            line = line.strip()
+            if not line:
+                continue
+            parts = line.split()
+            try:
+                last = float(parts[0])
+            except (ValueError, IndexError):
+                pass
+    return last, None
+
+
+def Bench(name, func, chunks, total_bytes, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(chunks)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    mb_s = total_bytes / best / 1e6
+    print(f"{name:8s} {best * 1000:9.2f} ms  {mb_s:8.2f} MB/s  last={result[0]}  dropped={result[1]}")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--file", help="raw Scout capture to replay")
+    p.add_argument("--lines", type=int, default=200000, help="lines to generate when no --file")
+    p.add_argument("--chunk", type=int, nargs="+", default=[16, 256, 4096],
+                   help="bytes per read (what in_waiting would return)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--record", metavar="PATH", help="capture raw bytes from --port to PATH and exit")
+    p.add_argument("--port")
+    p.add_argument("--seconds", type=float, default=30)
+    args = p.parse_args()
+
+    if args.record:
+        RecordScout(args.record, args.port, args.seconds)
+        return
+
+    if args.file:
+        with open(args.file, "rb") as f:
+            data = f.read()
+    else:
+        data = GenerateScoutStream(args.lines)
+    lines = data.count(b"\r\n")
+    print(f"{len(data)} bytes, {lines} lines")
+
+    for size in args.chunk:
+        chunks = Chunks(data, size)
+        print(f"-- {size} byte reads")
+        Bench("parser", RunParser, chunks, len(data), args.repeat)
+        Bench("legacy", RunLegacy, chunks, len(data), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/python3
+"""Time how long each screen takes to reach its first frame.
+
+Every screen is started in its own process with --test (no QR scanner) and
+simulated scales (SCALE_SIM, default Ranger,Scout), and stopped as soon as its
+window has drawn once. Two times are reported, both from process start:
+
+    ready - the screen's Tk window exists (imports and module setup are done)
+    frame - the first frame has been drawn
+
+    python Common/BenchStartup.py                          # every screen
+    python Common/BenchStartup.py --compare HEAD~1         # and the same screens at HEAD~1
+    python Common/BenchStartup.py --screens Harvest/WeighHarvest.py --repeat 5
+
+--compare unpacks that commit into a temporary folder (copying the local
+Common/config.json across) and runs the same screens there. Screens that load
+data in __init__ still talk to Supabase, so run both sides on the same network,
+or use --fake MS to run them against Common/FakeSupa.py with MS of latency per
+request (a tree from before FakeSupa ignores it and talks to Supabase).
+Message boxes are answered Cancel so a missing device can't stall the run.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+
+SCREENS = [
+    "Harvest/AssignBatchId.py",
+    "Harvest/PlantWeightsSummary.py",
+    "Harvest/PrintPlantTags.py",
+    "Harvest/WeighBucked.py",
+    "Harvest/WeighHarvest.py",
+    "Trimmers/EditDailyTrim.py",
+    "Trimmers/EditTrimRates.py",
+    "Trimmers/EditTrimmerList.py",
+    "Trimmers/EnterDailyTrim.py",
+    "Trimmers/TrimmerDailyWeigh.py",
+    "Trimmers/TrimmerSummary.py",
+    "Trimmers/WeighTrim.py",
+    "Packaging/AddPackage.py",
+    "Packaging/EditPackageTypes.py",
+    "Processing/EnterHashRun.py",
+    "Processing/EnterRosinRun.py",
+    "SopScripts/EditSopIndex.py",
+    "SopScripts/SopView.py",
+]
+
+
+#################################################################################################
+#
+# Child: run one screen until its first frame (uses nothing from the tree under test)
+#
+#################################################################################################
+
+def RunChild(screen: str):
+    import runpy
+    import tkinter
+    from tkinter import messagebox
+
+    marks = {}
+
+    def report(code=0):
+        print("BENCH " + json.dumps(marks), flush=True)
+        os._exit(code)
+
+    original_init = tkinter.Tk.__init__
+
+    def tk_init(self, *args, **kwargs):
+        marks.setdefault("ready", time.time())
+        original_init(self, *args, **kwargs)
+
+    def mainloop(self, n=0):
+        self.update()
+        marks["frame"] = time.time()
+        report()
+
+    tkinter.Tk.__init__ = tk_init
+    tkinter.Tk.mainloop = mainloop
+    for name in ("showinfo", "showwarning", "showerror"):
+        setattr(messagebox, name, lambda *a, **k: "ok")
+    for name in ("askretrycancel", "askyesno", "askokcancel"):
+        setattr(messagebox, name, lambda *a, **k: False)
+
+    path = os.path.abspath(screen)
+    sys.argv = [path, "--test"]
+    sys.path[0] = os.path.dirname(path)
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit:
+        pass
+    marks["error"] = "screen exited before drawing a frame"
+    report(1)
+
+
+#################################################################################################
+#
+# Parent
+#
+#################################################################################################
+
+def TimeScreen(tree: str, screen: str, timeout: float):
+    env = dict(os.environ)
+    env.setdefault("SCALE_SIM", "Ranger,Scout")
+    start = time.time()
+    try:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", screen],
+                              cwd=tree, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return None, f"no frame after {timeout:.0f} s"
+    for line in proc.stdout.splitlines():
+        if line.startswith("BENCH "):
+            marks = json.loads(line[6:])
+            if "error" in marks:
+                return None, marks["error"]
+            return {k: marks[k] - start for k in ("ready", "frame") if k in marks}, None
+    tail = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+    return None, tail
+
+
+def BenchTree(tree: str, screens, repeat: int, timeout: float):
+    results = {}
+    for screen in screens:
+        if not os.path.exists(os.path.join(tree, screen)):
+            results[screen] = (None, "not in this tree")
+            continue
+        runs = []
+        error = None
+        for _ in range(repeat):
+            times, error = TimeScreen(tree, screen, timeout)
+            if times is None:
+                break
+            runs.append(times)
+        if error:
+            results[screen] = (None, error)
+        else:
+            results[screen] = ({k: statistics.median(r[k] for r in runs if k in r)
+                                for k in ("ready", "frame")}, None)
+    return results
+
+
+def Unpack(rev: str) -> str:
+    folder = tempfile.mkdtemp(prefix="scale-bench-")
+    archive = subprocess.run(["git", "archive", rev], cwd=ROOT_DIR, capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", folder], input=archive.stdout, check=True)
+    config = os.path.join(ROOT_DIR, "Common", "config.json")
+    if os.path.exists(config):
+        shutil.copy(config, os.path.join(folder, "Common", "config.json"))
+    return folder
+
+
+def Ms(times, key):
+    return f"{times[key] * 1000:8.0f}" if times and key in times else f"{'-':>8s}"
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--screens", nargs="+", default=SCREENS, help="screen scripts relative to the scale folder")
+    p.add_argument("--repeat", type=int, default=3, help="runs per screen; the median is shown")
+    p.add_argument("--compare", metavar="REV", help="also time the screens at this git revision")
+    p.add_argument("--timeout", type=float, default=60)
+    p.add_argument("--fake", type=float, metavar="MS", help="use the in-memory backend with MS latency per request")
+    p.add_argument("--child", help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.child:
+        RunChild(args.child)
+        return
+
+    if args.fake is not None:
+        # inherited by every screen process
+        os.environ["SCALE_BACKEND"] = "fake"
+        os.environ["SCALE_FAKE_LATENCY"] = str(args.fake)
+
+    current = BenchTree(ROOT_DIR, args.screens, args.repeat, args.timeout)
+    baseline = {}
+    if args.compare:
+        folder = Unpack(args.compare)
+        try:
+            baseline = BenchTree(folder, args.screens, args.repeat, args.timeout)
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    header = f"{'screen':34s} {'ready ms':>8s} {'frame ms':>8s}"
+    if args.compare:
+        header += f"  {args.compare + ' frame':>14s} {'speedup':>8s}"
+    print(header)
+    for screen in args.screens:
+        times, error = current[screen]
+        line = f"{screen:34s} {Ms(times, 'ready')} {Ms(times, 'frame')}"
+        if args.compare:
+            base, base_error = baseline[screen]
+            line += f"  {Ms(base, 'frame'):>14s}"
+            if times and base:
+                line += f" {base['frame'] / times['frame']:7.2f}x"
+            if base_error and not error:
+                error = f"{args.compare}: {base_error}"
+        if error:
+            line += f"  ({error})"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
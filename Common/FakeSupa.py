@@ -0,0 +1,695 @@
+#!/usr/bin/python3
+"""In-memory stand-in for the Supabase "scale" schema.
+
+With it every screen, Common.ScaleData function and benchmark runs on a box
+that can't reach (or mustn't touch) the live project. Common.SupaClient uses
+it in place of create_client() when the backend is "fake":
+
+    SCALE_BACKEND=fake python Harvest/WeighHarvest.py
+
+or "backend": "fake" in Common/config.json. The other settings, each an
+environment variable or the config key after it:
+
+    SCALE_FAKE_LATENCY=40       fake_latency_ms     ms added to every request (default 0)
+    SCALE_FAKE_JITTER=20        fake_jitter_ms      up to this many ms more, at random (default 0)
+    SCALE_FAKE_SEED=data.json   fake_seed           {table: [rows]} to start from, instead of Seed()
+
+It keeps the part of the PostgREST query builder that ScaleData uses:
+select (with count="exact"), eq, neq, gt, gte, lt, lte, ilike, in_, match,
+or_ (including the and() groups Pages() sends), order, limit, insert, update,
+delete, and rpc() for the functions in Common/sql. A write to dailytrim
+updates dailytrim_rollup, as the trigger in Common/sql/dailytrim_rollup.sql
+does. Rows travel as JSON, as they would over HTTP, so dates come back as
+ISO strings.
+
+The data lives only as long as the process; each screen starts from the seed.
+"""
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(CURRENT_DIR, "config.json")
+
+# per table: generated key column, column defaults, columns that must be unique together
+TABLES = {
+    "scalecrops":    {"unique": ("CropNo",)},
+    "scaleplants":   {"unique": ("PlantNo",)},
+    "scalelog":      {},
+    "scalebuck":     {},
+    "metrictags":    {"unique": ("TagNo",)},
+    "batchtable":    {},
+    "scaletrimmers": {"serial": "id"},
+    "dailytrim":     {"unique": ("TrimmerName", "TrimDate", "CropNo", "Strain", "AmPm")},
+    "dailytrim_rollup": {"unique": ("TrimDate", "TrimmerName", "CropNo", "Strain")},
+    "trimrates":     {"unique": ("CropNo", "Strain")},
+    "scaletrim":     {"serial": "TagNo"},
+    "packagetypes":  {"serial": "id"},
+    "packages":      {},
+    "hashbatch":     {"defaults": {"BatchDate": "now"}, "unique": ("BatchId",)},
+    "hashruns":      {"unique": ("BatchId", "RunNo")},
+    "rosinbatch":    {"defaults": {"BatchDate": "now"}, "unique": ("BatchId",)},
+    "rosinruns":     {"unique": ("BatchId", "RunNo")},
+    "sopindex":      {},
+    "seqcounters":   {"unique": ("Kind", "Scope")},
+}
+
+
+class FakeError(Exception):
+    """What PostgREST would have answered with an error (code is the Postgres SQLSTATE)."""
+
+    def __init__(self, message: str, code: str = "P0001"):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+class FakeResponse:
+    def __init__(self, data, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+def _Json(value):
+    """value as it would come back from PostgREST."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def _Setting(env: str, key: str, default):
+    value = os.environ.get(env)
+    if value is None:
+        try:
+            with open(CONFIG_PATH, "r") as f:
+                value = json.load(f).get(key)
+        except (OSError, ValueError):
+            value = None
+    return default if value is None else value
+
+
+#################################################################################################
+#
+# Filters
+#
+#################################################################################################
+
+def _Like(value, pattern: str) -> re.Pattern:
+    regex = "".join(".*" if c in "%*" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.compile(f"^{regex}$", re.IGNORECASE | re.DOTALL)
+
+
+def _Coerce(value, arg):
+    """arg converted to the type of the column value it is compared with."""
+    if isinstance(value, bool):
+        return str(arg).lower() in ("true", "t", "1") if isinstance(arg, str) else bool(arg)
+    if isinstance(value, (int, float)) and isinstance(arg, str):
+        try:
+            return float(arg)
+        except ValueError:
+            return arg
+    if isinstance(value, str) and not isinstance(arg, str):
+        return str(arg)
+    return arg
+
+
+def _Test(row: dict, column: str, op: str, arg) -> bool:
+    value = row.get(column)
+    if op == "is":
+        return value is None if str(arg).lower() == "null" else value == _Coerce(value, arg)
+    if op == "in":
+        return value in [_Coerce(value, a) for a in arg]
+    if value is None or arg is None:
+        return False
+    if op in ("like", "ilike"):
+        return bool(_Like(value, str(arg)).match(str(value)))
+    arg = _Coerce(value, arg)
+    try:
+        return {
+            "eq": value == arg, "neq": value != arg,
+            "gt": value > arg, "gte": value >= arg,
+            "lt": value < arg, "lte": value <= arg,
+        }[op]
+    except TypeError:
+        return False
+    except KeyError:
+        raise FakeError(f"operator {op} is not supported by FakeSupa", "PGRST100")
+
+
+def _Split(text: str) -> List[str]:
+    """Split on commas outside parentheses and quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c == "\\" and quoted and i + 1 < len(text):
+            current += c + text[i + 1]
+            i += 2
+            continue
+        if c == '"':
+            quoted = not quoted
+        elif not quoted and c == "(":
+            depth += 1
+        elif not quoted and c == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and c == ",":
+            parts.append(current)
+            current = ""
+            i += 1
+            continue
+        current += c
+        i += 1
+    parts.append(current)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _Unquote(text: str) -> str:
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", text[1:-1])
+    return text
+
+
+def _Logic(text: str):
+    """A predicate for one or=() / and() term such as 'TagNo.gt."A1"' or 'and(a.eq.1,b.lt.2)'."""
+    for word, combine in (("and(", all), ("or(", any)):
+        if text.startswith(word) and text.endswith(")"):
+            terms = [_Logic(t) for t in _Split(text[len(word):-1])]
+            return lambda row: combine(t(row) for t in terms)
+    column, op, arg = text.split(".", 2)
+    if op == "not":
+        op, arg = arg.split(".", 1)
+        arg = _Unquote(arg)
+        return lambda row: not _Test(row, column, op, arg)
+    arg = _Unquote(arg)
+    return lambda row: _Test(row, column, op, arg)
+
+
+#################################################################################################
+#
+# Query builder
+#
+#################################################################################################
+
+class FakeQuery:
+    """One request, built up the way postgrest-py builds it."""
+
+    def __init__(self, db: "FakeDatabase", table: str):
+        self.db = db
+        self.table = table
+        self.http_method = "GET"
+        self.columns = "*"
+        self.count = None
+        self.json = None
+        self.filters = []       # predicates on a row
+        self.described = []     # the same, as PostgREST query-string terms
+        self.orders = []        # (column, desc)
+        self.limit_n = None
+
+    @property
+    def params(self) -> str:
+        terms = [f"select={self.columns}"] if self.http_method == "GET" else []
+        terms += self.described
+        if self.orders:
+            terms.append("order=" + ",".join(f"{c}.{'desc' if d else 'asc'}" for c, d in self.orders))
+        if self.limit_n is not None:
+            terms.append(f"limit={self.limit_n}")
+        return "&".join(terms)
+
+    # statements
+
+    def select(self, *columns, count: Optional[str] = None):
+        self.columns = ",".join(c.strip() for col in columns for c in col.split(",")) or "*"
+        self.count = count
+        return self
+
+    def insert(self, rows, returning: str = "representation", **kwargs):
+        self.http_method = "POST"
+        self.json = rows
+        return self
+
+    def update(self, values: dict, returning: str = "representation", **kwargs):
+        self.http_method = "PATCH"
+        self.json = values
+        return self
+
+    def delete(self, returning: str = "representation", **kwargs):
+        self.http_method = "DELETE"
+        return self
+
+    # filters
+
+    def _Filter(self, column: str, op: str, arg):
+        self.filters.append(lambda row: _Test(row, column, op, arg))
+        self.described.append(f"{column}={op}.{arg}")
+        return self
+
+    def eq(self, column, value):
+        return self._Filter(column, "eq", _Json(value))
+
+    def neq(self, column, value):
+        return self._Filter(column, "neq", _Json(value))
+
+    def gt(self, column, value):
+        return self._Filter(column, "gt", _Json(value))
+
+    def gte(self, column, value):
+        return self._Filter(column, "gte", _Json(value))
+
+    def lt(self, column, value):
+        return self._Filter(column, "lt", _Json(value))
+
+    def lte(self, column, value):
+        return self._Filter(column, "lte", _Json(value))
+
+    def like(self, column, pattern):
+        return self._Filter(column, "like", pattern)
+
+    def ilike(self, column, pattern):
+        return self._Filter(column, "ilike", pattern)
+
+    def is_(self, column, value):
+        return self._Filter(column, "is", "null" if value is None else value)
+
+    def in_(self, column, values):
+        return self._Filter(column, "in", _Json(list(values)))
+
+    def match(self, query: dict):
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def or_(self, filters: str, reference_table: Optional[str] = None):
+        terms = [_Logic(t) for t in _Split(filters)]
+        self.filters.append(lambda row: any(t(row) for t in terms))
+        self.described.append(f"or=({filters})")
+        return self
+
+    # modifiers
+
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None, **kwargs):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs):
+        self.limit_n = size
+        return self
+
+    def execute(self) -> FakeResponse:
+        self.db.Wait()
+        with self.db.lock:
+            if self.http_method == "GET":
+                return self.db.Select(self)
+            if self.http_method == "POST":
+                return FakeResponse(self.db.Insert(self.table, self.json))
+            rows = self.db.Matching(self.table, self.filters)
+            if self.http_method == "PATCH":
+                return FakeResponse(self.db.Update(self.table, rows, self.json))
+            return FakeResponse(self.db.Delete(self.table, rows))
+
+
+class FakeRpc:
+    """sb.rpc(name, params); the function runs at execute()."""
+
+    http_method = "POST"
+
+    def __init__(self, db: "FakeDatabase", name: str, params: dict):
+        self.db = db
+        self.name = name
+        self.json = params
+        self.params = ""
+
+    def execute(self) -> FakeResponse:
+        self.db.Wait()
+        fn = RPCS.get(self.name)
+        if fn is None:
+            raise FakeError(f"function scale.{self.name} does not exist", "PGRST202")
+        with self.db.lock:
+            return FakeResponse(_Json(fn(self.db, **_Json(self.json or {}))))
+
+
+#################################################################################################
+#
+# Tables
+#
+#################################################################################################
+
+def _TrimGroups(rows: List[dict]) -> Dict[tuple, dict]:
+    """dailytrim rows grouped as the dailytrim_rollup_live view in Common/sql/dailytrim_rollup.sql does."""
+    groups = {}
+    for r in rows:
+        key = tuple(r.get(c) for c in TABLES["dailytrim_rollup"]["unique"])
+        g = groups.setdefault(key, {"TrimDate": key[0], "TrimmerName": key[1], "CropNo": key[2],
+                                    "Strain": key[3], "FlowerGrams": 0.0, "SmallsGrams": 0.0,
+                                    "StartTime": None, "EndTime": None, "Hours": 0.0, "Sessions": 0})
+        g["FlowerGrams"] += float(r.get("FlowerGrams") or 0)
+        g["SmallsGrams"] += float(r.get("SmallsGrams") or 0)
+        start, end = r.get("StartTime"), r.get("EndTime")
+        if start and (g["StartTime"] is None or start < g["StartTime"]):
+            g["StartTime"] = start
+        if end and (g["EndTime"] is None or end > g["EndTime"]):
+            g["EndTime"] = end
+        if start and end:
+            s, e = (datetime.strptime(t if len(t) > 5 else t + ":00", "%H:%M:%S") for t in (start, end))
+            g["Hours"] += round(max((e - s).total_seconds(), 0) / 3600.0, 2)
+        g["Sessions"] += 1
+    return groups
+
+
+def _Sorted(rows: List[dict], orders) -> List[dict]:
+    # stable sorts, last key first; nulls last ascending and first descending, as in Postgres
+    for column, desc in reversed(orders):
+        present = [r for r in rows if r.get(column) is not None]
+        nulls = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=desc)
+        rows = nulls + present if desc else present + nulls
+    return rows
+
+
+class FakeDatabase:
+    """The tables, a lock around them, and the latency every request pays."""
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0):
+        self.tables: Dict[str, List[dict]] = {name: [] for name in TABLES}
+        self.serials: Dict[str, int] = {}
+        self.lock = threading.RLock()
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+
+    def Wait(self):
+        delay = self.latency + (random.random() * self.jitter if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def Rows(self, table: str) -> List[dict]:
+        if table == "cropstrains":
+            return self._CropStrains()
+        if table not in self.tables:
+            raise FakeError(f'relation "scale.{table}" does not exist', "42P01")
+        return self.tables[table]
+
+    def _CropStrains(self) -> List[dict]:
+        # the view in Common/sql/cropstrains.sql
+        counts = {}
+        for p in self.tables["scaleplants"]:
+            if p.get("Strain"):
+                key = (p.get("CropNo"), p["Strain"])
+                counts[key] = counts.get(key, 0) + 1
+        return [{"CropNo": c, "Strain": s, "Plants": n} for (c, s), n in counts.items()]
+
+    def AfterWrite(self, table: str, rows: List[dict]):
+        """The triggers in Common/sql: a dailytrim write recomputes the rollup groups of rows
+        (as they were and as they are)."""
+        if table != "dailytrim" or not rows:
+            return
+        key = TABLES["dailytrim_rollup"]["unique"]
+        touched = {tuple(r.get(c) for c in key) for r in rows}
+        fresh = _TrimGroups([r for r in self.tables["dailytrim"] if tuple(r.get(c) for c in key) in touched])
+        rollup = self.tables["dailytrim_rollup"]
+        rollup[:] = [g for g in rollup if tuple(g.get(c) for c in key) not in touched] + list(fresh.values())
+
+    def Matching(self, table: str, filters) -> List[dict]:
+        return [r for r in self.Rows(table) if all(f(r) for f in filters)]
+
+    def Select(self, query: FakeQuery) -> FakeResponse:
+        rows = _Sorted(self.Matching(query.table, query.filters), query.orders)
+        count = len(rows) if query.count else None
+        if query.limit_n is not None:
+            rows = rows[:query.limit_n]
+        if query.columns != "*":
+            columns = query.columns.split(",")
+            rows = [{c: r.get(c) for c in columns} for r in rows]
+        return FakeResponse(copy.deepcopy(rows), count)
+
+    def _Keys(self, table: str, rows: List[dict], skip=()) -> set:
+        unique = TABLES[table].get("unique")
+        if not unique:
+            return set()
+        return {tuple(r.get(c) for c in unique) for r in rows if id(r) not in skip}
+
+    def _Claim(self, table: str, keys: set, row: dict):
+        """Add row's unique key to keys, or fail as Postgres would if it is taken."""
+        unique = TABLES[table].get("unique")
+        if not unique:
+            return
+        key = tuple(row.get(c) for c in unique)
+        if key in keys:
+            raise FakeError(f"duplicate key value violates unique constraint on {table} {unique}", "23505")
+        keys.add(key)
+
+    def Insert(self, table: str, rows) -> List[dict]:
+        spec = TABLES.get(table)
+        if spec is None:
+            raise FakeError(f'relation "scale.{table}" does not exist', "42P01")
+        added = []
+        keys = self._Keys(table, self.tables[table])
+        for row in _Json(rows if isinstance(rows, list) else [rows]):
+            serial = spec.get("serial")
+            if serial and row.get(serial) is None:
+                self.serials[table] = self.serials.get(table, 0) + 1
+                row[serial] = self.serials[table]
+            for column, default in spec.get("defaults", {}).items():
+                if row.get(column) is None:
+                    row[column] = datetime.now().isoformat() if default == "now" else default
+            self._Claim(table, keys, row)
+            added.append(row)
+        self.tables[table].extend(added)
+        self.AfterWrite(table, added)
+        return copy.deepcopy(added)
+
+    def Update(self, table: str, rows: List[dict], values: dict) -> List[dict]:
+        values = _Json(values)
+        keys = self._Keys(table, self.tables[table], skip={id(r) for r in rows})
+        for row in rows:
+            self._Claim(table, keys, dict(row, **values))
+        before = [dict(row) for row in rows]
+        for row in rows:
+            row.update(values)
+        self.AfterWrite(table, before + rows)
+        return copy.deepcopy(rows)
+
+    def Delete(self, table: str, rows: List[dict]) -> List[dict]:
+        doomed = {id(r) for r in rows}
+        self.tables[table][:] = [r for r in self.tables[table] if id(r) not in doomed]
+        self.AfterWrite(table, rows)
+        return copy.deepcopy(rows)
+
+    def Load(self, data: Dict[str, List[dict]]):
+        """Add {table: [rows]} (a seed file, or Seed()'s output)."""
+        with self.lock:
+            for table, rows in data.items():
+                if table != "dailytrim_rollup":     # kept from dailytrim
+                    self.Insert(table, rows)
+            for table, spec in TABLES.items():
+                serial = spec.get("serial")
+                if serial:
+                    used = [r.get(serial) for r in self.tables[table] if isinstance(r.get(serial), int)]
+                    self.serials[table] = max(used, default=0)
+
+
+#################################################################################################
+#
+# Functions (Common/sql)
+#
+#################################################################################################
+
+def _NextNumber(db, p_kind, p_scope, p_count=1):
+    counters = db.tables["seqcounters"]
+    counter = next((c for c in counters if c["Kind"] == p_kind and c["Scope"] == p_scope), None)
+    if counter is None:
+        def highest(table, column, scope_of):
+            numbers = [int(r[column]) for r in db.tables[table]
+                       if scope_of(r) == p_scope and str(r.get(column) or "").isdigit()]
+            return max(numbers, default=0)
+        start = {
+            "tote": lambda: highest("scalebuck", "ToteNo", lambda r: f"{r.get('CropNo')}/{r.get('Strain')}"),
+            "case": lambda: highest("packages", "CaseNo",
+                                    lambda r: f"{r.get('CropNo')}/{r.get('Strain')}/{r.get('PackageType')}"),
+            "hashrun": lambda: highest("hashruns", "RunNo", lambda r: r.get("BatchId")),
+            "rosinrun": lambda: highest("rosinruns", "RunNo", lambda r: r.get("BatchId")),
+        }.get(p_kind, lambda: 0)()
+        counter = {"Kind": p_kind, "Scope": p_scope, "LastNo": start}
+        counters.append(counter)
+    counter["LastNo"] += p_count
+    return counter["LastNo"] - p_count + 1
+
+
+def _NewRun(table, kind):
+    def run(db, p_batch):
+        row = {"BatchId": p_batch, "RunNo": _NextNumber(db, kind, p_batch), "StartWeight": 0, "EndWeight": 0}
+        return db.Insert(table, row)
+    return run
+
+
+def _WeighPlant(db, p_plant_no, p_plant_type, p_weight, p_scale_date, p_overwrite=False):
+    dry = p_plant_type.lower() == "dry"
+    plant = next((p for p in db.tables["scaleplants"] if str(p.get("PlantNo")) == p_plant_no), None)
+    if plant is None:
+        return {"status": "missing", "strain": None, "previous": None}
+    strain = plant.get("Strain")
+    previous = plant.get("DryWeight" if dry else "WetWeight")
+    if any(str(r.get("PlantNo")) == p_plant_no and r.get("ScaleDate") == p_scale_date
+           for r in db.tables["scalelog"]):
+        return {"status": "recorded", "strain": strain, "previous": previous}
+    if (previous or 0) > 0 and not p_overwrite:
+        return {"status": "exists", "strain": strain, "previous": previous}
+    if dry:
+        plant.update({"DryWeight": p_weight, "DryDate": p_scale_date})
+    else:
+        plant.update({"WetWeight": p_weight, "WetDate": p_scale_date})
+    db.Insert("scalelog", {"PlantNo": p_plant_no, "Strain": strain, "PlantType": p_plant_type.title(),
+                           "Weight": p_weight, "ScaleDate": p_scale_date})
+    return {"status": "recorded", "strain": strain, "previous": previous}
+
+
+def _UpsertDailyTrim(db, p_rows):
+    key = TABLES["dailytrim"]["unique"]
+    results = []
+    for i, row in enumerate(p_rows, start=1):
+        try:
+            if any(row.get(c) in (None, "") for c in key):
+                raise FakeError('null value in a dailytrim session column', "23502")
+            flower = float(row.get("FlowerGrams") or 0)
+            smalls = float(row.get("SmallsGrams") or 0)
+            match = [r for r in db.tables["dailytrim"] if all(r.get(c) == row.get(c) for c in key)]
+            if match:
+                session = match[0]
+                if flower:
+                    session["FlowerGrams"] = flower
+                if smalls:
+                    session["SmallsGrams"] = smalls
+                db.AfterWrite("dailytrim", [session])
+                status = "updated"
+            else:
+                session = dict(row, FlowerGrams=flower, SmallsGrams=smalls)
+                db.Insert("dailytrim", session)
+                session = db.tables["dailytrim"][-1]
+                status = "inserted"
+            results.append({"Row": i, "Status": status, "Flower": session["FlowerGrams"],
+                            "Smalls": session["SmallsGrams"], "Error": None})
+        except (FakeError, TypeError, ValueError) as e:
+            results.append({"Row": i, "Status": "error", "Flower": None, "Smalls": None, "Error": str(e)})
+    return results
+
+
+def _RebuildTrimRollup(db, p_from=None, p_to=None, p_fix=True):
+    def within(r):
+        day = (r.get("TrimDate") or "")[:10]
+        return (not p_from or day >= p_from) and (not p_to or day <= p_to)
+    key = TABLES["dailytrim_rollup"]["unique"]
+    stored = {tuple(g.get(c) for c in key): g for g in db.tables["dailytrim_rollup"] if within(g)}
+    live = _TrimGroups([r for r in db.tables["dailytrim"] if within(r)])
+    wrong = sum(1 for k in stored.keys() | live.keys() if stored.get(k) != live.get(k))
+    if p_fix and wrong:
+        rollup = db.tables["dailytrim_rollup"]
+        rollup[:] = [g for g in rollup if not within(g)] + list(live.values())
+    return wrong
+
+
+RPCS = {
+    "next_number": _NextNumber,
+    "new_hash_run": _NewRun("hashruns", "hashrun"),
+    "new_rosin_run": _NewRun("rosinruns", "rosinrun"),
+    "weigh_plant": _WeighPlant,
+    "upsert_dailytrim": _UpsertDailyTrim,
+    "rebuild_dailytrim_rollup": _RebuildTrimRollup,
+}
+
+
+#################################################################################################
+#
+# Seed data
+#
+#################################################################################################
+
+STRAINS = ["Blue Dream", "Cherry Pie", "Gelato", "GG4", "Lemon Haze", "OG Kush", "Runtz", "Zkittlez"]
+TRIMMERS = ["Alex", "Bailey", "Casey", "Devon", "Emery", "Frankie", "Jordan", "Morgan", "Quinn", "Riley"]
+
+
+def Seed(plants_per_strain: int = 60, days: int = 28, seed: int = 1) -> Dict[str, List[dict]]:
+    """A small farm: crop 18 dried and trimmed, 19 being harvested and trimmed, 20 growing."""
+    rnd = random.Random(seed)
+    today = date.today()
+    data = {name: [] for name in TABLES}
+    for crop_no, status, weeks in ((18, "Inactive", -10), (19, "Active", -4), (20, "Active", 8)):
+        data["scalecrops"].append({"CropNo": crop_no, "HarvestDate": (today + timedelta(weeks=weeks)).isoformat(),
+                                   "CropStat": status})
+        for s, strain in enumerate(STRAINS):
+            for n in range(plants_per_strain):
+                plant = {"PlantNo": crop_no * 100000 + s * 1000 + n + 1, "CropNo": crop_no, "Strain": strain,
+                         "WetWeight": None, "WetDate": None, "DryWeight": None, "DryDate": None}
+                if crop_no <= 19:
+                    plant["WetWeight"] = rnd.randint(600, 2200)
+                    plant["WetDate"] = (today + timedelta(weeks=weeks)).isoformat()
+                if crop_no == 18:
+                    plant["DryWeight"] = int(plant["WetWeight"] * rnd.uniform(0.18, 0.26))
+                    plant["DryDate"] = (today + timedelta(weeks=weeks + 2)).isoformat()
+                data["scaleplants"].append(plant)
+            if crop_no <= 19:
+                data["trimrates"].append({"CropNo": crop_no, "Strain": strain, "BigsRate": 0.36})
+                data["batchtable"].append({"CropNo": crop_no, "Strain": strain, "BatchType": "Flower",
+                                           "BatchId": f"{crop_no}{strain[:3].upper()}F"})
+    data["metrictags"] = [{"TagNo": f"1A40603000{n:014d}"} for n in range(1, 2001)]
+    data["scaletrimmers"] = [{"TrimmerName": t, "TrimmerStat": "Active"} for t in TRIMMERS]
+    data["scaletrimmers"].append({"TrimmerName": "Sam", "TrimmerStat": "Inactive"})
+    data["packagetypes"] = [{"PackageType": p, "UnitWeight": w}
+                            for p, w in (("Eighth", 3.5), ("Quarter", 7.0), ("Half", 14.0), ("Pound", 453.6))]
+    for d in range(days, 0, -1):
+        day = today - timedelta(days=d)
+        if day.weekday() == 6:
+            continue
+        for trimmer in TRIMMERS:
+            strain = STRAINS[(d + TRIMMERS.index(trimmer)) % len(STRAINS)]
+            for ampm, (start, end) in (("Morning", ("08:00", "12:00")), ("Afternoon", ("13:00", "17:00"))):
+                data["dailytrim"].append({
+                    "TrimmerName": trimmer, "TrimDate": day.isoformat(), "CropNo": 19, "Strain": strain,
+                    "AmPm": ampm, "FlowerGrams": round(rnd.uniform(300, 900), 1),
+                    "SmallsGrams": round(rnd.uniform(50, 250), 1), "StartTime": start, "EndTime": end,
+                    "BatchId": None,
+                })
+    data["hashbatch"] = [{"BatchId": "H19-01", "Type": "Hash", "Status": "In Process"}]
+    data["rosinbatch"] = [{"BatchId": "R19-01", "Type": "Rosin", "Status": "In Process"}]
+    data["sopindex"] = [{"Activity": "Harvest", "SeqNo": 1, "FileName": "WeighHarvest.md", "Descr": "Weigh plants"}]
+    return data
+
+
+#################################################################################################
+#
+# Client
+#
+#################################################################################################
+
+class FakeSchema:
+    def __init__(self, db: FakeDatabase):
+        self.db = db
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self.db, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[dict] = None, **kwargs) -> FakeRpc:
+        return FakeRpc(self.db, name, params or {})
+
+
+class FakeClient(FakeSchema):
+    """Answers what SupaClient asks of a supabase Client: schema(), table(), rpc()."""
+
+    def schema(self, name: str) -> FakeSchema:
+        return FakeSchema(self.db)
+
+
+def CreateClient() -> FakeClient:
+    """A client over a new database, seeded and slowed as the settings above say."""
+    db = FakeDatabase(float(_Setting("SCALE_FAKE_LATENCY", "fake_latency_ms", 0)),
+                      float(_Setting("SCALE_FAKE_JITTER", "fake_jitter_ms", 0)))
+    path = _Setting("SCALE_FAKE_SEED", "fake_seed", None)
+    if path:
+        with open(os.path.join(CURRENT_DIR, path), "r") as f:
+            db.Load(json.load(f))
+    else:
+        db.Load(Seed())
+    return FakeClient(db)
@@ -0,0 +1,411 @@
+#!/usr/bin/python3
+"""Local hardware service: owns the scales and QR scanner for every screen.
+
+Run once per station (Menu.py starts it if it isn't already running):
+
+    python Common/HardwareService.py
+
+The service opens the Ranger, Scout and scanner once, reconnects them on its
+own when they drop, and streams events to any number of screens over a local
+TCP socket as JSON lines:
+
+    {"type": "status", "device": "Ranger", "connected": true}
+    {"type": "weight", "device": "Ranger", "weight": 1250.0, "unit": "g", "unstable": false, "ts": ...}
+    {"type": "scan", "code": "1A4...", "ts": ...}
+
+A new subscriber first gets the current status of every device and the latest
+weight of each connected scale. Screens don't talk to this module's server
+side; Common.SubScale and Common.SubReadQRCode call Connect() and, when the
+service is up, use RemoteScale / RemoteScanner in place of the serial ports.
+If the service restarts, their client redials it. A screen that stops reading
+is dropped rather than holding up the others.
+
+The port is "hardware_service_port" in Common/config.json (default 47123).
+"""
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+from Common.ScannerReader import ScannerReader, DEFAULT_DEDUPE_SECONDS
+
+# Folder where THIS file lives (i.e., the common folder)
+BASE_DIR = Path(__file__).resolve().parent
+
+# Full path to config.json in the same folder
+CONFIG_PATH = BASE_DIR / "config.json"
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 47123
+RECONNECT_SECONDS = 5.0
+RANGER_POLL_SECONDS = 0.2
+HEARTBEAT_SECONDS = 1.0
+CLIENT_BACKLOG = 200        # lines a screen may fall behind by before it is dropped
+SEND_TIMEOUT_SECONDS = 5.0
+REDIAL_MIN_SECONDS = 0.5    # a screen redials a restarted service, backing off to RECONNECT_SECONDS
+
+
+def load_config():
+    try:
+        with open(CONFIG_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def ServicePort() -> int:
+    return int(load_config().get("hardware_service_port", DEFAULT_PORT))
+
+
+#################################################################################################
+#
+# Service side
+#
+#################################################################################################
+
+class HardwareService:
+    def __init__(self, port: int = None):
+        self.port = port or ServicePort()
+        self._clients = {}      # connection -> queue of lines its writer thread sends
+        self._lock = threading.Lock()
+        self._status = {}       # device name -> connected
+        self._latest = {}       # scale name -> last weight event
+        self._drivers = {}      # scale name -> open driver
+        self._stop = threading.Event()
+
+    # ---- subscribers ----
+    def broadcast(self, event: dict):
+        # queued under the lock, so every client gets events in the order the state changed;
+        # a client too far behind to take more is dropped instead of holding up the rest
+        line = (json.dumps(event) + "\n").encode()
+        behind = []
+        with self._lock:
+            if event["type"] == "status":
+                self._status[event["device"]] = event["connected"]
+            elif event["type"] == "weight":
+                self._latest[event["device"]] = event
+            for conn, outbox in self._clients.items():
+                try:
+                    outbox.put_nowait(line)
+                except queue.Full:
+                    behind.append(conn)
+        for conn in behind:
+            print("Dropping a screen that stopped reading")
+            self._drop(conn)
+
+    def _writer(self, conn, outbox):
+        # the only thread writing to conn, so a slow screen only ever blocks this one
+        try:
+            while True:
+                data = outbox.get()
+                if data is None:
+                    break
+                conn.sendall(data)
+        except OSError:
+            pass
+        self._drop(conn)
+
+    def _drop(self, conn):
+        with self._lock:
+            outbox = self._clients.pop(conn, None)
+        if outbox is not None:
+            try:
+                outbox.put_nowait(None)
+            except queue.Full:
+                pass
+        try:
+            conn.shutdown(socket.SHUT_RDWR)     # wakes a writer blocked in sendall
+        except OSError:
+            pass
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def _accept_loop(self, server):
+        while not self._stop.is_set():
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                continue
+            conn.settimeout(SEND_TIMEOUT_SECONDS)
+            outbox = queue.Queue(CLIENT_BACKLOG)
+            # the snapshot goes in the new client's queue before it is listed, so any
+            # broadcast it misses is already in the snapshot and the rest come after it
+            with self._lock:
+                snapshot = [{"type": "status", "device": d, "connected": c} for d, c in self._status.items()]
+                snapshot += list(self._latest.values())
+                snapshot.append({"type": "ready"})
+                outbox.put_nowait("".join(json.dumps(e) + "\n" for e in snapshot).encode())
+                self._clients[conn] = outbox
+            threading.Thread(target=self._writer, args=(conn, outbox),
+                             name="HardwareClientWriter", daemon=True).start()
+
+    # ---- devices ----
+    def _set_connected(self, device: str, connected: bool):
+        previous = self._status.get(device)
+        if previous != connected:
+            if previous is not None or connected:
+                print(f"{device}: {'connected' if connected else 'disconnected'}")
+            self.broadcast({"type": "status", "device": device, "connected": connected})
+
+    def _scale_manager(self):
+        import Common.ScaleDrivers as ScaleDrivers
+        for name in ScaleDrivers.DRIVERS:
+            self._set_connected(name, False)
+        while not self._stop.is_set():
+            if len(self._drivers) < len(ScaleDrivers.DRIVERS):
+                try:
+                    found = ScaleDrivers.FindScales()
+                except Exception as e:
+                    print(f"Scale search failed: {e}")
+                    found = []
+                for driver in found:
+                    if driver.name in self._drivers:
+                        continue
+                    try:
+                        driver.open()
+                    except Exception as e:
+                        print(f"Could not open {driver.name} on {driver.port}: {e}")
+                        continue
+                    self._drivers[driver.name] = driver
+                    threading.Thread(target=self._scale_worker, args=(driver,),
+                                     name=f"Scale-{driver.name}", daemon=True).start()
+            self._stop.wait(RECONNECT_SECONDS)
+
+    def _scale_worker(self, driver):
+        self._set_connected(driver.name, True)
+        last = None
+        sent = 0.0
+        try:
+            while not self._stop.is_set():
+                reading = driver.read()
+                now = time.time()
+                if reading is not None and (reading != last or now - sent >= HEARTBEAT_SECONDS):
+                    weight, unit, unstable = reading
+                    self.broadcast({"type": "weight", "device": driver.name, "weight": weight,
+                                    "unit": unit, "unstable": unstable, "ts": now})
+                    last, sent = reading, now
+                self._stop.wait(RANGER_POLL_SECONDS if driver.name == "Ranger" else 0.05)
+        except Exception as e:
+            print(f"{driver.name} read failed: {e}")
+        driver.close()
+        del self._drivers[driver.name]
+        self._set_connected(driver.name, False)
+
+    def _scanner_worker(self):
+        import serial
+        self._set_connected("Scanner", False)
+        while not self._stop.is_set():
+            port = load_config().get("scanner_com_port")
+            if not port:
+                self._stop.wait(RECONNECT_SECONDS)
+                continue
+            try:
+                with serial.Serial(port, 115200, timeout=1) as reader:
+                    self._set_connected("Scanner", True)
+                    scanner = ScannerReader(reader, float(load_config().get(
+                        "scan_dedupe_seconds", DEFAULT_DEDUPE_SECONDS))).start()
+                    while not self._stop.is_set() and scanner.alive:
+                        code = scanner.get(timeout=1.0)
+                        if code:
+                            self.broadcast({"type": "scan", "code": code, "ts": time.time()})
+                    scanner.stop()
+                    if scanner.error:
+                        raise scanner.error
+            except Exception as e:
+                print(f"Scanner on {port} failed: {e}")
+            self._set_connected("Scanner", False)
+            self._stop.wait(RECONNECT_SECONDS)
+
+    def serve_forever(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind((HOST, self.port))
+        server.listen()
+        server.settimeout(1.0)
+        print(f"Hardware service listening on {HOST}:{self.port}")
+        threading.Thread(target=self._scale_manager, name="ScaleManager", daemon=True).start()
+        threading.Thread(target=self._scanner_worker, name="Scanner", daemon=True).start()
+        try:
+            self._accept_loop(server)
+        finally:
+            server.close()
+
+    def stop(self):
+        self._stop.set()
+
+
+#################################################################################################
+#
+# Client side (used by Common.SubScale and Common.SubReadQRCode)
+#
+#################################################################################################
+
+class HardwareClient:
+    """One subscription to the service; keeps the latest weight per scale and queued scans.
+
+    If the service goes away (restarted, say) the client redials it, backing off
+    up to RECONNECT_SECONDS, and picks up where it left off once it answers."""
+
+    def __init__(self, port: int = None):
+        self.port = port or ServicePort()
+        self.status = {}
+        self.latest = {}
+        self.scans = queue.Queue()
+        self._ready = threading.Event()
+        self._sock = None
+
+    def connect(self, timeout: float = 1.0) -> bool:
+        if not self._dial(timeout):
+            return False
+        threading.Thread(target=self._run, name="HardwareClient", daemon=True).start()
+        # wait for the initial snapshot so status is known before screens check it
+        self._ready.wait(timeout)
+        return True
+
+    @property
+    def alive(self) -> bool:
+        return self._sock is not None
+
+    def _dial(self, timeout: float) -> bool:
+        try:
+            sock = socket.create_connection((HOST, self.port), timeout=timeout)
+        except OSError:
+            return False
+        sock.settimeout(None)
+        self._sock = sock
+        return True
+
+    def _run(self):
+        delay = REDIAL_MIN_SECONDS
+        while True:
+            self._read(self._sock)
+            self._sock = None
+            self.status = {}
+            self.latest = {}
+            self._ready.clear()
+            while not self._dial(1.0):
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_SECONDS)
+            delay = REDIAL_MIN_SECONDS
+
+    def _read(self, sock):
+        """Handle events from sock until the connection drops."""
+        buffer = b""
+        try:
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                buffer += data
+                while b"\n" in buffer:
+                    line, buffer = buffer.split(b"\n", 1)
+                    self._handle(json.loads(line))
+        except (OSError, ValueError):
+            pass
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def _handle(self, event: dict):
+        kind = event.get("type")
+        if kind == "status":
+            self.status[event["device"]] = event["connected"]
+            if not event["connected"]:
+                self.latest.pop(event["device"], None)
+        elif kind == "weight":
+            self.latest[event["device"]] = (event["weight"], event["unit"], event["unstable"])
+        elif kind == "scan":
+            self.scans.put(event["code"])
+        elif kind == "ready":
+            self._ready.set()
+
+
+class RemoteScale:
+    """Scale driver stand-in that reads the service's latest weight for one scale."""
+
+    def __init__(self, client: HardwareClient, name: str):
+        self.client = client
+        self.name = name
+        self.port = f"service:{client.port}"
+
+    @property
+    def connected(self) -> bool:
+        return self.client.alive and bool(self.client.status.get(self.name))
+
+    def open(self):
+        return self
+
+    def close(self):
+        pass
+
+    def read(self):
+        if not self.client.alive:
+            raise ConnectionError("Hardware service not reachable (reconnecting)")
+        return self.client.latest.get(self.name)
+
+
+class RemoteScanner:
+    """Looks enough like the serial QrReader (timeout=1) for ScannerReader."""
+
+    def __init__(self, client: HardwareClient, timeout: float = 1.0):
+        self.client = client
+        self.timeout = timeout
+
+    @property
+    def in_waiting(self) -> int:
+        return self.client.scans.qsize()
+
+    def readline(self) -> bytes:
+        if not self.client.alive:
+            # the client is redialing the service; read nothing, as a serial port times out
+            time.sleep(self.timeout)
+            return b""
+        try:
+            return (self.client.scans.get(timeout=self.timeout) + "\r\n").encode()
+        except queue.Empty:
+            return b""
+
+
+Client = None
+
+def Connect():
+    """Return the shared HardwareClient if the service is running, else None.
+
+    Once connected the client redials on its own, so it is returned even while
+    the service is restarting."""
+    global Client
+    if Client is not None:
+        return Client
+    client = HardwareClient()
+    if client.connect():
+        Client = client
+        return Client
+    return None
+
+def EnsureRunning():
+    """Start the service in its own process unless one is already listening."""
+    try:
+        socket.create_connection((HOST, ServicePort()), timeout=0.5).close()
+        return
+    except OSError:
+        pass
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__)],
+        cwd=ROOT_DIR,
+        creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if sys.platform.startswith("win") else 0,
+        start_new_session=not sys.platform.startswith("win"),
+    )
+
+
+if __name__ == "__main__":
+    HardwareService().serve_forever()
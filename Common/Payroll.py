@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+"""Trimmer pay for any period, every trimmer in one pass.
+
+TrimmerSummary shows one week at a time through TrimPay.WeekPay(): flower
+grams per crop/strain times that strain's BigsRate (each line rounded to the
+cent), plus LUNCH_PAY for every day of LUNCH_HOURS or more. Pay() does the
+same sums over columns of dailytrim_rollup rows (Columns()) for every trimmer
+and every pay period at once, and adds hours, days worked and flower grams
+per hour.
+
+    python Common/Payroll.py                                 # this season so far, one line per trimmer
+    python Common/Payroll.py --start 2026-06-01 --days 7     # one line per trimmer per week from June 1
+    python Common/Payroll.py --trimmer Alex --csv alex.csv
+    python Common/Payroll.py --check                         # and compare every week with TrimPay.WeekPay()
+
+Periods run --days at a time from --start (the last one stops at --end).
+Without --days the whole range is one period.
+"""
+import argparse
+import csv
+import os
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.ScaleData as ScaleData
+from Common.TrimPay import LUNCH_HOURS, LUNCH_PAY, WeekPay
+
+ALL = "All"             # the screen's every-trimmer choice, as the TrimmerName of Check()'s all-trimmer lines
+
+FIELDS = ["TrimmerName", "PeriodStart", "PeriodEnd", "Days", "Hours", "FlowerGrams", "SmallsGrams",
+          "GramsPerHour", "LunchCredits", "FlowerPay", "LunchPay", "GrossPay"]
+
+
+def Columns(rows: Iterable[dict]) -> Dict[str, np.ndarray]:
+    """dailytrim_rollup rows (ScaleData.LoadTrimRollup) as one array per column."""
+    rows = list(rows)
+    return {
+        "TrimDate": np.array([(r.get("TrimDate") or "")[:10] for r in rows], dtype="datetime64[D]"),
+        "TrimmerName": np.array([r.get("TrimmerName") or "" for r in rows], dtype=str),
+        "CropNo": np.array([int(r.get("CropNo") or 0) for r in rows], dtype=np.int64),
+        "Strain": np.array([(r.get("Strain") or "").strip() for r in rows], dtype=str),
+        "FlowerGrams": np.array([float(r.get("FlowerGrams") or 0) for r in rows], dtype=np.float64),
+        "SmallsGrams": np.array([float(r.get("SmallsGrams") or 0) for r in rows], dtype=np.float64),
+        "Hours": np.array([float(r.get("Hours") or 0) for r in rows], dtype=np.float64),
+    }
+
+
+def Pay(cols: Dict[str, np.ndarray], rates_map: Dict[Tuple[int, str], float],
+        start: Optional[date] = None, end: Optional[date] = None, days: Optional[int] = None) -> List[dict]:
+    """One dict of FIELDS per trimmer per period that has rows, by period then trimmer.
+
+    rates_map is ScaleData.GetRatesMap(): (CropNo, Strain) -> BigsRate."""
+    day = cols["TrimDate"].astype(np.int64)         # days since 1970-01-01
+    n = len(day)
+    if n == 0:
+        return []
+    first = int(day.min()) if start is None else int(np.datetime64(start, "D").astype(np.int64))
+    last = int(day.max()) if end is None else int(np.datetime64(end, "D").astype(np.int64))
+
+    # group = (period, trimmer); np.unique keeps them sorted that way
+    trimmers, t_idx = np.unique(cols["TrimmerName"], return_inverse=True)
+    period = (day - first) // days if days else np.zeros(n, dtype=np.int64)
+    groups, g_idx = np.unique(period * len(trimmers) + t_idx, return_inverse=True)
+    G = len(groups)
+    flower = np.bincount(g_idx, cols["FlowerGrams"], G)
+    smalls = np.bincount(g_idx, cols["SmallsGrams"], G)
+    hours = np.bincount(g_idx, cols["Hours"], G)
+
+    # flower pay: grams per group and crop/strain times its rate, each rounded to the cent
+    strains, s_idx = np.unique(cols["Strain"], return_inverse=True)
+    S = len(strains)
+    pairs, p_idx = np.unique(cols["CropNo"] * S + s_idx, return_inverse=True)
+    P = len(pairs)
+    rate = np.array([float(rates_map.get((int(k) // S, str(strains[k % S])), 0.0)) for k in pairs])
+    lines, l_idx = np.unique(g_idx * P + p_idx, return_inverse=True)
+    line_pay = np.round(np.bincount(l_idx, cols["FlowerGrams"], len(lines)) * rate[lines % P], 2)
+    flower_pay = np.bincount(lines // P, line_pay, G)
+
+    # days worked and lunch credits: hours per group and day
+    D = int(day.max() - day.min()) + 1
+    group_days, gd_idx = np.unique(g_idx * D + (day - day.min()), return_inverse=True)
+    day_hours = np.bincount(gd_idx, cols["Hours"], len(group_days))
+    worked = np.bincount(group_days // D, day_hours > 0, G).astype(np.int64)
+    lunches = np.bincount(group_days // D, day_hours >= LUNCH_HOURS, G).astype(np.int64)
+
+    per_hour = np.divide(flower, hours, out=np.zeros(G), where=hours > 0)
+    origin = date(1970, 1, 1)
+    result = []
+    for g in range(G):
+        p, t = divmod(int(groups[g]), len(trimmers))
+        p_start = first + p * days if days else first
+        p_end = min(p_start + days - 1, last) if days else last
+        lunch_pay = round(int(lunches[g]) * LUNCH_PAY, 2)
+        result.append({
+            "TrimmerName": str(trimmers[t]),
+            "PeriodStart": (origin + timedelta(days=p_start)).isoformat(),
+            "PeriodEnd": (origin + timedelta(days=p_end)).isoformat(),
+            "Days": int(worked[g]),
+            "Hours": round(float(hours[g]), 2),
+            "FlowerGrams": round(float(flower[g]), 2),
+            "SmallsGrams": round(float(smalls[g]), 2),
+            "GramsPerHour": round(float(per_hour[g]), 2),
+            "LunchCredits": int(lunches[g]),
+            "FlowerPay": round(float(flower_pay[g]), 2),
+            "LunchPay": lunch_pay,
+            "GrossPay": round(float(flower_pay[g]) + lunch_pay, 2),
+        })
+    return result
+
+
+#################################################################################################
+#
+# Check against the screen
+#
+#################################################################################################
+
+def Check(rows: List[dict], rates_map: Dict[Tuple[int, str], float], start: date, end: date) -> int:
+    """Compare Pay() for every week from start with TrimPay.WeekPay(), the screen's sums; return the mismatches.
+
+    Each trimmer's week is checked, and so is the week of all trimmers
+    together ("All" on the screen, where the day's hours of every trimmer
+    count towards one lunch)."""
+    by_trimmer, by_week = {}, {}
+    for r in rows:
+        offset = (date.fromisoformat((r.get("TrimDate") or "")[:10]) - start).days // 7
+        week = (start + timedelta(days=7 * offset)).isoformat()
+        by_trimmer.setdefault((week, r.get("TrimmerName") or ""), []).append(r)
+        by_week.setdefault((week, ALL), []).append(r)
+    cols = Columns(rows)
+    everyone = dict(cols, TrimmerName=np.full(len(rows), ALL))
+    bad = 0
+    for weeks, lines in ((by_trimmer, Pay(cols, rates_map, start, end, 7)),
+                         (by_week, Pay(everyone, rates_map, start, end, 7))):
+        for p in lines:
+            screen = WeekPay(weeks.pop((p["PeriodStart"], p["TrimmerName"]), []), rates_map)
+            if abs(screen["FlowerPay"] - p["FlowerPay"]) > 0.005 or screen["LunchCount"] != p["LunchCredits"]:
+                bad += 1
+                print(f"MISMATCH {p['TrimmerName']} week of {p['PeriodStart']}: screen {screen['FlowerPay']:.2f} + "
+                      f"{screen['LunchCount']} lunches, payroll {p['FlowerPay']:.2f} + {p['LunchCredits']} lunches")
+        for week, trimmer in weeks:
+            bad += 1
+            print(f"MISMATCH {trimmer} week of {week}: missing from payroll")
+    return bad
+
+
+#################################################################################################
+#
+# Command line
+#
+#################################################################################################
+
+def main():
+    today = date.today()
+    ap = argparse.ArgumentParser(description="Trimmer pay for every trimmer over a date range.")
+    ap.add_argument("--start", type=date.fromisoformat, default=date(today.year, 1, 1),
+                    help="first trim date (default Jan 1 this year)")
+    ap.add_argument("--end", type=date.fromisoformat, default=today, help="last trim date (default today)")
+    ap.add_argument("--days", type=int, help="split the range into pay periods of this many days")
+    ap.add_argument("--trimmer", help="only this trimmer")
+    ap.add_argument("--crop", type=int, help="only this crop")
+    ap.add_argument("--csv", help="also write the lines to this CSV file")
+    ap.add_argument("--check", action="store_true", help="compare every week with the screen's sums")
+    args = ap.parse_args()
+    if args.days is not None and args.days < 1:
+        ap.error("--days must be 1 or more")
+
+    rows = ScaleData.LoadTrimRollup(args.start, args.end, args.trimmer, args.crop)
+    rates_map = ScaleData.GetRatesMap()
+    lines = Pay(Columns(rows), rates_map, args.start, args.end, args.days)
+
+    print(f"{'Trimmer':<16}{'From':<12}{'To':<12}{'Days':>5}{'Hours':>9}{'Flower g':>11}{'Smalls g':>11}"
+          f"{'g/h':>8}{'Lunch':>6}{'Flower $':>11}{'Lunch $':>9}{'Gross $':>11}")
+    for p in lines:
+        print(f"{p['TrimmerName']:<16}{p['PeriodStart']:<12}{p['PeriodEnd']:<12}{p['Days']:>5}{p['Hours']:>9.2f}"
+              f"{p['FlowerGrams']:>11.2f}{p['SmallsGrams']:>11.2f}{p['GramsPerHour']:>8.1f}{p['LunchCredits']:>6}"
+              f"{p['FlowerPay']:>11.2f}{p['LunchPay']:>9.2f}{p['GrossPay']:>11.2f}")
+    print(f"{len(rows)} rollup rows, {len(lines)} lines, gross {sum(p['GrossPay'] for p in lines):.2f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(lines)
+        print(f"Wrote {args.csv}")
+
+    if args.check:
+        bad = Check(rows, rates_map, args.start, args.end)
+        print(f"Check: {bad} mismatched trimmer-weeks" if bad else "Check: every trimmer-week matches the screen")
+        sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""Start the reads a selection will lead to, all at once.
+
+Picking a crop used to load its strains, and only when those were shown,
+its batches; picking a strain then loaded its packages, then its cases. Each
+step waited a full round trip for the one before. A screen now names every
+read the selection leads to as soon as it is made:
+
+    Prefetch.Start((SubSupa.LoadStrains, crop_no),
+                   (SubSupa.LoadAllBatches, crop_no))
+    TaskRunner.Run(self, Prefetch.Take, SubSupa.LoadStrains, crop_no, on_done=...)
+
+Start() sends them all on a pool of its own. Take() returns the result of a
+started read (waiting for it if it is still on the way) or, if none was
+started, makes the read itself. So the second and later steps of a cascade
+cost nothing more than the first.
+
+A prefetched result is handed out once, and only within FRESH_SECONDS of its
+start; after that Take() reads again, and the next Start() lets it go. Reads through Common.RefCache also fill
+that cache, so the next screen gets them too. A screen that writes calls
+Forget() so nothing prefetched before the write is shown after it.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 6
+FRESH_SECONDS = 30
+
+_Executor = None
+_Lock = threading.Lock()
+_Started = {}       # key -> (started, Future)
+
+
+def _Pool() -> ThreadPoolExecutor:
+    global _Executor
+    if _Executor is None:
+        with _Lock:
+            if _Executor is None:
+                _Executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="Prefetch")
+    return _Executor
+
+
+def _Key(func, args) -> str:
+    return func.__name__ + json.dumps(args, default=str)
+
+
+def Start(*calls):
+    """Begin each (func, *args) read on the prefetch pool, unless it is already under way."""
+    pool = _Pool()
+    now = time.time()
+    with _Lock:
+        # drop the reads no Take() came for, so their results are not kept forever
+        for key in [k for k, (started, _) in _Started.items() if now - started > FRESH_SECONDS]:
+            del _Started[key]
+        for func, *args in calls:
+            key = _Key(func, args)
+            if key not in _Started:
+                _Started[key] = (now, pool.submit(func, *args))
+
+
+def Take(func, *args):
+    """func(*args): the prefetched result if there is a fresh one, else a new read."""
+    with _Lock:
+        held = _Started.pop(_Key(func, args), None)
+    if held is not None and time.time() - held[0] <= FRESH_SECONDS:
+        return held[1].result()
+    return func(*args)
+
+
+def Forget():
+    """Drop every prefetched result (call after a write)."""
+    with _Lock:
+        _Started.clear()
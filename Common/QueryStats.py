@@ -0,0 +1,353 @@
+#!/usr/bin/python3
+"""Timing for every Supabase call a screen makes.
+
+Two things are recorded, each as one line of querylog.jsonl next to this
+module (shared by every screen on the station):
+
+    "call"   a Common.ScaleData function: how long it took, the rows it
+             returned, the error if it raised
+    "query"  one request to Supabase: table (or rpc) and method, time, rows,
+             response size in bytes, and the ScaleData function it ran under
+
+SupaClient traces the queries; ScaleData wraps its own functions with
+Instrument() at the bottom of the module. A call or query slower than
+"slow_query_seconds" in Common/config.json (default SLOW_SECONDS) is printed
+with its table and filters, and those are kept in its log line too, as they
+are for errors. "query_stats": false there turns all of it off.
+
+Timing stays cheap: the response size is taken from the HTTP response
+SupaClient's session already read (OnResponse), not by encoding the rows
+again, and log lines are buffered and written FLUSH_RECORDS at a time (or
+after FLUSH_SECONDS, and at exit).
+
+Summary() folds the log into per-screen histograms for the diagnostics
+window in Menu.py.
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_PATH = os.path.join(CURRENT_DIR, "querylog.jsonl")
+CONFIG_PATH = os.path.join(CURRENT_DIR, "config.json")
+
+SLOW_SECONDS = 1.0
+MAX_LOG_BYTES = 2_000_000       # then querylog.jsonl moves to querylog.jsonl.1
+FLUSH_RECORDS = 50              # log lines held before they are written
+FLUSH_SECONDS = 5.0             # ... or once the oldest is this old
+WINDOW = 2000                   # most recent records per screen in Summary()
+BUCKETS = [0.1, 0.25, 0.5, 1.0, 2.0]    # histogram upper bounds, seconds (plus one open bucket)
+
+SCREEN = os.path.splitext(os.path.basename(sys.argv[0] or ""))[0] or "python"
+
+_Lock = threading.Lock()        # the buffer
+_FileLock = threading.Lock()    # querylog.jsonl
+_Call = contextvars.ContextVar("QueryStatsCall", default="")
+_Response = threading.local()   # the last HTTP response on this thread (OnResponse)
+_Config = None
+_Buffer = []
+_BufferedAt = 0.0
+_LogBytes = None                # size of querylog.jsonl, counted from the first write on
+_LogBroken = False
+
+
+def _Setting(key: str, default):
+    global _Config
+    if _Config is None:
+        try:
+            with open(CONFIG_PATH, "r") as f:
+                _Config = json.load(f)
+        except (OSError, ValueError):
+            _Config = {}
+    return _Config.get(key, default)
+
+
+def SlowSeconds() -> float:
+    try:
+        return float(_Setting("slow_query_seconds", SLOW_SECONDS))
+    except (TypeError, ValueError):
+        return SLOW_SECONDS
+
+
+def Enabled() -> bool:
+    """False when Common/config.json has "query_stats": false; nothing is then timed."""
+    return bool(_Setting("query_stats", True))
+
+
+def _Write(record: dict):
+    global _BufferedAt
+    if _LogBroken:
+        return
+    line = json.dumps(record, default=str) + "\n"
+    now = time.monotonic()
+    with _Lock:
+        if not _Buffer:
+            _BufferedAt = now
+        _Buffer.append(line)
+        full = len(_Buffer) >= FLUSH_RECORDS or now - _BufferedAt >= FLUSH_SECONDS
+    if full:
+        Flush()
+
+
+def Flush():
+    """Write the buffered log lines to querylog.jsonl, moving it aside when it gets too big."""
+    global _LogBroken, _LogBytes
+    with _Lock:
+        lines = _Buffer[:]
+        del _Buffer[:]
+    if not lines or _LogBroken:
+        return
+    data = "".join(lines)
+    with _FileLock:
+        try:
+            if _LogBytes is None:
+                _LogBytes = os.path.getsize(LOG_PATH) if os.path.exists(LOG_PATH) else 0
+            if _LogBytes > MAX_LOG_BYTES:
+                os.replace(LOG_PATH, LOG_PATH + ".1")
+                _LogBytes = 0
+            with open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(data)
+            _LogBytes += len(data)
+        except OSError as e:
+            # timing must never stop a screen; say so once and carry on without the file
+            _LogBroken = True
+            print(f"QueryStats: could not write {LOG_PATH}: {e}")
+
+atexit.register(Flush)
+
+
+def Record(kind: str, name: str, seconds: float, rows: int = 0, size: int = 0,
+           error: Optional[BaseException] = None, filters=None):
+    """Log one call or query. filters is a function, only called for slow or failed ones."""
+    record = {
+        "at": round(time.time(), 3),
+        "screen": SCREEN,
+        "kind": kind,
+        "name": name,
+        "ms": round(seconds * 1000, 1),
+        "rows": rows,
+        "bytes": size,
+    }
+    if kind == "query":
+        record["call"] = _Call.get()
+    slow = seconds >= SlowSeconds()
+    if slow:
+        record["slow"] = True
+    if error is not None:
+        record["error"] = f"{type(error).__name__}: {error}"
+    if (slow or error is not None) and filters is not None:
+        try:
+            record["filters"] = filters()
+        except Exception as e:
+            record["filters"] = f"? ({e})"
+    if slow:
+        print(f"Slow {kind} {seconds:.2f}s {name} {record.get('filters', '')}")
+    _Write(record)
+
+
+#################################################################################################
+#
+# Queries (through SupaClient)
+#
+#################################################################################################
+
+def _Filters(builder) -> str:
+    """The query string and body of a postgrest request builder, shortened."""
+    parts = []
+    params = getattr(builder, "params", None)
+    if params:
+        parts.append(unquote(str(params)))
+    body = getattr(builder, "json", None)
+    if body:
+        parts.append(json.dumps(body, default=str))
+    return " ".join(parts)[:400]
+
+
+def OnResponse(response):
+    """httpx response hook (SupaClient's session): keep the response so the query
+    being timed on this thread can take its size."""
+    _Response.last = response
+
+
+def _Size(response) -> int:
+    """Bytes in the body of an httpx response, 0 if there is none."""
+    if response is None:
+        return 0
+    try:
+        return len(response.content)
+    except Exception:
+        # not read (an error before the body); fall back to what the server declared
+        try:
+            return int(response.headers.get("content-length") or 0)
+        except (TypeError, ValueError):
+            return 0
+
+
+def _Execute(builder, table: str, execute, args, kwargs):
+    _Response.last = None
+    started = time.perf_counter()
+    res = None
+    error = None
+    try:
+        res = execute(*args, **kwargs)
+        return res
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        data = getattr(res, "data", None)
+        rows = len(data) if isinstance(data, list) else int(data is not None)
+        size = _Size(_Response.last)
+        _Response.last = None
+        method = getattr(builder, "http_method", "") or ""
+        Record("query", f"{table} {method}".strip(), seconds, rows, size, error,
+               lambda: _Filters(builder))
+
+
+class Traced:
+    """Wraps a postgrest request builder so that its execute() is timed.
+
+    Builder methods that return another builder (select, eq, order, not_...)
+    return it wrapped too, so a whole chain stays traced."""
+
+    __slots__ = ("_builder", "_table")
+
+    def __init__(self, builder, table: str):
+        self._builder = builder
+        self._table = table
+
+    def __getattr__(self, attr):
+        value = getattr(self._builder, attr)
+        if attr == "execute":
+            return lambda *args, **kwargs: _Execute(self._builder, self._table, value, args, kwargs)
+        if hasattr(value, "execute") and not callable(value):
+            return Traced(value, self._table)
+        if not callable(value):
+            return value
+
+        def chained(*args, **kwargs):
+            result = value(*args, **kwargs)
+            return Traced(result, self._table) if hasattr(result, "execute") else result
+        return chained
+
+
+#################################################################################################
+#
+# ScaleData functions
+#
+#################################################################################################
+
+def Timed(func):
+    """Record each call of func; queries made inside it are logged under its name."""
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        token = _Call.set(func.__name__)
+        started = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _Call.reset(token)
+            rows = len(result) if isinstance(result, (list, dict)) else 0
+            Record("call", func.__name__, time.perf_counter() - started, rows, 0, error,
+                   lambda: repr((args, kwargs))[:400])
+    timed.timed = True
+    return timed
+
+
+def Instrument(namespace: Dict[str, object], module: str):
+    """Wrap the public functions defined in module (pass globals(), __name__) with Timed.
+
+    Generators (Rows, Pages, Iter*) are left alone: their queries are still
+    logged, under whichever function is reading them."""
+    if not Enabled():
+        return
+    for name, func in list(namespace.items()):
+        if (inspect.isfunction(func) and func.__module__ == module and name[:1].isupper()
+                and not inspect.isgeneratorfunction(func) and not getattr(func, "timed", False)):
+            namespace[name] = Timed(func)
+
+
+#################################################################################################
+#
+# Reading the log back
+#
+#################################################################################################
+
+def ReadLog() -> List[dict]:
+    """Every record in querylog.jsonl (and the rotated file before it), oldest first."""
+    Flush()
+    records = []
+    for path in (LOG_PATH + ".1", LOG_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # a line cut short by a screen closing mid-write
+                        continue
+        except OSError:
+            continue
+    return records
+
+
+def _Percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def Summary(records: List[dict]) -> List[dict]:
+    """Per screen, kind and name over each screen's last WINDOW records: count,
+    errors, slow, p50/p95/max ms, average rows and bytes, and a histogram
+    (counts per BUCKETS bound, then the rest)."""
+    by_screen = {}
+    for r in records:
+        by_screen.setdefault(r.get("screen", "?"), []).append(r)
+    groups = {}
+    for screen, recs in by_screen.items():
+        for r in recs[-WINDOW:]:
+            groups.setdefault((screen, r.get("kind", "?"), r.get("name", "?")), []).append(r)
+
+    summary = []
+    for (screen, kind, name), recs in sorted(groups.items()):
+        ms = sorted(float(r.get("ms", 0)) for r in recs)
+        hist = [0] * (len(BUCKETS) + 1)
+        for v in ms:
+            i = 0
+            while i < len(BUCKETS) and v > BUCKETS[i] * 1000:
+                i += 1
+            hist[i] += 1
+        summary.append({
+            "screen": screen,
+            "kind": kind,
+            "name": name,
+            "count": len(recs),
+            "errors": sum(1 for r in recs if r.get("error")),
+            "slow": sum(1 for r in recs if r.get("slow")),
+            "p50": _Percentile(ms, 0.50),
+            "p95": _Percentile(ms, 0.95),
+            "max": ms[-1],
+            "rows": sum(r.get("rows", 0) for r in recs) / len(recs),
+            "bytes": sum(r.get("bytes", 0) for r in recs) / len(recs),
+            "hist": hist,
+        })
+    return summary
+
+
+def SlowCalls(records: List[dict], limit: int = 50) -> List[dict]:
+    """The latest slow or failed records, newest first."""
+    return [r for r in reversed(records) if r.get("slow") or r.get("error")][:limit]
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+"""Check scale.dailytrim_rollup against dailytrim, and recompute what differs.
+
+The rollup is kept by a trigger on dailytrim (Common/sql/dailytrim_rollup.sql),
+so this should find nothing. Run it after fixing dailytrim by hand with the
+trigger disabled, or whenever a report looks wrong:
+
+    python Common/RebuildTrimRollup.py --check                           # count, change nothing
+    python Common/RebuildTrimRollup.py                                   # recompute, then check again
+    python Common/RebuildTrimRollup.py --start 2026-06-01 --end 2026-06-30
+
+Without --start/--end every day is checked. Exits 1 if rows still differ.
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.ScaleData as ScaleData
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check and recompute the daily trim rollup.")
+    ap.add_argument("--start", type=date.fromisoformat, help="first trim date (default: all)")
+    ap.add_argument("--end", type=date.fromisoformat, help="last trim date (default: all)")
+    ap.add_argument("--check", action="store_true", help="only count the rollup rows that differ")
+    args = ap.parse_args()
+
+    span = f"{args.start or 'start'} to {args.end or 'end'}"
+    wrong = ScaleData.RebuildTrimRollup(args.start, args.end, fix=not args.check)
+    if args.check:
+        print(f"{wrong} rollup rows differ from dailytrim ({span})")
+        sys.exit(1 if wrong else 0)
+
+    left = ScaleData.RebuildTrimRollup(args.start, args.end, fix=False)
+    print(f"Recomputed {span}: {wrong} rollup rows differed, {left} differ now")
+    sys.exit(1 if left else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+"""Read-through cache for the slow-changing reference data.
+
+Crops, strains, trimmers, trim rates and package types change a few times a
+season but were fetched on every screen open and every combo change. In
+Common.ScaleData those functions are wrapped:
+
+    @RefCache.Cached("scalecrops")
+    def LoadCrops(): ...
+
+A result is kept per argument list for TTL[table] seconds. Past that it is
+still returned at once while a background thread fetches the new one, so a
+combo never waits on Supabase for data it has shown before. A ScaleData write
+to one of these tables calls Invalidate(table); those entries are then
+fetched again on next use, here and in every other screen that is open.
+
+Results are saved to refcache.json next to this module, so a screen started
+cold fills its combos from the last session straight away. Admin screens that
+must show what is in Supabase right now use Reload().
+"""
+import contextvars
+import copy
+import functools
+import json
+import os
+import threading
+import time
+
+import Common.SupaClient as SupaClient
+
+CACHE_PATH = SupaClient.LocalPath("refcache.json")
+
+TTL = {                 # seconds
+    "scalecrops": 300,
+    "scaleplants": 600,
+    "scaletrimmers": 300,
+    "trimrates": 300,
+    "packagetypes": 600,
+}
+DEFAULT_TTL = 300
+
+_Lock = threading.RLock()
+_Entries = {}           # key -> [table, fetched (epoch s), value, persist]
+_Invalidated = {}       # table -> epoch s of the last write
+_Refreshing = set()     # keys being fetched in the background
+_FileStamp = None       # mtime of the cache file as last read or written here
+
+
+def _Key(name: str, args, kwargs) -> str:
+    return name + json.dumps([args, kwargs], default=str, sort_keys=True)
+
+
+def _Valid(entry) -> bool:
+    """Not dropped by an Invalidate() since it was fetched."""
+    return entry[1] > _Invalidated.get(entry[0], 0)
+
+
+def _Fresh(entry) -> bool:
+    return _Valid(entry) and time.time() - entry[1] < TTL.get(entry[0], DEFAULT_TTL)
+
+
+#################################################################################################
+#
+# Cache file (shared by every screen on this station)
+#
+#################################################################################################
+
+def _Load():
+    """Pick up what other screens have saved or invalidated since we last looked."""
+    global _FileStamp
+    try:
+        stamp = os.stat(CACHE_PATH).st_mtime_ns
+    except OSError:
+        return
+    if stamp == _FileStamp:
+        return
+    try:
+        with open(CACHE_PATH, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    _FileStamp = stamp
+    for table, when in data.get("invalidated", {}).items():
+        _Invalidated[table] = max(when, _Invalidated.get(table, 0))
+    for key, (table, fetched, value) in data.get("entries", {}).items():
+        mine = _Entries.get(key)
+        if mine is None or mine[1] < fetched:
+            _Entries[key] = [table, fetched, value, True]
+
+
+def _Save():
+    global _FileStamp
+    _Load()
+    data = {
+        "invalidated": _Invalidated,
+        "entries": {k: e[:3] for k, e in _Entries.items() if e[3] and _Valid(e)},
+    }
+    tmp = CACHE_PATH + ".tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, CACHE_PATH)
+        _FileStamp = os.stat(CACHE_PATH).st_mtime_ns
+    except OSError as e:
+        # the cache still works for this process
+        print(f"RefCache: could not save {CACHE_PATH}: {e}")
+
+
+#################################################################################################
+#
+# Public
+#
+#################################################################################################
+
+def _Store(table: str, key: str, started: float, value, persist: bool):
+    """Keep value, fetched at `started` (so a write made during the fetch still invalidates it)."""
+    with _Lock:
+        entry = _Entries.get(key)
+        if entry is not None and entry[1] > started:
+            return      # a later fetch got there first
+        _Entries[key] = [table, started, value, persist]
+        if persist:
+            _Save()
+
+
+def Cached(table: str, persist: bool = True):
+    """Cache a ScaleData read of `table`. persist=False keeps it out of the file
+    (for results JSON can't hold, such as dicts keyed by tuples)."""
+    def wrap(func):
+        @functools.wraps(func)
+        def cached(*args, **kwargs):
+            key = _Key(func.__name__, args, kwargs)
+            with _Lock:
+                _Load()
+                entry = _Entries.get(key)
+                if entry is not None and _Valid(entry):
+                    if not _Fresh(entry) and key not in _Refreshing:
+                        _Refreshing.add(key)
+                        # run in a copy of this context, so QueryStats logs the fetch under the caller
+                        threading.Thread(target=contextvars.copy_context().run,
+                                         args=(refresh, key, args, kwargs),
+                                         name="RefCache", daemon=True).start()
+                    return copy.deepcopy(entry[2])
+            started = time.time()
+            value = func(*args, **kwargs)
+            _Store(table, key, started, value, persist)
+            return copy.deepcopy(value)
+
+        def refresh(key, args, kwargs):
+            started = time.time()
+            try:
+                _Store(table, key, started, func(*args, **kwargs), persist)
+            except Exception as e:
+                # keep serving the old value; the next call tries again
+                print(f"RefCache: refreshing {func.__name__} failed: {e}")
+            finally:
+                with _Lock:
+                    _Refreshing.discard(key)
+
+        cached.table = table
+        cached.persist = persist
+        cached.uncached = func
+        return cached
+    return wrap
+
+
+def Reload(func, *args, **kwargs):
+    """Call a Cached function against Supabase now, and cache what it returns."""
+    started = time.time()
+    value = func.uncached(*args, **kwargs)
+    _Store(func.table, _Key(func.__name__, args, kwargs), started, value, func.persist)
+    return copy.deepcopy(value)
+
+
+def Invalidate(*tables: str):
+    """Drop everything cached from these tables, in this screen and the others."""
+    with _Lock:
+        _Load()
+        now = time.time()
+        for table in tables:
+            _Invalidated[table] = now
+        for key in [k for k, e in _Entries.items() if e[0] in tables]:
+            del _Entries[key]
+        _Save()
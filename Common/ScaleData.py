@@ -0,0 +1,1019 @@
+#!/usr/bin/python3
+"""Supabase queries for every screen, against the "scale" schema.
+
+This is the one data layer: the SubSupa module in each folder (and
+SopScripts/SubSopSupa.py) just re-exports the functions its screens use from
+here. All of them share the process-wide client in Common/SupaClient.py, made
+on the first query.
+
+Reads of crops, strains, trimmers, trim rates and package types go through
+Common/RefCache.py; writes to those tables invalidate it.
+
+Every public function here, and every query it makes, is timed into
+Common/querylog.jsonl by Common/QueryStats.py (see Instrument() at the end).
+
+Sections follow the tables:
+
+    scalecrops, scaleplants, scalelog       crops, strains, plants
+    scalebuck, metrictags                   bucked totes and Metric tags
+    batchtable                              batch ids
+    scaletrimmers, dailytrim, trimrates     trimmers and daily trim
+    scaletrim                               trim bags
+    packagetypes, packages                  packaging
+    hashbatch, hashruns                     hash runs
+    rosinbatch, rosinruns                   rosin runs
+    sopindex                                SOP files
+"""
+import contextvars
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import Common.QueryStats as QueryStats
+import Common.RefCache as RefCache
+import Common.SupaClient as SupaClient
+
+scaleschema = "scale"
+sb = SupaClient.Schema(scaleschema)
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+PAGE_SIZE = 1000        # rows per request; keep at or below the project's PostgREST max-rows
+
+
+def FindRows(Table: str, Match: Dict[str, object], Columns: str = "*") -> List[dict]:
+    """Rows of Table whose columns equal every value in Match (used by Common.WriteJournal)."""
+    query = sb.table(Table).select(Columns)
+    for column, value in Match.items():
+        query = query.eq(column, value)
+    return query.execute().data or []
+
+def NextNumber(Kind: str, Scope: str, Count: int = 1) -> int:
+    """Hand out the next tote/case/run number for Scope, atomically on the server
+    (scale.next_number, Common/sql/next_number.sql); Count > 1 reserves a block
+    and returns its first number."""
+    return int(sb.rpc("next_number", {"p_kind": Kind, "p_scope": Scope, "p_count": Count}).execute().data)
+
+
+#################################################################################################
+#
+# Paged reads
+#
+# A plain .execute() stops at PostgREST's max-rows and says nothing, so reads
+# that can grow past a page go through Pages()/Rows(). They page by keyset: each
+# request asks for the rows after the last one seen, in Keys order, so a page
+# costs the same however deep into the table it is.
+#
+#     for row in Rows(lambda: sb.table("dailytrim").select(cols).eq("CropNo", 19),
+#                     ["TrimDate", "TrimmerName", "AmPm"]):
+#         totals[row["Strain"]] += row["FlowerGrams"]
+#
+# Keys (add ".desc" to sort a key descending) must be selected and unique
+# together, or rows are skipped at page boundaries. They may be null; nulls sort
+# as Postgres sorts them, last ascending and first descending. Query must build a
+# new query each call. With Prefetch the next page is fetched while the caller
+# works through the current one.
+#
+#################################################################################################
+
+_PagePool = None
+_PageLock = threading.Lock()
+
+def _Pager() -> ThreadPoolExecutor:
+    global _PagePool
+    if _PagePool is None:
+        with _PageLock:
+            if _PagePool is None:
+                _PagePool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="Page")
+    return _PagePool
+
+def _Literal(value) -> str:
+    """A value quoted for a PostgREST or=() filter."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+def _Same(column: str, value) -> str:
+    return f"{column}.is.null" if value is None else f"{column}.eq.{_Literal(value)}"
+
+def _Past(column: str, desc: bool, value) -> Optional[str]:
+    """Filter for the values that sort after value in this column, or None if none do.
+
+    Postgres puts nulls last ascending and first descending."""
+    if value is None:
+        return f"{column}.not.is.null" if desc else None
+    if desc:
+        return f"{column}.lt.{_Literal(value)}"
+    return f"or({column}.gt.{_Literal(value)},{column}.is.null)"
+
+def _After(keys: List[Tuple[str, bool]], row: dict) -> str:
+    """or=() filter for the rows after `row` in keys order."""
+    clauses = []
+    for i, (column, desc) in enumerate(keys):
+        past = _Past(column, desc, row.get(column))
+        if past is None:
+            continue
+        parts = [_Same(c, row.get(c)) for c, _ in keys[:i]] + [past]
+        clauses.append(parts[0] if len(parts) == 1 else f"and({','.join(parts)})")
+    return ",".join(clauses)
+
+def Pages(Query: Callable, Keys: Sequence[str], PageSize: int = PAGE_SIZE, Prefetch: bool = True) -> Iterator[List[dict]]:
+    """Yield every row of Query() a page (list of rows) at a time."""
+    keys = [(k[:-5], True) if k.endswith(".desc") else (k, False) for k in Keys]
+
+    def fetch(after):
+        q = Query()
+        if after is not None:
+            past = _After(keys, after)
+            if not past:
+                return []       # null in every ascending key: nothing sorts after it
+            q = q.or_(past)
+        for column, desc in keys:
+            q = q.order(column, desc=desc)
+        return q.limit(PageSize).execute().data or []
+
+    page = fetch(None)
+    while page:
+        full = len(page) >= PageSize
+        ahead = (_Pager().submit(contextvars.copy_context().run, fetch, page[-1])
+                 if full and Prefetch else None)
+        yield page
+        if not full:
+            break
+        page = ahead.result() if ahead is not None else fetch(page[-1])
+
+def Rows(Query: Callable, Keys: Sequence[str], PageSize: int = PAGE_SIZE, Prefetch: bool = True) -> Iterator[dict]:
+    """Yield every row of Query() one at a time, holding only a page or two."""
+    for page in Pages(Query, Keys, PageSize, Prefetch):
+        yield from page
+
+
+#################################################################################################
+#
+# Crops, strains and plants
+#
+# scalecrops Table:   CropNo, HarvestDate, CropStat
+# scaleplants Table:  PlantNo, CropNo, Strain, WetWeight, WetDate, DryWeight, DryDate
+# scalelog Table:     PlantNo, Strain, PlantType, Weight, ScaleDate
+# cropstrains View:   CropNo, Strain, Plants
+#
+#################################################################################################
+
+@RefCache.Cached("scalecrops")
+def LoadCrops() -> List[str]:
+    """Active crops as "CropNo - HarvestDate" labels, newest first, after "Select"."""
+    res = (sb.table("scalecrops").select("CropNo, HarvestDate, CropStat")
+            .eq("CropStat", "Active").order("CropNo", desc=True).execute())
+    result = []
+    for c in res.data or []:
+        crop_no = c.get("CropNo")
+        date = c.get("HarvestDate")
+        result.append(f"{crop_no} - {date}" if date else str(crop_no))
+    return ["Select"] + result
+
+def LoadStrainCounts(crop_no: int) -> List[dict]:
+    """Strain and Plants (plant count) for each strain in a crop, sorted by strain.
+
+    From the cropstrains view (Common/sql/cropstrains.sql): one row per strain.
+    Not cached: PrintPlantTags prints this many tags, so it must be current.
+    """
+    res = (sb.table("cropstrains").select("Strain,Plants")
+           .eq("CropNo", crop_no).order("Strain").execute())
+    return res.data or []
+
+@RefCache.Cached("scaleplants")
+def LoadStrains(crop_no: int) -> List[str]:
+    """Strains planted in a crop, sorted, after "Select"."""
+    return ["Select"] + [row["Strain"] for row in LoadStrainCounts(crop_no) if row.get("Strain")]
+
+@RefCache.Cached("scalecrops")
+def GetHarvestDate(crop_no: int) -> Optional[str]:
+    """Get HarvestDate for a given CropNo"""
+    res = sb.table("scalecrops").select("HarvestDate").eq("CropNo", crop_no).execute()
+    if res.data:
+        return res.data[0].get("HarvestDate")
+    return None
+
+def GetOnePlant(PlantNo) -> Optional[List[dict]]:
+    res = sb.table("scaleplants").select("Strain", "WetWeight, DryWeight").eq("PlantNo", PlantNo).execute()
+    return res.data or None
+
+def LoadPlantTags(CropNo: int, Strain: str) -> Optional[List[dict]]:
+    res = (sb.table("scaleplants").select("Strain", "PlantNo")
+           .eq("CropNo", CropNo).eq("Strain", Strain).execute())
+    return res.data or None
+
+def CountPlants(CropNo: int, Strain: str) -> int:
+    res = (sb.table("scaleplants").select("PlantNo", count="exact")
+           .eq("CropNo", CropNo).eq("Strain", Strain).execute())
+    if res.data:
+        return res.count if hasattr(res, 'count') else 0
+    return 0
+
+def IterPlantWeights(CropNo: int) -> Iterator[dict]:
+    """PlantNo, Strain, WetWeight and DryWeight of every plant in a crop, streamed."""
+    return Rows(lambda: sb.table("scaleplants").select("PlantNo,Strain,WetWeight,DryWeight").eq("CropNo", CropNo),
+                ["PlantNo"])
+
+def LoadPlantWeights(CropNo: int) -> List[dict]:
+    """PlantNo, Strain, WetWeight and DryWeight of every plant in a crop."""
+    return list(IterPlantWeights(CropNo))
+
+def UpdateWetWeight(PlantNo, WetWeight, WetDate: str = None) -> dict:
+    upd = {"WetWeight": WetWeight, "WetDate": WetDate or datetime.now().isoformat()}
+    res = sb.table("scaleplants").update(upd, returning="representation").eq("PlantNo", PlantNo).execute()
+    return res.data[0]
+
+def UpdateDryWeight(PlantNo, DryWeight, DryDate: str = None) -> dict:
+    upd = {"DryWeight": DryWeight, "DryDate": DryDate or datetime.now().isoformat()}
+    res = sb.table("scaleplants").update(upd, returning="representation").eq("PlantNo", PlantNo).execute()
+    return res.data[0]
+
+def WeighPlant(PlantNo, PlantType: str, Weight: int, ScaleDate: str = None, Overwrite: bool = False) -> dict:
+    """Record a wet or dry weight and its scalelog row in one round trip.
+
+    Runs the scale.weigh_plant function (Common/sql/weigh_plant.sql), which
+    updates scaleplants and appends to scalelog in one transaction. Returns
+    {"status": ..., "strain": ..., "previous": ...} where status is
+    "recorded", "missing" (no such plant) or "exists": the plant already has
+    this weight, nothing was written, and Overwrite=True will replace it.
+    A repeated call with the same ScaleDate doesn't log the weight twice.
+    """
+    params = {
+        "p_plant_no": str(PlantNo),
+        "p_plant_type": PlantType.lower(),
+        "p_weight": int(Weight),
+        "p_scale_date": ScaleDate or datetime.now().isoformat(),
+        "p_overwrite": bool(Overwrite),
+    }
+    return sb.rpc("weigh_plant", params).execute().data
+
+def InsertScaleLog(PlantNo: str, Strain: str, PlantType: str, Weight: int, ScaleDate: str = None):
+    data = {
+        "PlantNo": PlantNo,
+        "Strain": Strain,
+        "PlantType": PlantType,
+        "Weight": Weight,
+        "ScaleDate": ScaleDate or datetime.now().isoformat()
+    }
+    return sb.table("scalelog").insert(data).execute()
+
+
+#################################################################################################
+#
+# Bucked totes and Metric tags
+#
+# scalebuck Table:    CropNo, Strain, ToteNo, TagNo, Weight, BuckDate
+# metrictags Table:   TagNo (every tag Metric has issued to us)
+#
+#################################################################################################
+
+def LoadTotes(CropNo: int, Strain: str) -> List[str]:
+    res = (sb.table("scalebuck").select("ToteNo")
+            .eq("CropNo", CropNo).eq("Strain", Strain)
+            .order("ToteNo", desc=True).execute())
+    return ["Select"] + [str(c.get("ToteNo")) for c in res.data or []]
+
+def GetNewToteNo(CropNo: int, Strain: str) -> int:
+    """Reserve the next tote number for the crop/strain."""
+    return NextNumber("tote", f"{CropNo}/{Strain}")
+
+def CheckTag(TagNo: str) -> bool:
+    """Check if a tag number exists in the metrictags table (was issued by Metric)."""
+    res = sb.table("metrictags").select("TagNo").eq("TagNo", TagNo).execute()
+    return bool(res.data)
+
+def GetOneTag(CropNo: int, Strain: str, TagNo: str):
+    """Get weight data for a specific metric tag if it has been used."""
+    res = (sb.table("scalebuck").select("Weight")
+           .eq("CropNo", CropNo).eq("Strain", Strain).eq("TagNo", TagNo).execute())
+    if res.data:
+        return res.data[0].get("Weight")
+    return None
+
+def InsertNewTag(CropNo: int, Strain: str, TagNo: str, Weight, BuckDate: str = None):
+    """Insert a new metric tag with weight data."""
+    data = {
+        "CropNo": CropNo,
+        "Strain": Strain,
+        "TagNo": TagNo,
+        "Weight": Weight,
+        "BuckDate": BuckDate or datetime.now().isoformat()
+    }
+    return sb.table("scalebuck").insert(data).execute()
+
+def UpdateTagWeight(CropNo: int, Strain: str, TagNo: str, Weight) -> List[dict]:
+    """Update the weight for an existing metric tag."""
+    res = (sb.table("scalebuck").update({"Weight": Weight}, returning="representation")
+           .eq("CropNo", CropNo).eq("Strain", Strain).eq("TagNo", TagNo).execute())
+    return res.data
+
+def LoadMetricTags(AfterTagNo: Optional[str] = None, Limit: int = 1000) -> List[str]:
+    """Issued tag numbers above AfterTagNo, in order, at most Limit of them.
+
+    Metric issues tags in ascending order, so the largest TagNo already held
+    works as a high-water mark for fetching only the new ones.
+    """
+    q = sb.table("metrictags").select("TagNo")
+    if AfterTagNo:
+        q = q.gt("TagNo", AfterTagNo)
+    res = q.order("TagNo").limit(Limit).execute()
+    return [row["TagNo"] for row in res.data or [] if row.get("TagNo")]
+
+def LoadBuckTags(CropNo: int, Since: Optional[str] = None) -> List[dict]:
+    """Tags already weighed for a crop: rows of Strain, TagNo, Weight, BuckDate.
+
+    With Since (a BuckDate), only rows bucked at or after it.
+    """
+    def query():
+        q = sb.table("scalebuck").select("Strain,TagNo,Weight,BuckDate").eq("CropNo", CropNo)
+        return q.gte("BuckDate", Since) if Since else q
+    return list(Rows(query, ["BuckDate", "TagNo"]))
+
+
+#################################################################################################
+#
+# Batch ids
+#
+# batchtable Table:   CropNo, Strain, BatchType, BatchId
+#
+#################################################################################################
+
+def LoadOneBatch(CropNo: int, Strain: str) -> List[dict]:
+    res = (sb.table("batchtable").select("BatchId", "BatchType")
+            .eq("CropNo", CropNo).eq("Strain", Strain)
+            .order("BatchId", desc=True).execute())
+    return res.data
+
+def LoadAllBatches(CropNo: int) -> List[dict]:
+    return list(Rows(lambda: sb.table("batchtable").select("Strain,BatchType,BatchId").eq("CropNo", CropNo),
+                     ["Strain", "BatchType", "BatchId"]))
+
+def LoadBatches(CropNo: int, Strain: str) -> List[str]:
+    """Batch ids for a crop/strain as "BatchId (BatchType)" labels, after "Select"."""
+    batches = ["Select"]
+    res = (sb.table("batchtable").select("BatchId", "BatchType")
+           .eq("CropNo", CropNo).eq("Strain", Strain).order("BatchId").execute())
+    for row in res.data or []:
+        batch_id = row.get("BatchId")
+        batch_type = row.get("BatchType")
+        batches.append(f"{batch_id} ({batch_type})" if batch_type else batch_id)
+    return batches
+
+def InsertBatchId(CropNo: int, Strain: str, BatchType: str, BatchId: str):
+    data = {
+        "CropNo": CropNo,
+        "Strain": Strain,
+        "BatchType": BatchType,
+        "BatchId": BatchId
+    }
+    return sb.table("batchtable").insert(data).execute()
+
+def UpdateBatchId(CropNo: int, Strain: str, BatchType: str, BatchId: str) -> List[dict]:
+    res = (sb.table("batchtable").update({"BatchId": BatchId}, returning="representation")
+           .eq("CropNo", CropNo).eq("Strain", Strain).eq("BatchType", BatchType).execute())
+    return res.data
+
+def UpdateBatchRow(CropNo: int, Strain: str, BatchType: str, OldBatchId: str, NewBatchId: str) -> List[dict]:
+    """Update a single batchtable row identified by the old BatchId value.
+
+    This allows multiple BatchId rows to exist for the same Crop/Strain/BatchType
+    and updates only the specific row the user selected.
+    """
+    res = (sb.table("batchtable").update({"BatchId": NewBatchId}, returning="representation")
+           .eq("CropNo", CropNo)
+           .eq("Strain", Strain)
+           .eq("BatchType", BatchType)
+           .eq("BatchId", OldBatchId)
+           .execute())
+    return res.data
+
+
+#################################################################################################
+#
+# Trimmers, daily trim and trim rates
+#
+# scaletrimmers Table:  id, TrimmerName, TrimmerStat ('Active'/'Inactive')
+# dailytrim Table:      TrimmerName, TrimDate, CropNo, Strain, AmPm, FlowerGrams, SmallsGrams,
+#                       StartTime, EndTime, BatchId
+# trimrates Table:      CropNo, Strain, BigsRate
+# dailytrim_rollup Table: TrimDate, TrimmerName, CropNo, Strain, FlowerGrams, SmallsGrams,
+#                       StartTime, EndTime, Hours, Sessions (kept by a trigger on dailytrim)
+#
+#################################################################################################
+
+DAILYTRIM_COLUMNS = "TrimmerName,TrimDate,CropNo,Strain,AmPm,FlowerGrams,SmallsGrams,StartTime,EndTime"
+
+@RefCache.Cached("scaletrimmers")
+def LoadTrimmers() -> List[str]:
+    """Active trimmer names, sorted, after "Select"."""
+    res = sb.table("scaletrimmers").select("TrimmerName").eq("TrimmerStat", 'Active').execute()
+    trimmers = sorted({row["TrimmerName"] for row in res.data if row.get("TrimmerName")}) if res.data else []
+    return ["Select"] + trimmers
+
+def GetTrimmers() -> List[dict]:
+    res = (sb.table("scaletrimmers").select("id,TrimmerName,TrimmerStat")
+           .order("TrimmerStat").order("TrimmerName").execute())
+    return res.data or []
+
+def AddTrimmer(trimmer_name: str, trimmer_stat: str) -> dict:
+    ins = {"TrimmerName": trimmer_name, "TrimmerStat": trimmer_stat}
+    res = sb.table("scaletrimmers").insert(ins, returning="representation").execute()
+    RefCache.Invalidate("scaletrimmers")
+    return res.data[0]
+
+def UpdateTrimmer(row_id: int, trimmer_name: str, trimmer_stat: str) -> dict:
+    upd = {"TrimmerName": trimmer_name, "TrimmerStat": trimmer_stat}
+    res = sb.table("scaletrimmers").update(upd, returning="representation").eq("id", row_id).execute()
+    RefCache.Invalidate("scaletrimmers")
+    return res.data[0]
+
+@RefCache.Cached("scaletrimmers")
+def GetTrimmerList() -> List[str]:
+    """Active trimmer names ordered by name, without duplicates."""
+    res = (sb.table("scaletrimmers").select("TrimmerName,TrimmerStat")
+           .eq("TrimmerStat", "Active").order("TrimmerName").execute())
+    names = []
+    seen = set()
+    for r in res.data or []:
+        name = r.get("TrimmerName")
+        if name and name not in seen:
+            names.append(name)
+            seen.add(name)
+    return names
+
+def _ShiftHours(AmPm: str) -> Tuple[str, str]:
+    """Default StartTime, EndTime of a new session."""
+    return ("08:00", "12:00") if AmPm == "Morning" else ("13:00", "17:00")
+
+def SaveDailyTrim(Rows: List[dict]) -> List[dict]:
+    """Insert or merge many trimmer sessions in one request (scale.upsert_dailytrim,
+    Common/sql/upsert_dailytrim.sql).
+
+    Each row has TrimmerName, TrimDate, CropNo, Strain, AmPm, FlowerGrams,
+    SmallsGrams and optionally StartTime/EndTime (default by AmPm). A session is
+    keyed on all five of the first; a zero gram field keeps what is recorded.
+    Returns one {"Row", "Status", "Flower", "Smalls", "Error"} per row, in order,
+    Status being "inserted", "updated" or "error".
+    """
+    payload = []
+    for row in Rows:
+        start, end = _ShiftHours(row.get("AmPm"))
+        trim_date = row.get("TrimDate")
+        payload.append({
+            "TrimmerName": row.get("TrimmerName"),
+            "TrimDate": trim_date.isoformat() if hasattr(trim_date, "isoformat") else trim_date,
+            "CropNo": int(row.get("CropNo")),
+            "Strain": row.get("Strain"),
+            "AmPm": row.get("AmPm"),
+            "FlowerGrams": float(row.get("FlowerGrams") or 0),
+            "SmallsGrams": float(row.get("SmallsGrams") or 0),
+            "StartTime": row.get("StartTime") or start,
+            "EndTime": row.get("EndTime") or end,
+        })
+    if not payload:
+        return []
+    return sb.rpc("upsert_dailytrim", {"p_rows": payload}).execute().data or []
+
+def _SaveOneSession(row: dict) -> dict:
+    result = SaveDailyTrim([row])[0]
+    if result.get("Status") == "error":
+        raise RuntimeError(result.get("Error"))
+    return result
+
+def SaveTrimmer(trimmer, flower_grams, smalls_grams, crop_no, strain, trimdate, ampm, StartTime, EndTime):
+    """Add a trimmer's grams for one session; a zero keeps what is already recorded."""
+    return _SaveOneSession({
+        "TrimmerName": trimmer, "TrimDate": trimdate, "CropNo": crop_no, "Strain": strain, "AmPm": ampm,
+        "FlowerGrams": flower_grams, "SmallsGrams": smalls_grams, "StartTime": StartTime, "EndTime": EndTime,
+    })
+
+# dailytrim in report order; TrimmerName and CropNo make the keys a whole session
+TRIM_SUMMARY_KEYS = ["TrimDate", "Strain", "AmPm.desc", "TrimmerName", "CropNo"]
+
+def _TrimFilters(q, trimmer_name=None, crop_no=None, strain=None):
+    """q narrowed on the server to a trimmer, crop and strain (each optional)."""
+    if trimmer_name:
+        q = q.eq("TrimmerName", trimmer_name)
+    if crop_no is not None:
+        q = q.eq("CropNo", int(crop_no))
+    if strain:
+        q = q.eq("Strain", strain)
+    return q
+
+def IterTrimSummary(trimmer_name=None, start_date=None, end_date=None, crop_no=None, strain=None) -> Iterator[dict]:
+    def query():
+        q = _TrimFilters(sb.table("dailytrim").select(DAILYTRIM_COLUMNS), trimmer_name, crop_no, strain)
+        if start_date and end_date:
+            q = q.gte("TrimDate", start_date.isoformat()).lte("TrimDate", end_date.isoformat())
+        return q
+    return Rows(query, TRIM_SUMMARY_KEYS)
+
+def GetTrimSummary(trimmer_name=None, start_date=None, end_date=None, crop_no=None, strain=None) -> List[dict]:
+    return list(IterTrimSummary(trimmer_name, start_date, end_date, crop_no, strain))
+
+TRIM_ROLLUP_KEYS = ["TrimDate", "TrimmerName", "CropNo", "Strain"]
+
+def LoadTrimRollup(start_date, end_date, trimmer_name=None, crop_no=None, strain=None,
+                   group_by: Optional[Sequence[str]] = None) -> List[dict]:
+    """Each trimmer's day on each crop/strain between the dates: summed grams,
+    first StartTime, last EndTime and Hours worked, as kept on every dailytrim
+    write (dailytrim_rollup table, Common/sql/dailytrim_rollup.sql).
+
+    trimmer_name, crop_no and strain narrow it on the server. group_by (some of
+    TRIM_ROLLUP_KEYS) merges the rows that share those columns, in that order;
+    with the filters fixing the others that costs nothing, e.g. crop_no, strain
+    and group_by=("TrimDate", "TrimmerName") for one strain's days per trimmer.
+    """
+    def query():
+        q = (sb.table("dailytrim_rollup")
+             .select("TrimDate,TrimmerName,CropNo,Strain,FlowerGrams,SmallsGrams,StartTime,EndTime,Hours,Sessions")
+             .gte("TrimDate", start_date.isoformat()).lte("TrimDate", end_date.isoformat()))
+        return _TrimFilters(q, trimmer_name, crop_no, strain)
+    if not group_by:
+        return list(Rows(query, TRIM_ROLLUP_KEYS))
+
+    groups = {}
+    for r in Rows(query, list(group_by) + [k for k in TRIM_ROLLUP_KEYS if k not in group_by]):
+        key = tuple(r.get(k) for k in group_by)
+        g = groups.get(key)
+        if g is None:
+            groups[key] = dict({k: r.get(k) for k in group_by}, FlowerGrams=float(r.get("FlowerGrams") or 0),
+                               SmallsGrams=float(r.get("SmallsGrams") or 0), StartTime=r.get("StartTime"),
+                               EndTime=r.get("EndTime"), Hours=float(r.get("Hours") or 0),
+                               Sessions=int(r.get("Sessions") or 0))
+            continue
+        g["FlowerGrams"] += float(r.get("FlowerGrams") or 0)
+        g["SmallsGrams"] += float(r.get("SmallsGrams") or 0)
+        g["Hours"] += float(r.get("Hours") or 0)
+        g["Sessions"] += int(r.get("Sessions") or 0)
+        if r.get("StartTime") and (not g["StartTime"] or r["StartTime"] < g["StartTime"]):
+            g["StartTime"] = r["StartTime"]
+        if r.get("EndTime") and (not g["EndTime"] or r["EndTime"] > g["EndTime"]):
+            g["EndTime"] = r["EndTime"]
+    return list(groups.values())
+
+def RebuildTrimRollup(start_date=None, end_date=None, fix: bool = True) -> int:
+    """How many dailytrim_rollup rows between the dates (None = open) differ
+    from dailytrim; with fix, that range is recomputed from dailytrim."""
+    return int(sb.rpc("rebuild_dailytrim_rollup", {
+        "p_from": start_date.isoformat() if start_date else None,
+        "p_to": end_date.isoformat() if end_date else None,
+        "p_fix": fix,
+    }).execute().data or 0)
+
+def LoadFlowerTrimRecords(crop_no: int, strain: str) -> List[dict]:
+    return list(Rows(lambda: (sb.table("dailytrim")
+                              .select("TrimmerName,TrimDate,CropNo,Strain,AmPm,FlowerGrams,SmallsGrams,BatchId")
+                              .eq("CropNo", crop_no).eq("Strain", strain)),
+                     ["TrimDate", "TrimmerName", "AmPm"]))
+
+def UpdateTrimBatchId(CropNo: int, Strain: str, BatchId: str):
+    """Update BatchId for matching dailytrim rows."""
+    return sb.table("dailytrim").update({"BatchId": BatchId}).match({"CropNo": CropNo, "Strain": Strain}).execute()
+
+def GetOneTrimDay(TrimmerName, TrimDate, CropNo=None, Strain=None) -> List[dict]:
+    q = sb.table("dailytrim").select(DAILYTRIM_COLUMNS).eq("TrimmerName", TrimmerName).eq("TrimDate", TrimDate)
+    if CropNo is not None:
+        q = q.eq("CropNo", CropNo)
+    if Strain is not None:
+        q = q.eq("Strain", Strain)
+    return q.execute().data or []
+
+def UpdateDailyTrim(TrimmerName, TrimDate, CropNo, Strain, FlowerGrams, SmallsGrams, AmPm):
+    """Set the grams for one trimmer session, adding the row (with default hours) if missing.
+
+    A zero keeps what is already recorded; EditDailyTrim's UpdateDailytrim can set a zero.
+    """
+    return _SaveOneSession({
+        "TrimmerName": TrimmerName, "TrimDate": TrimDate, "CropNo": CropNo, "Strain": Strain, "AmPm": AmPm,
+        "FlowerGrams": FlowerGrams, "SmallsGrams": SmallsGrams,
+    })
+
+def SelectDailytrim(trim_date=None, trimmer=None, ampm=None, start_date=None, end_date=None) -> List[dict]:
+    """Rows of the dailytrim table using filters: one trim_date, or every
+    day from start_date to end_date (inclusive), a page at a time.
+
+    Ordered by TrimDate, TrimmerName, Strain, then AmPm and CropNo."""
+    def query():
+        q = sb.table("dailytrim").select(DAILYTRIM_COLUMNS)
+        if trim_date:
+            q = q.eq("TrimDate", trim_date)
+        if start_date:
+            q = q.gte("TrimDate", str(start_date))
+        if end_date:
+            q = q.lte("TrimDate", str(end_date))
+        if trimmer:
+            q = q.ilike("TrimmerName", trimmer)
+        if ampm:
+            q = q.eq("AmPm", ampm)
+        return q
+    return list(Rows(query, ["TrimDate", "TrimmerName", "Strain", "AmPm.desc", "CropNo"]))
+
+def UpdateDailytrim(match_key: dict, new_values: dict):
+    """Update one row based on the match key."""
+    return sb.table("dailytrim").update(new_values).match(match_key).execute()
+
+@RefCache.Cached("trimrates", persist=False)
+def GetRatesMap() -> Dict[Tuple[int, str], float]:
+    """(CropNo, Strain) -> BigsRate, the per-gram rate for Flower/Bigs pay."""
+    res = sb.table("trimrates").select("CropNo,Strain,BigsRate").execute()
+    rates = {}
+    for r in res.data or []:
+        key = (int(r.get("CropNo")), (r.get("Strain") or "").strip())
+        rates[key] = float(r.get("BigsRate") or 0.0)
+    return rates
+
+def LoadTrimRates(CropNo: int) -> List[dict]:
+    """Strain and BigsRate for every strain of a crop that has a rate."""
+    res = sb.table("trimrates").select("Strain,BigsRate").eq("CropNo", CropNo).order("Strain").execute()
+    return res.data or []
+
+def EnsureTrimRates(CropNo: int, Strains: List[str], DefaultRate: float = 0.36) -> int:
+    """Give every strain without a trimrates row the default rate; return how many were added."""
+    res = sb.table("trimrates").select("Strain").eq("CropNo", CropNo).execute()
+    have = {row.get("Strain") for row in res.data or []}
+    missing = [{"CropNo": int(CropNo), "Strain": s, "BigsRate": DefaultRate} for s in Strains if s not in have]
+    if missing:
+        sb.table("trimrates").insert(missing).execute()
+        RefCache.Invalidate("trimrates")
+    return len(missing)
+
+def UpdateTrimRate(CropNo: int, Strain: str, BigsRate: float):
+    res = sb.table("trimrates").update({"BigsRate": BigsRate}).eq("CropNo", CropNo).eq("Strain", Strain).execute()
+    RefCache.Invalidate("trimrates")
+    return res
+
+
+#################################################################################################
+#
+# Trim bags
+#
+# scaletrim Table:    TagNo, CropNo, Strain, Type, MetrcId, Weight, TrimDate
+#
+#################################################################################################
+
+def CheckTrimBag(CropNo: int, Strain: str, MetrcId: str) -> str:
+    """"OkToAdd" if the Metrc tag is unused, "InUse" if this crop/strain already
+    has it, "Error" if another crop or strain does."""
+    res = sb.table("scaletrim").select("CropNo,Strain,MetrcId").eq("MetrcId", MetrcId).execute()
+    ReturnVal = "OkToAdd"
+    for row in res.data or []:
+        if row.get("CropNo") == CropNo and row.get("Strain") == Strain:
+            ReturnVal = "InUse"
+        else:
+            return "Error"
+    return ReturnVal
+
+def InsertTrimBag(CropNo: int, Strain: str, Type: str, MetrcId: str, Weight, TrimDate) -> dict:
+    data = {
+        "CropNo": int(CropNo),
+        "Strain": Strain,
+        "Type": Type,
+        "MetrcId": MetrcId,
+        "Weight": int(Weight),
+        "TrimDate": TrimDate
+    }
+    res = sb.table("scaletrim").insert(data).execute()
+    return res.data[0]
+
+def UpdateTrimBag(TagNo: int, Weight: float) -> dict:
+    """Update weight for a given TagNo."""
+    res = sb.table("scaletrim").update({"Weight": Weight}, returning="representation").eq("TagNo", TagNo).execute()
+    return res.data[0]
+
+
+#################################################################################################
+#
+# Packaging
+#
+# packagetypes Table: id, PackageType, UnitWeight
+# packages Table:     CropNo, Strain, CaseNo, MetrcID, PackageType, TotUnits, TotWeight, PackDate
+#
+#################################################################################################
+
+PACKAGE_COLUMNS = ("CropNo", "Strain", "CaseNo", "MetrcID", "PackageType", "TotUnits", "TotWeight", "PackDate")
+
+@RefCache.Cached("packagetypes")
+def LoadPackageTypes() -> List[dict]:
+    res = sb.table("packagetypes").select("id,PackageType,UnitWeight").order("PackageType").execute()
+    return res.data or []
+
+def InsertPackageType(PackageType: str, UnitWeight: float) -> List[dict]:
+    data = {
+        "PackageType": PackageType,
+        "UnitWeight": UnitWeight,
+    }
+    res = sb.table("packagetypes").insert(data).execute()
+    RefCache.Invalidate("packagetypes")
+    return res.data
+
+def UpdatePackageType(row_id: int, PackageType: str, UnitWeight: float) -> List[dict]:
+    data = {
+        "PackageType": PackageType,
+        "UnitWeight": UnitWeight,
+    }
+    res = sb.table("packagetypes").update(data).eq("id", row_id).execute()
+    RefCache.Invalidate("packagetypes")
+    return res.data
+
+@RefCache.Cached("packagetypes")
+def GetPackageWeight(PackageType: str):
+    """Unit weight (grams) for the package type, or None."""
+    res = sb.table("packagetypes").select("UnitWeight").eq("PackageType", PackageType).execute()
+    if res.data:
+        return res.data[0].get("UnitWeight")
+    return None
+
+def GetPackages(CropNo, Strain) -> List[dict]:
+    return list(Rows(lambda: sb.table("packages").select(*PACKAGE_COLUMNS).eq("CropNo", CropNo).eq("Strain", Strain),
+                     ["PackageType", "CaseNo", "MetrcID"]))
+
+def GetOnePackage(CropNo, Strain, PackageType, CaseNo) -> List[dict]:
+    res = (sb.table("packages").select(*PACKAGE_COLUMNS)
+           .eq("CropNo", CropNo).eq("Strain", Strain)
+           .eq("PackageType", PackageType).eq("CaseNo", CaseNo)
+           .execute())
+    return res.data or []
+
+_CaseBlocks = {}        # "CropNo/Strain/PackageType" -> [next reserved, last reserved]
+_CaseLock = threading.Lock()
+
+def CaseBlockSize() -> int:
+    """Case numbers this station reserves at a time: "case_number_block" in
+    Common/config.json, default 1. A packing line that sets it higher numbers
+    new cases without a round trip; numbers unused when the screen closes are skipped."""
+    try:
+        with open(CONFIG_PATH, "r") as f:
+            return max(1, int(json.load(f).get("case_number_block", 1)))
+    except (OSError, ValueError, TypeError):
+        return 1
+
+def GetNewCaseNo(CropNo, Strain, PackageType) -> str:
+    """Reserve the next case number for the crop/strain/package type."""
+    scope = f"{CropNo}/{Strain}/{PackageType}"
+    with _CaseLock:
+        block = _CaseBlocks.get(scope)
+        if block is None or block[0] > block[1]:
+            size = CaseBlockSize()
+            first = NextNumber("case", scope, size)
+            block = _CaseBlocks[scope] = [first, first + size - 1]
+        case_no = block[0]
+        block[0] += 1
+    return str(case_no)
+
+def InsertPackage(CropNo, Strain, CaseNo, MetrcID, PackageType, TotUnits, TotWeight, PackDate: str = None) -> List[dict]:
+    # Accept PackDate as ISO string; if missing, use current timestamp
+    if PackDate is None:
+        PackDate = datetime.now().isoformat()
+    data = {
+        "CropNo": CropNo,
+        "Strain": Strain,
+        "CaseNo": CaseNo,
+        "MetrcID": MetrcID,
+        "PackageType": PackageType,
+        "TotUnits": TotUnits,
+        "TotWeight": TotWeight,
+        "PackDate": PackDate,
+    }
+    return sb.table("packages").insert(data).execute().data
+
+def LoadCases(CropNo, Strain, PackageType):
+    """(["Select", "New Case", CaseNo...], MetrcID of the last case or None)"""
+    cases = ["Select", "New Case"]
+    metrc = None
+    res = (sb.table("packages").select("CaseNo", "MetrcID")
+           .eq("CropNo", CropNo).eq("Strain", Strain).eq("PackageType", PackageType)
+           .order("CaseNo").execute())
+    for row in res.data or []:
+        metrc = row.get("MetrcID")
+        cases.append(str(row.get("CaseNo")))
+    return cases, metrc
+
+
+#################################################################################################
+#
+# Hash Run functions
+#
+# hashbatch Table: 	BatchId, Type, Status (In Process, Finished), BatchDate
+# hashruns Table:	BatchId, RunNo, CropNo, Strain, Source, StartWeight, EndWeight
+#
+#################################################################################################
+
+def NewHashBatch(BatchId: str, Type: str) -> List[dict]:
+    data = {
+        "BatchId": BatchId,
+        "Type": Type,
+        "Status": "In Process",
+    }
+    return sb.table("hashbatch").insert(data).execute().data
+
+def GetHashBatches(Type: str) -> List[str]:
+    res = sb.table("hashbatch").select("BatchId").eq("Type", Type).order("BatchId").execute()
+    return [row["BatchId"] for row in res.data or [] if row.get("BatchId") is not None]
+
+def GetOneBatch(BatchId: str) -> List[dict]:
+    res = (sb.table("hashbatch").select("Type, BatchDate")
+           .eq("BatchId", BatchId).order("BatchId", desc=True).execute())
+    return res.data
+
+def GetRunNos(BatchId: str) -> List[int]:
+    res = sb.table("hashruns").select("RunNo").eq("BatchId", BatchId).order("RunNo", desc=True).execute()
+    return [row["RunNo"] for row in res.data or [] if row.get("RunNo") is not None]
+
+def NewHashRun(BatchId: str) -> dict:
+    """Number and insert a new, empty hash run in one call; returns the new row."""
+    return sb.rpc("new_hash_run", {"p_batch": BatchId}).execute().data[0]
+
+def GetRunRec(BatchId: str, RunNo: int) -> Optional[dict]:
+    res = (sb.table("hashruns").select("CropNo, Strain, Source, StartWeight, EndWeight")
+           .eq("BatchId", BatchId).eq("RunNo", RunNo).execute())
+    if res.data:
+        return res.data[0]
+    return None
+
+def GetRuns(BatchId: str) -> List[dict]:
+    res = (sb.table("hashruns").select("RunNo, CropNo, Strain, Source, StartWeight, EndWeight")
+           .eq("BatchId", BatchId).order("RunNo").execute())
+    return res.data or []
+
+def SaveHashStartWeight(BatchId: str, RunNo: int, CropNo: str, Strain: str, Source: str, StartWeight: float) -> List[dict]:
+    upd = {
+        "CropNo": CropNo,
+        "Strain": Strain,
+        "Source": Source,
+        "StartWeight": StartWeight
+    }
+    return sb.table("hashruns").update(upd).eq("BatchId", BatchId).eq("RunNo", RunNo).execute().data
+
+def SaveHashEndWeight(BatchId: str, RunNo: int, EndWeight: float) -> List[dict]:
+    return (sb.table("hashruns").update({"EndWeight": EndWeight})
+            .eq("BatchId", BatchId).eq("RunNo", RunNo).execute().data)
+
+def _Grams(value) -> float:
+    try:
+        return float(value) if value is not None else 0.0
+    except Exception:
+        return 0.0
+
+def GetHashLabelData(BatchId: str):
+    """(BatchDate, NumStrains, Strain1..Strain4, TotalGrams) for a hash batch label.
+
+    Strains are the distinct (Strain, Source) pairs of its runs; TotalGrams sums EndWeight.
+    """
+    res = GetOneBatch(BatchId)
+    BatchDate = res[0].get("BatchDate") if res else None
+    rows = sb.table("hashruns").select("Strain, Source, EndWeight").eq("BatchId", BatchId).execute().data or []
+    seen = set()
+    strains = []
+    TotalGrams = 0.0
+    for r in rows:
+        strain = r.get("Strain") or ""
+        key = (strain, r.get("Source") or "")
+        if key not in seen:
+            seen.add(key)
+            strains.append(strain)
+        TotalGrams += _Grams(r.get("EndWeight"))
+    Strain1, Strain2, Strain3, Strain4 = (strains + ["", "", "", ""])[:4]
+    return (BatchDate, len(strains), Strain1, Strain2, Strain3, Strain4, TotalGrams)
+
+def GetHashBatchStrain(BatchId: str) -> str:
+    """The batch's strain, or "Mixed" when its runs came from more than one."""
+    (BatchDate, NumStrains, Strain1, Strain2, Strain3, Strain4, TotalGrams) = GetHashLabelData(BatchId)
+    if NumStrains > 1:
+        return "Mixed"
+    return Strain1
+
+
+#################################################################################################
+#
+# Rosin Run functions
+#
+# rosinbatch Table:   BatchId, Type, Status (In Process, Finished), BatchDate
+# rosinruns Table:	  BatchId, RunNo, Source, StartWeight, EndWeight
+#
+#################################################################################################
+
+def NewRosinBatch(BatchId: str) -> List[dict]:
+    data = {
+        "BatchId": BatchId,
+        "Type": "Rosin",
+        "Status": "In Process",
+    }
+    return sb.table("rosinbatch").insert(data).execute().data
+
+def GetRosinBatches() -> List[str]:
+    res = sb.table("rosinbatch").select("BatchId").order("BatchId").execute()
+    return ["Select", "New"] + [row.get("BatchId") for row in res.data or []]
+
+def GetRosinRunNos(BatchId: str) -> list:
+    res = sb.table("rosinruns").select("RunNo").eq("BatchId", BatchId).order("RunNo", desc=True).execute()
+    return ["Select", "New"] + [row.get("RunNo") for row in res.data or []]
+
+def NewRosinRun(BatchId: str) -> dict:
+    """Number and insert a new, empty rosin run in one call; returns the new row."""
+    return sb.rpc("new_rosin_run", {"p_batch": BatchId}).execute().data[0]
+
+def GetRosinRunRec(BatchId: str, RunNo: int) -> Optional[dict]:
+    res = (sb.table("rosinruns").select("Source, StartWeight, EndWeight")
+           .eq("BatchId", BatchId).eq("RunNo", RunNo).execute())
+    if res.data:
+        return res.data[0]
+    return None
+
+def LoadSourceCombo() -> List[str]:
+    """Hash batches a rosin run can be pressed from, after "Select"."""
+    res = sb.table("hashbatch").select("BatchId").order("BatchId").execute()
+    return ["Select"] + [row["BatchId"] for row in res.data or [] if row.get("BatchId") is not None]
+
+def GetRosinRuns(BatchId: str) -> List[dict]:
+    res = (sb.table("rosinruns").select("RunNo, Source, StartWeight, EndWeight")
+           .eq("BatchId", BatchId).order("RunNo").execute())
+    return res.data or []
+
+def SaveRosinStartWeight(BatchId: str, RunNo: int, Source: str, StartWeight: float) -> List[dict]:
+    upd = {
+        "Source": Source,
+        "StartWeight": StartWeight
+    }
+    return sb.table("rosinruns").update(upd).eq("BatchId", BatchId).eq("RunNo", RunNo).execute().data
+
+def SaveRosinEndWeight(BatchId: str, RunNo: int, EndWeight: float) -> List[dict]:
+    return (sb.table("rosinruns").update({"EndWeight": EndWeight})
+            .eq("BatchId", BatchId).eq("RunNo", RunNo).execute().data)
+
+def GetRosinLabelData(BatchId: str):
+    """(BatchDate, Strain1..Strain4, TotalGrams) for a rosin batch label.
+
+    Each strain is a source hash batch as "BatchId (strain)"; TotalGrams sums EndWeight.
+    """
+    res = (sb.table("rosinbatch").select("BatchDate")
+           .eq("BatchId", BatchId).order("BatchId", desc=True).execute())
+    BatchDate = res.data[0].get("BatchDate") if res.data else None
+    rows = sb.table("rosinruns").select("Source, EndWeight").eq("BatchId", BatchId).execute().data or []
+    seen = set()
+    strains = []
+    TotalGrams = 0.0
+    for r in rows:
+        source = r.get("Source") or ""
+        if source not in seen:
+            seen.add(source)
+            strains.append(f"{source} ({GetHashBatchStrain(source)})")
+        TotalGrams += _Grams(r.get("EndWeight"))
+    Strain1, Strain2, Strain3, Strain4 = (strains + ["", "", "", ""])[:4]
+    return (BatchDate, Strain1, Strain2, Strain3, Strain4, TotalGrams)
+
+
+#################################################################################################
+#
+# SOP index
+#
+# sopindex Table:     Activity, SeqNo, FileName, Descr
+#
+#################################################################################################
+
+def GetSopActivities() -> List[str]:
+    """Ordered list of unique SOP Activity folder names."""
+    res = sb.table("sopindex").select("Activity").order("Activity").execute()
+    activities = []
+    for row in res.data or []:
+        if row["Activity"] not in activities:
+            activities.append(row["Activity"])
+    return activities
+
+def GetSopFiles(activity: str) -> List[Tuple[str, str]]:
+    """(FileName, Descr) of the SOP files for an activity, in SeqNo order."""
+    res = sb.table("sopindex").select("FileName, Descr").eq("Activity", activity).order("SeqNo").execute()
+    return [(row["FileName"], row["Descr"]) for row in res.data or []]
+
+def InsertSopIndex(activity: str, seq_no: int, file_name: str, descr: str) -> dict:
+    ins = {
+        "Activity": activity,
+        "SeqNo": seq_no,
+        "FileName": file_name,
+        "Descr": descr
+    }
+    return sb.table("sopindex").insert(ins).execute().data[0]
+
+def GetOneSopFile(activity: str, file_name: str) -> Optional[dict]:
+    res = (sb.table("sopindex").select("Activity, SeqNo, FileName, Descr")
+           .eq("Activity", activity).eq("FileName", file_name).execute())
+    if res.data:
+        return res.data[0]
+    return None
+
+def UpdateSopIndex(activity: str, file_name: str, seq_no: int, descr: str) -> List[dict]:
+    res = (sb.table("sopindex").update({"Descr": descr, "SeqNo": seq_no})
+           .eq("Activity", activity).eq("FileName", file_name).execute())
+    return res.data
+
+
+#################################################################################################
+#
+# Timing: wrap everything above (screens import the wrapped functions through SubSupa)
+#
+#################################################################################################
+
+QueryStats.Instrument(globals(), __name__)
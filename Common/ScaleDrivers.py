@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+"""Ohaus scale drivers.
+
+Every scale type is a ScaleDriver subclass registered in DRIVERS by name, with
+the USB ids used to find it. All drivers share one interface:
+
+    driver = RangerDriver(port)
+    driver.open()
+    reading = driver.read()     # (weight, unit, unstable) or None
+    driver.close()
+
+Ranger 3000 - command/response: each read() sends IP and waits for the reply.
+Scout SPX2201 - continuous: the scale streams lines; read() drains what is
+waiting and returns the newest reading seen so far.
+
+Set SCALE_SIM=Ranger (or Scout, or Ranger,Scout) to have FindScales() return
+drivers for simulated scales on pseudo-terminals instead of USB devices; see
+Common/SimScale.py for the trace, rate and noise settings.
+"""
+import os
+import serial
+import serial.tools.list_ports
+from Common.ScaleParser import FramedLineParser, ParseOhausLine
+
+OHAUS_VID = 1027
+RANGER_PID = 24577
+SCOUT_PID = 24597
+
+DRIVERS = {}
+
+def RegisterDriver(cls):
+    """Class decorator: make a driver available to FindScales by its name."""
+    DRIVERS[cls.name] = cls
+    return cls
+
+
+class ScaleDriver:
+    name = ""
+    vid = OHAUS_VID
+    pid = None
+    baudrate = 9600
+
+    def __init__(self, port: str, timeout: float = 2):
+        self.port = port
+        self.timeout = timeout
+        self.serial = None
+
+    @property
+    def connected(self) -> bool:
+        return self.serial is not None
+
+    def open(self):
+        self.serial = serial.Serial(port=self.port, baudrate=self.baudrate, timeout=self.timeout)
+        return self
+
+    def close(self):
+        if self.serial is not None:
+            try:
+                self.serial.close()
+            finally:
+                self.serial = None
+
+    def read(self):
+        """Return the current reading as (weight, unit, unstable), or None."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.port!r})"
+
+
+@RegisterDriver
+class RangerDriver(ScaleDriver):
+    """Ohaus Ranger 3000: ask for each reading with the IP (immediate print) command."""
+    name = "Ranger"
+    pid = RANGER_PID
+
+    def read(self):
+        self.serial.reset_input_buffer()
+        self.serial.write(b"IP\r\n")
+        return ParseOhausLine(self.serial.readline())
+
+
+@RegisterDriver
+class ScoutDriver(ScaleDriver):
+    """Ohaus Scout SPX2201 set to continuous output in grams."""
+    name = "Scout"
+    pid = SCOUT_PID
+
+    def __init__(self, port: str, timeout: float = 2):
+        super().__init__(port, timeout)
+        self.parser = FramedLineParser()
+        self.last = None
+
+    def read(self):
+        # Read whatever is waiting, don't block
+        data = self.serial.read(self.serial.in_waiting or 0)
+        if data:
+            reading = self.parser.feed(data)
+            if reading is not None:
+                self.last = reading
+        return self.last
+
+
+def FindScales():
+    """Return an unopened driver for every registered scale that is attached.
+
+    With SCALE_SIM set, simulated scales are started and returned instead.
+    """
+    if os.environ.get("SCALE_SIM"):
+        import Common.SimScale as SimScale
+        return SimScale.StartFromEnv()
+
+    found = []
+    for p in serial.tools.list_ports.comports():
+        for cls in DRIVERS.values():
+            if p.vid == cls.vid and p.pid == cls.pid:
+                found.append(cls(p.device))
+    return found
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""Incremental parser for the Ohaus continuous output stream.
+
+The Scout sends a line such as '   123.4 g  \r\n' several times a second.
+FramedLineParser keeps unread bytes in a fixed-size bytearray, so a backed-up
+port costs one copy per read instead of re-splitting a growing string, and only
+the newest complete line is parsed. Lines that do not parse are skipped and
+counted in `dropped`, as are bytes thrown away when the buffer overflows.
+"""
+
+def ParseOhausLine(line):
+    """Parse one Ohaus output line, e.g. '   1234 g ?', into (weight, unit, unstable).
+
+    Ohaus scales append '?' to readings taken while the display is still moving.
+    Accepts bytes (as read from the port) or str. Returns None if the line does
+    not hold a weight.
+    """
+    if isinstance(line, str):
+        line = line.encode("ascii", errors="ignore")
+    unstable = b"?" in line
+    parts = line.replace(b"?", b" ").split() if unstable else line.split()
+    if len(parts) < 2:
+        return None
+    try:
+        weight = float(parts[0])
+    except ValueError:
+        return None
+    return weight, parts[1].decode("ascii", errors="ignore"), unstable
+
+
+class FramedLineParser:
+    """Frame a byte stream into lines and return the newest valid reading.
+
+    capacity is the most unread bytes ever held; a partial line longer than
+    that is garbage (wrong baud rate, binary noise) and is discarded.
+    """
+
+    def __init__(self, capacity: int = 4096, terminator: bytes = b"\r\n", parse_line=ParseOhausLine):
+        self.capacity = capacity
+        self.terminator = terminator
+        self.parse_line = parse_line
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._len = 0
+        self.dropped = 0    # bytes discarded: unparsable lines and overflow
+        self.readings = 0   # valid readings returned
+
+    def reset(self):
+        self._len = 0
+
+    def feed(self, data):
+        """Add bytes from the port; return the newest valid reading or None.
+
+        A reading is whatever parse_line returns for the last complete line that
+        parses. Older complete lines in the same chunk are superseded, not parsed.
+        """
+        n = len(data)
+        if self._len + n <= self.capacity:
+            # common case: the read fits
+            self._buf[self._len:self._len + n] = data
+            self._len += n
+            reading = self._drain()
+            if reading is not None:
+                self.readings += 1
+            return reading
+
+        newest = None
+        data = memoryview(data)
+        while len(data):
+            room = self.capacity - self._len
+            if room == 0:
+                # no terminator anywhere in a full buffer
+                self.dropped += self._len
+                self._len = 0
+                room = self.capacity
+            take = min(room, len(data))
+            self._view[self._len:self._len + take] = data[:take]
+            self._len += take
+            data = data[take:]
+            reading = self._drain()
+            if reading is not None:
+                newest = reading
+        if newest is not None:
+            self.readings += 1
+        return newest
+
+    def _drain(self):
+        """Consume every complete line in the buffer; return the newest that parses."""
+        term = self.terminator
+        tlen = len(term)
+        last = self._buf.rfind(term, 0, self._len)
+        if last < 0:
+            return None
+        consumed = last + tlen
+
+        # walk back from the newest complete line until one parses
+        reading = None
+        end = last
+        while end >= 0:
+            start = self._buf.rfind(term, 0, end)
+            start = 0 if start < 0 else start + tlen
+            if end > start:
+                line = self._buf[start:end]
+                reading = self.parse_line(line)
+                if reading is not None:
+                    break
+                if line.strip():
+                    self.dropped += len(line) + tlen
+            end = start - tlen if start > 0 else -1
+
+        # keep the partial line at the tail
+        tail = self._len - consumed
+        if tail:
+            self._buf[0:tail] = self._buf[consumed:self._len]
+        self._len = tail
+        return reading
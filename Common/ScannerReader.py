@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""Background reader for the QR scanner.
+
+ScannerReader owns the scanner port on its own thread. It frames complete
+scans (a code ends at CR or LF, so a code split across two reads is held until
+its terminator arrives), drops accidental double-reads of the same code within
+`dedupe_seconds`, and queues the rest. Screens take scans from the queue with
+get(), or register on_scan() to have each scan delivered on the Tk thread.
+
+`port` is anything with a readline() that returns bytes and may time out
+part-way through a line: a serial.Serial opened with a timeout, or
+HardwareService.RemoteScanner.
+"""
+import queue
+import threading
+import time
+
+DEFAULT_DEDUPE_SECONDS = 1.0
+
+
+class ScannerReader:
+    def __init__(self, port, dedupe_seconds: float = DEFAULT_DEDUPE_SECONDS):
+        self.port = port
+        self.dedupe_seconds = dedupe_seconds
+        self.scans = queue.Queue()
+        self.duplicates = 0     # double-reads dropped
+        self.error = None       # exception that stopped the thread, if any
+        self._pending = b""
+        self._last_code = None
+        self._last_time = 0.0
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.alive:
+            return self
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="ScannerReader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get(self, timeout: float = None):
+        """Return the next scan, or None if none arrives (immediately when timeout is None)."""
+        try:
+            if timeout is None:
+                return self.scans.get_nowait()
+            return self.scans.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def on_scan(self, widget, callback):
+        """Call callback(code) on widget's Tk thread for every scan.
+
+        Scans delivered this way are not also left in the queue.
+        """
+        with self._lock:
+            self._listeners.append((widget, callback))
+
+    def remove_listener(self, callback):
+        with self._lock:
+            self._listeners = [(w, cb) for (w, cb) in self._listeners if cb != callback]
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                self.feed(self.port.readline())
+        except Exception as e:
+            self.error = e
+
+    def feed(self, data: bytes):
+        """Add raw bytes from the port and publish every complete scan in them."""
+        if not data:
+            return
+        self._pending += data.replace(b"\r", b"\n")
+        while b"\n" in self._pending:
+            line, self._pending = self._pending.split(b"\n", 1)
+            code = line.decode(errors="ignore").strip()
+            if code:
+                self._publish(code)
+
+    def _publish(self, code: str):
+        now = time.monotonic()
+        if code == self._last_code and now - self._last_time < self.dedupe_seconds:
+            self.duplicates += 1
+            self._last_time = now
+            return
+        self._last_code = code
+        self._last_time = now
+        with self._lock:
+            listeners = list(self._listeners)
+        if not listeners:
+            self.scans.put(code)
+            return
+        for widget, callback in listeners:
+            try:
+                widget.after(0, lambda cb=callback: cb(code))
+            except Exception:
+                # widget already destroyed
+                pass
@@ -0,0 +1,222 @@
+#!/usr/bin/python3
+"""Simulated Ohaus scale on a pseudo-terminal (Linux/macOS only).
+
+SimulatedScale plays a weight trace through a pty so the real drivers in
+Common/ScaleDrivers.py (and every weighing screen) can run with no scale
+attached. A trace is a list of (seconds, grams) steps: each load is placed on
+the pan, takes `settle` seconds to come to rest (reported with the Ohaus '?'
+unstable mark), then holds for the rest of its step. The trace loops.
+
+    Scout  - streams `rate` lines per second, like continuous print mode
+    Ranger - answers each IP command, `1/rate` seconds after it arrives
+
+Screens pick the simulator up from the environment (see StartFromEnv):
+
+    SCALE_SIM=Ranger            scales to simulate: Ranger, Scout or Ranger,Scout
+    SCALE_SIM_TRACE=trace.csv   lines of "seconds,grams" (default: DEFAULT_TRACE)
+    SCALE_SIM_RATE=10           lines or replies per second
+    SCALE_SIM_NOISE=0.5         standard deviation of reading noise in grams
+    SCALE_SIM_SETTLE=1.0        seconds each load takes to settle
+
+Run this file directly to read a simulated scale through its driver:
+
+    python Common/SimScale.py --mode Scout --rate 20 --noise 0.3 --seconds 5
+"""
+import argparse
+import os
+import random
+import select
+import sys
+import threading
+import time
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+from Common.ScaleDrivers import DRIVERS
+
+# empty pan, two plants and a tote
+DEFAULT_TRACE = [(3, 0), (5, 1250), (3, 0), (5, 874), (3, 0), (6, 4310)]
+
+SIMULATORS = []
+
+
+def LoadTrace(path: str):
+    """Read a trace file of 'seconds,grams' lines ('#' starts a comment)."""
+    trace = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            seconds, grams = line.split(",")[:2]
+            trace.append((float(seconds), float(grams)))
+    if not trace:
+        raise ValueError(f"No trace steps in {path}")
+    return trace
+
+
+class SimulatedScale:
+    def __init__(self, mode: str = "Ranger", trace=None, rate: float = 10.0,
+                 noise: float = 0.0, settle: float = 1.0, seed=None):
+        if mode not in DRIVERS:
+            raise ValueError(f"Unknown scale type {mode!r}; expected one of {sorted(DRIVERS)}")
+        self.mode = mode
+        self.trace = list(trace or DEFAULT_TRACE)
+        self.rate = rate
+        self.noise = noise
+        self.settle = settle
+        self.random = random.Random(seed)
+        self.port = None
+        self.lines_sent = 0
+        self._period = sum(seconds for seconds, grams in self.trace)
+        self._master = None
+        self._slave = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._t0 = 0.0
+
+    def start(self):
+        import pty
+        import tty
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._t0 = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"SimScale-{self.mode}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2)
+            self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master = self._slave = None
+
+    def driver(self, timeout: float = 2):
+        """Return an unopened driver of the matching type for this scale's port."""
+        return DRIVERS[self.mode](self.port, timeout)
+
+    def weight_at(self, t: float):
+        """Return (grams, unstable) shown t seconds into the trace."""
+        t = t % self._period if self._period > 0 else 0.0
+        previous = self.trace[-1][1]
+        for seconds, grams in self.trace:
+            if t < seconds:
+                if t < self.settle:
+                    return previous + (grams - previous) * (t / self.settle), True
+                return grams, False
+            t -= seconds
+            previous = grams
+        return self.trace[-1][1], False
+
+    def line(self, t: float) -> bytes:
+        grams, unstable = self.weight_at(t)
+        if self.noise:
+            grams += self.random.gauss(0, self.noise)
+        mark = "  ?" if unstable else ""
+        if self.mode == "Ranger":
+            return f"{grams:9.0f} g{mark}\r\n".encode()
+        return f"{grams:10.1f} g{mark}\r\n".encode()
+
+    def _send(self):
+        os.write(self._master, self.line(time.monotonic() - self._t0))
+        self.lines_sent += 1
+
+    def _run(self):
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        pending = b""
+        while not self._stop.is_set():
+            try:
+                if self.mode == "Scout":
+                    self._send()
+                    self._stop.wait(interval)
+                    continue
+                ready, _, _ = select.select([self._master], [], [], 0.1)
+                if not ready:
+                    continue
+                pending += os.read(self._master, 256)
+                while b"\n" in pending:
+                    command, pending = pending.split(b"\n", 1)
+                    if command.strip().upper() == b"IP":
+                        self._stop.wait(interval)
+                        self._send()
+            except OSError:
+                # pty closed under us
+                break
+
+
+def StartFromEnv():
+    """Start the simulators named in SCALE_SIM and return an unopened driver for each.
+
+    Simulators already started by an earlier call are reused, not duplicated.
+    """
+    trace_path = os.environ.get("SCALE_SIM_TRACE")
+    trace = LoadTrace(trace_path) if trace_path else None
+    rate = float(os.environ.get("SCALE_SIM_RATE", "10"))
+    noise = float(os.environ.get("SCALE_SIM_NOISE", "0"))
+    settle = float(os.environ.get("SCALE_SIM_SETTLE", "1.0"))
+    drivers = []
+    for mode in os.environ.get("SCALE_SIM", "").split(","):
+        mode = mode.strip()
+        if not mode:
+            continue
+        running = [sim for sim in SIMULATORS if sim.mode == mode]
+        if running:
+            drivers.append(running[0].driver())
+            continue
+        sim = SimulatedScale(mode, trace, rate=rate, noise=noise, settle=settle).start()
+        SIMULATORS.append(sim)
+        print(f"Simulated {mode} Scale on {sim.port}")
+        drivers.append(sim.driver())
+    return drivers
+
+
+def main():
+    p = argparse.ArgumentParser(description="Read a simulated Ohaus scale through its driver")
+    p.add_argument("--mode", default="Ranger", choices=sorted(DRIVERS))
+    p.add_argument("--trace", help="trace file of 'seconds,grams' lines")
+    p.add_argument("--rate", type=float, default=10.0)
+    p.add_argument("--noise", type=float, default=0.0)
+    p.add_argument("--settle", type=float, default=1.0)
+    p.add_argument("--seconds", type=float, default=5.0)
+    p.add_argument("--verbose", action="store_true", help="print every reading")
+    args = p.parse_args()
+
+    trace = LoadTrace(args.trace) if args.trace else None
+    sim = SimulatedScale(args.mode, trace, rate=args.rate, noise=args.noise, settle=args.settle, seed=1).start()
+    driver = sim.driver().open()
+    print(f"Simulated {args.mode} Scale on {sim.port}")
+
+    reads = readings = 0
+    last = None
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < args.seconds:
+        reading = driver.read()
+        reads += 1
+        if reading is not None and reading is not last:
+            readings += 1
+            last = reading
+            if args.verbose:
+                print(reading)
+        if args.mode == "Scout":
+            time.sleep(0.01)
+    elapsed = time.perf_counter() - t0
+
+    driver.close()
+    sim.stop()
+    print(f"{reads} reads, {readings} readings in {elapsed:.1f} s "
+          f"({readings / elapsed:.1f}/s), {sim.lines_sent} lines sent, last={last}")
+
+
+if __name__ == "__main__":
+    main()
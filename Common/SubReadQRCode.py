@@ -1,15 +1,21 @@
 #!/usr/bin/python3
 
 #import win32print
-import argparse
-from supabase import create_client, Client
 import time
 import serial
 import serial.tools.list_ports
 import json
+import os
+import sys
 from pathlib import Path
 from tkinter import messagebox
 
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.HardwareService as HardwareService
+from Common.ScannerReader import ScannerReader, DEFAULT_DEDUPE_SECONDS
+
 # Folder where THIS file lives (i.e., the common folder)
 BASE_DIR = Path(__file__).resolve().parent
 
@@ -22,24 +28,53 @@ def load_scanner_port():
         cfg = json.load(f)
     return cfg["scanner_com_port"]
 
-scanner_port = load_scanner_port()
+def load_dedupe_seconds():
+    """Seconds within which a repeat of the same code is a double-read."""
+    try:
+        with open(CONFIG_PATH, "r") as f:
+            cfg = json.load(f)
+        return float(cfg.get("scan_dedupe_seconds", DEFAULT_DEDUPE_SECONDS))
+    except (OSError, ValueError):
+        return DEFAULT_DEDUPE_SECONDS
 
-# QR reader will be initialized by ConnectScanner()
+# QR reader will be initialized by Connect() / ConnectScanner()
 QrReader = None
+Scanner = None      # ScannerReader thread reading QrReader
 TestMode = False
-def ConnectScanner():
+Connected = False   # ConnectScanner has been tried
+
+def Connect(test: bool = None):
+    """Connect the scanner on first use; later calls do nothing.
+
+    test=True runs without a scanner (CheckQr returns a fixed code). Left as
+    None, a --test on the command line does the same.
+    """
+    if not Connected:
+        ConnectScanner(test)
+
+def ConnectScanner(test: bool = None):
     """Connect to QR scanner with retry logic. Call this after app initialization."""
-    global QrReader
-    
-    p = argparse.ArgumentParser()
-    p.add_argument("--test", action="store_true")
-    args = p.parse_args()
-    global TestMode
-    TestMode = args.test
+    global QrReader, Scanner, TestMode, Connected
+    Connected = True
+
+    if test is None:
+        test = "--test" in sys.argv[1:]
+    TestMode = test
     if TestMode:
         print("Running in Test Mode - no scanner connection")
         return
+    if Scanner is not None:
+        return
+
+    # Share the scanner through the hardware service when it is running
+    client = HardwareService.Connect()
+    if client is not None:
+        QrReader = HardwareService.RemoteScanner(client)
+        print("Using scanner from the hardware service")
+        Scanner = ScannerReader(QrReader, load_dedupe_seconds()).start()
+        return
     
+    scanner_port = load_scanner_port()
     while QrReader is None:
         try:
             QrReader = serial.Serial(scanner_port, 115200, timeout=1)
@@ -59,47 +94,48 @@ def ConnectScanner():
             if not retry:
                 import sys
                 sys.exit(1)
+    Scanner = ScannerReader(QrReader, load_dedupe_seconds()).start()
+
+
+def OnScan(widget, callback):
+    """Deliver each scan to callback(code) on widget's Tk thread instead of queueing it.
+
+    Returns False when no scanner is running (e.g. Test Mode) so the screen can
+    fall back to CheckQr().
+    """
+    Connect()
+    if Scanner is None:
+        return False
+    Scanner.on_scan(widget, callback)
+    return True
+
+def RemoveScanListener(callback):
+    if Scanner is not None:
+        Scanner.remove_listener(callback)
 
 
 def CheckQr():
+    """Return the next queued scan, or "none". Never touches the port."""
+    Connect()
     if TestMode:
         return "TEST-QRCODE-12345"
     
-    Qr1 = "none"; Qr2 = "none"
-    if QrReader and QrReader.in_waiting > 0:
-        raw = QrReader.readline()
-        print("raw =", raw)
-
-        # Decode from bytes to text and strip whitespace
-        ptext = raw.decode().strip()
-        print("ptext =", ptext)
-
-        # Split on '.' and extract second part safely
-#        parts = ptext.split('.')
-#        if len(parts) > 1:
-#            Qr2 = parts[1].strip()
-#            Qr1 = "202"
-        Qr2 = ptext
-        print("Qqr2 = ", Qr2)
+    Qr2 = "none"
+    code = Scanner.get() if Scanner else None
+    if code:
+        print("Qqr2 = ", code)
+        Qr2 = code
     return (Qr2)
 
 def CheckMetricQr():
+    """Return the next queued scan, or "none". Never touches the port."""
+    Connect()
     if TestMode:
         return "TEST-QRCODE-12345"
     
     ptext = "none"
-    if QrReader and QrReader.in_waiting > 0:
-        raw = QrReader.readline()
-        print("raw =", raw)
-
-        # Decode from bytes to text and strip whitespace
-        ptext = raw.decode().strip()
-        print("ptext =", ptext)
+    code = Scanner.get() if Scanner else None
+    if code:
+        print("ptext =", code)
+        ptext = code
     return (ptext)
-
-ConnectScanner()
-qr = CheckMetricQr()
-print("QR Code read:", qr)
-#while (ptext := CheckMetricQr()) == "none":
-#    print("Waiting for QR code...")
-#    time.sleep(1)
@@ -1,39 +1,56 @@
 #!/usr/bin/python3
 
 import time
-import serial
-import serial.tools.list_ports
+import threading
+from collections import deque
+from statistics import pvariance
 from tkinter import messagebox
 import sys
+import Common.ScaleDrivers as ScaleDrivers
+import Common.HardwareService as HardwareService
 
-ScaleBuffer = ""
 LastWeight = None
-ScaleRanger = None
-ScaleScout = None
+LastUnstable = False
+ScaleRanger = None      # RangerDriver (or HardwareService.RemoteScale) once connected
+ScaleScout = None       # ScoutDriver (or HardwareService.RemoteScale) once connected
 ScoutConnected = False
 RangerConnected = False
+Connected = False       # ConnectScales has been tried
+
+def Connect():
+    """Connect the scales on first use; later calls do nothing."""
+    if not Connected:
+        ConnectScales()
 
 def ConnectScales():
     """Connect to Ohaus scales with retry logic. Call this after app initialization."""
-    global ScaleRanger, ScaleScout, ScoutConnected, RangerConnected
+    global ScaleRanger, ScaleScout, ScoutConnected, RangerConnected, Connected
+    Connected = True
     
 #    while not (ScoutConnected or RangerConnected):
     try:
-        ports = list(serial.tools.list_ports.comports())
-        for p in ports:
-#            print(f"Found device: VID={p.vid}, PID={p.pid}, Device={p.device}")
-            if p.vid == 1027 and p.pid == 24577:
-                scaleport = p.device
-                print("Connecting to Ranger Scale on " + scaleport)
-                ScaleRanger = serial.Serial(port=scaleport, baudrate=9600, timeout=2)
+        # Share the scales through the hardware service when it is running
+        client = HardwareService.Connect()
+        if client is not None:
+            ScaleRanger = HardwareService.RemoteScale(client, "Ranger")
+            ScaleScout = HardwareService.RemoteScale(client, "Scout")
+            RangerConnected = ScaleRanger.connected
+            ScoutConnected = ScaleScout.connected
+            print("Using scales from the hardware service")
+            if not (ScoutConnected or RangerConnected):
+                raise Exception("Hardware service has no Ohaus scale connected")
+            return
+
+        for driver in ScaleDrivers.FindScales():
+            print(f"Connecting to {driver.name} Scale on {driver.port}")
+            driver.open()
+            if isinstance(driver, ScaleDrivers.RangerDriver):
+                ScaleRanger = driver
                 RangerConnected = True
-                print("Connected to Ranger Scale " + scaleport)
-            if p.vid == 1027 and p.pid == 24597:
-                scaleport = p.device
-                print("Connecting to Scout Scale on " + scaleport)
-                ScaleScout = serial.Serial(port=scaleport, baudrate=9600, timeout=2)
+            elif isinstance(driver, ScaleDrivers.ScoutDriver):
+                ScaleScout = driver
                 ScoutConnected = True
-                print("Connected to Scout Scale " + scaleport)
+            print(f"Connected to {driver.name} Scale {driver.port}")
         
         if not (ScoutConnected or RangerConnected):
             raise Exception("No Ohaus scale detected")
@@ -55,6 +72,11 @@ def ConnectScales():
 
 def GetScaleStatus():
     global ScoutConnected, RangerConnected
+    Connect()
+    # the hardware service reconnects scales on its own, so ask the live status
+    if isinstance(ScaleRanger, HardwareService.RemoteScale):
+        RangerConnected = ScaleRanger.connected
+        ScoutConnected = ScaleScout.connected
     return ScoutConnected, RangerConnected
 
 ###########################################################
@@ -62,49 +84,230 @@ def GetScaleStatus():
 # Scale must be set to send continuous data, with units in grams
 ###########################################################
 def GetScoutWeight():
-    global ScaleBuffer, LastWeight
-    # Read whatever is waiting, don't block
-    data = ScaleScout.read(ScaleScout.in_waiting or 0).decode(errors="ignore")
-    if data:
-        ScaleBuffer += data
-
-        while "\r\n" in ScaleBuffer:
-            line, ScaleBuffer = ScaleBuffer.split("\r\n", 1)
-            line = line.strip()
-            if not line:
-                continue
-#            print("Scale line: '" + line + "'")
-            parts = line.split()
-            LastWeight =float(parts[0])
-            Unit = parts[1] 
-#            print("Parsed weight: ", LastWeight, Unit)
-#            val = _parse_ohaus_line(line)
-#            if val is not None:
-#                LastWeight = val
+    global LastWeight, LastUnstable
+    Connect()
+    reading = ScaleScout.read()
+    if reading is not None:
+        LastWeight, Unit, LastUnstable = reading
 
     return LastWeight
 
+def GetScoutReading():
+    """Return (weight, unstable) for the Scout; see GetScoutWeight."""
+    weight = GetScoutWeight()
+    return weight, LastUnstable
+
 ###########################################################
 # this code works for Ohaus Ranger 3000 scale
 # 
 ###########################################################
 
+def GetRangerReading():
+    """Return (Weight, unstable) from one IP request to the Ranger.
+
+    Weight has the same form GetRangerWeight has always returned.
+    """
+    Connect()
+    reading = ScaleRanger.read()
+    if reading is None:
+        return 0, False
+    weight, unit, unstable = reading
+    if not unit.startswith("g"):
+        return '0', unstable
+    return str(round(weight)), unstable
+
 def GetRangerWeight():
-    ScaleRanger.reset_input_buffer()
-    ScaleRanger.write("IP\r\n".encode())
-    weight = str(ScaleRanger.readline())
-    w = weight.split()
-#    print(w)
-    Weight = '0'
-    if len(w) < 3:
-        Weight = 0
-    elif w[2].find("g") == 0:
-        Weight = str(round(float(w[1])))
-    return Weight
-
-
-
-ConnectScales()
-#time.sleep(5)  # wait for scale to initialize
-#w = GetScoutWeight()
-#print("Weight is ", w)
\ No newline at end of file
+    return GetRangerReading()[0]
+
+###########################################################
+# Stable weight detection
+###########################################################
+
+class StabilityDetector:
+    """Decide when a stream of scale readings has settled on one weight.
+
+    Once the scale has been seen sending the Ohaus '?' (unstable) marker, its
+    absence is trusted as the stability flag. Until then a reading counts as
+    stable when the variance of the last `window` readings is at most
+    `max_variance` (grams squared). The settled weight is held until a reading
+    moves more than `tolerance` grams away from it or the pan is emptied
+    (below `min_weight`).
+    """
+
+    def __init__(self, window: int = 4, max_variance: float = 1.0,
+                 tolerance: float = 2.0, min_weight: float = 1.0):
+        self.readings = deque(maxlen=window)
+        self.max_variance = max_variance
+        self.tolerance = tolerance
+        self.min_weight = min_weight
+        self.flag_seen = False
+        self.stable_weight = None
+
+    def reset(self):
+        self.readings.clear()
+        self.stable_weight = None
+
+    def add(self, weight, unstable: bool = False) -> bool:
+        """Feed one reading. Returns True when stable_weight changed."""
+        previous = self.stable_weight
+        try:
+            w = float(weight)
+        except (TypeError, ValueError):
+            self.reset()
+            return previous is not None
+
+        if unstable:
+            self.flag_seen = True
+        self.readings.append(w)
+
+        if w < self.min_weight:
+            self.stable_weight = None
+        elif self.stable_weight is not None and abs(w - self.stable_weight) > self.tolerance:
+            self.stable_weight = None
+
+        if self.stable_weight is None and w >= self.min_weight:
+            if self.flag_seen:
+                settled = not unstable
+            else:
+                settled = (len(self.readings) == self.readings.maxlen
+                           and pvariance(self.readings) <= self.max_variance)
+            if settled:
+                self.stable_weight = w
+
+        return self.stable_weight != previous
+
+###########################################################
+# Background reader
+# Owns the scale port on its own thread so the Tk main loop
+# never waits on a serial read.
+###########################################################
+
+class ScaleReader:
+    """Poll a scale on a background thread and publish the latest weight.
+
+    read_func is GetRangerReading or GetScoutReading (or any function returning
+    a weight, or a (weight, unstable) tuple). Screens call latest() for a
+    non-blocking read, or on_change() to have a callback run on the Tk thread
+    (via widget.after) whenever the weight changes. on_stable() callbacks get
+    the settled weight from a StabilityDetector, or None when the load moves.
+    """
+
+    def __init__(self, read_func, interval: float = 0.5, detector: StabilityDetector = None):
+        self.read_func = read_func
+        self.interval = interval
+        self.detector = detector or StabilityDetector()
+        self._lock = threading.Lock()
+        self._weight = None
+        self._stamp = 0.0
+        self._listeners = []
+        self._stable_listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ScaleReader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self):
+        """Return (weight, timestamp) of the most recent reading without touching the port."""
+        with self._lock:
+            return self._weight, self._stamp
+
+    def on_change(self, widget, callback):
+        """Call callback(weight) on widget's Tk thread each time the weight changes."""
+        with self._lock:
+            self._listeners.append((widget, callback))
+            weight = self._weight
+        if weight is not None:
+            self._deliver(widget, callback, weight)
+
+    def on_stable(self, widget, callback):
+        """Call callback(weight) on widget's Tk thread when a stable weight is available.
+
+        callback(None) means the previously stable weight is no longer on the scale.
+        """
+        with self._lock:
+            self._stable_listeners.append((widget, callback))
+            weight = self.detector.stable_weight
+        if weight is not None:
+            self._deliver(widget, callback, weight)
+
+    def latest_stable(self):
+        """Return the current settled weight, or None if the scale is moving or empty."""
+        with self._lock:
+            return self.detector.stable_weight
+
+    def remove_listener(self, callback):
+        with self._lock:
+            self._listeners = [(w, cb) for (w, cb) in self._listeners if cb != callback]
+            self._stable_listeners = [(w, cb) for (w, cb) in self._stable_listeners if cb != callback]
+
+    def _run(self):
+        while not self._stop.is_set():
+            unstable = False
+            try:
+                result = self.read_func()
+                if isinstance(result, tuple):
+                    weight, unstable = result
+                else:
+                    weight = result
+            except Exception:
+                weight = 'Error'
+            self._publish(weight, unstable)
+            self._stop.wait(self.interval)
+
+    def _publish(self, weight, unstable: bool = False):
+        with self._lock:
+            changed = weight != self._weight
+            self._weight = weight
+            self._stamp = time.time()
+            stable_changed = self.detector.add(weight, unstable)
+            stable = self.detector.stable_weight
+            listeners = list(self._listeners)
+            stable_listeners = list(self._stable_listeners)
+        if changed:
+            for widget, callback in listeners:
+                self._deliver(widget, callback, weight)
+        if stable_changed:
+            for widget, callback in stable_listeners:
+                self._deliver(widget, callback, stable)
+
+    def _deliver(self, widget, callback, weight):
+        try:
+            widget.after(0, lambda: callback(weight))
+        except Exception:
+            # widget already destroyed
+            pass
+
+
+Reader = None
+
+def StartReader(interval: float = 0.5):
+    """Start (once per process) the background reader for the connected scale.
+
+    The Ranger is preferred when both scales are attached.
+    """
+    global Reader
+    Connect()
+    if Reader is None:
+        if RangerConnected or not ScoutConnected:
+            Reader = ScaleReader(GetRangerReading, interval)
+        else:
+            Reader = ScaleReader(GetScoutReading, interval)
+    return Reader.start()
+
+def StopReader():
+    global Reader
+    if Reader is not None:
+        Reader.stop()
+        Reader = None
@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""Run data-layer calls on a worker pool and hand the results back to Tk.
+
+Supabase calls block for as long as the network takes, so screens don't make
+them on the Tk thread. Instead:
+
+    TaskRunner.Run(self, SubSupa.LoadStrains, crop_no,
+                   on_done=self.ShowStrains,          # called with the result
+                   on_error=self.ShowLoadError,       # called with the exception
+                   disable=(self.CropCombo,))         # disabled until it finishes
+
+Run() returns at once. The call runs on a bounded thread pool; on_done or
+on_error then runs on the Tk thread through widget.after(). Widgets in
+`disable` are disabled until then, so a second click can't send the same
+write twice. Without on_error the failure is printed.
+
+For a handler that needs several calls in a row, pass a function that makes
+them all and returns what the UI needs.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 4
+
+_Executor = None
+_Lock = threading.Lock()
+_Held = {}      # widget -> [tasks holding it disabled, state to restore]
+
+
+def Executor() -> ThreadPoolExecutor:
+    global _Executor
+    if _Executor is None:
+        with _Lock:
+            if _Executor is None:
+                _Executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="Data")
+    return _Executor
+
+
+def _Disable(widgets):
+    held = []
+    for w in widgets:
+        if w is None:
+            continue
+        try:
+            if w in _Held:
+                _Held[w][0] += 1
+            else:
+                _Held[w] = [1, w.cget("state")]
+                w.configure(state="disabled")
+            held.append(w)
+        except Exception:
+            pass
+    return held
+
+
+def _Release(widgets):
+    for w in widgets:
+        entry = _Held.get(w)
+        if entry is None:
+            continue
+        entry[0] -= 1
+        if entry[0] == 0:
+            del _Held[w]
+            try:
+                w.configure(state=entry[1])
+            except Exception:
+                # widget already destroyed
+                pass
+
+
+def Run(widget, func, *args, on_done=None, on_error=None, disable=(), **kwargs):
+    """Call func(*args, **kwargs) on the pool; deliver the outcome on widget's Tk thread."""
+    held = _Disable(disable)
+    name = getattr(func, "__name__", repr(func))
+
+    def deliver(future):
+        _Release(held)
+        error = future.exception()
+        if error is None:
+            if on_done is not None:
+                on_done(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            print(f"{name} failed: {error}")
+
+    def finished(future):
+        try:
+            widget.after(0, lambda: deliver(future))
+        except Exception:
+            # window closed while the call was running
+            pass
+
+    future = Executor().submit(func, *args, **kwargs)
+    future.add_done_callback(finished)
+    return future
@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""A week of trimmer pay, as the TrimmerSummary screen shows it.
+
+TrimmerSummary fills its pay table from WeekPay(), and `Payroll.py --check`
+compares Payroll.Pay() with the same function, so the check is against what
+the screen actually adds up rather than a copy of it.
+
+Flower grams are summed per crop/strain and paid at that strain's BigsRate,
+each line rounded to the cent. A day earns LUNCH_PAY when the rows given for
+it come to LUNCH_HOURS or more; with every trimmer's rows (the screen's "All")
+that is their hours together, not each trimmer's own.
+"""
+from typing import Dict, Iterable, Tuple
+
+LUNCH_PAY = 20.0        # per day worked of LUNCH_HOURS or more
+LUNCH_HOURS = 6.0
+
+
+def WeekPay(rows: Iterable[dict], rates_map: Dict[Tuple[int, str], float]) -> dict:
+    """Pay for dailytrim_rollup rows (ScaleData.LoadTrimRollup).
+
+    rates_map is ScaleData.GetRatesMap(): (CropNo, Strain) -> BigsRate.
+    Returns Lines, one (CropNo, Strain, rate, grams, pay) per crop/strain in
+    that order, with LunchCount, LunchPay, FlowerGrams, FlowerPay and GrossPay."""
+    bigs_map = {}
+    day_hours = {}
+    for r in rows:
+        key = (int(r.get("CropNo") or 0), (r.get("Strain") or "").strip())
+        bigs_map[key] = bigs_map.get(key, 0.0) + float(r.get("FlowerGrams") or 0)
+        day = (r.get("TrimDate") or "")[:10]
+        day_hours[day] = day_hours.get(day, 0.0) + float(r.get("Hours") or 0)
+
+    lines = []
+    for (crop, strain), grams in sorted(bigs_map.items()):
+        rate = float(rates_map.get((crop, strain), 0.0))
+        lines.append((crop, strain, rate, grams, round(grams * rate, 2)))
+    lunch_count = sum(1 for h in day_hours.values() if h >= LUNCH_HOURS)
+    lunch_pay = round(lunch_count * LUNCH_PAY, 2)
+    flower_pay = sum(line[4] for line in lines)
+    return {
+        "Lines": lines,
+        "LunchCount": lunch_count,
+        "LunchPay": lunch_pay,
+        "FlowerGrams": sum(bigs_map.values()),
+        "FlowerPay": flower_pay,
+        "GrossPay": flower_pay + lunch_pay,
+    }
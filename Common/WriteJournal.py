@@ -0,0 +1,410 @@
+#!/usr/bin/python3
+"""Local write-ahead journal for the weigh-station writes.
+
+A weight the operator has just taken shouldn't depend on the barn Wi-Fi, so
+the weigh screens hand these writes to this module instead of SubSupa:
+
+    WeighPlant       UpdateWetWeight  UpdateDryWeight  InsertScaleLog
+    InsertNewTag     UpdateTagWeight  InsertTrimBag    InsertPackage
+
+Each call is committed to a SQLite file next to this module (journal.db) and
+returns as soon as it is on disk. A background thread then pushes the entries
+to Supabase in the order they were taken.
+
+Every entry carries the time it was taken, and that time is written into the
+row (WetDate, DryDate, ScaleDate, BuckDate, TrimDate, PackDate). Before an
+insert, sync looks for a row with that time, so an entry whose reply was lost
+on the way back isn't written twice; updates just set the same value again.
+
+While Supabase can't be reached, or answers 5xx or 429, the entry stays at
+the head of the queue and sync retries, backing off up to RETRY_MAX_SECONDS. If Supabase refuses an
+entry, or another station has already used the same tag, it is set aside as a
+conflict (see Conflicts()) and the entries after it carry on.
+
+Several screens may be open at once; only the one holding the sync lease
+pushes. Watch() keeps a label on a screen showing the queue depth.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import List, Tuple
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.ScaleData as ScaleData
+import Common.SupaClient as SupaClient
+
+JOURNAL_PATH = SupaClient.LocalPath("journal.db")
+LEASE_SECONDS = 120         # longer than the few Supabase calls one entry takes
+IDLE_SECONDS = 10           # look for entries queued by other screens
+RETRY_MIN_SECONDS = 2
+RETRY_MAX_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    Seq      INTEGER PRIMARY KEY AUTOINCREMENT,
+    Op       TEXT NOT NULL,
+    Args     TEXT NOT NULL,
+    Queued   TEXT NOT NULL,
+    Attempts INTEGER NOT NULL DEFAULT 0,
+    Status   TEXT NOT NULL DEFAULT 'pending',
+    Error    TEXT
+);
+CREATE TABLE IF NOT EXISTS lease (
+    Id      INTEGER PRIMARY KEY CHECK (Id = 1),
+    Owner   TEXT,
+    Expires REAL
+);
+"""
+
+LastError = None            # why the last sync pass stopped, None once it gets through
+
+_Db = None
+_Lock = threading.RLock()
+_Wake = threading.Event()
+_Thread = None
+_Owner = f"{os.getpid()}@{time.time():.0f}"
+
+
+class Conflict(Exception):
+    """Supabase already holds something that this entry can't be written over."""
+
+
+# Error codes that mean Supabase was there but couldn't serve the request just now:
+# PostgREST's "can't reach the database / pool timed out" (503, 504), a serialization
+# failure or deadlock, and the database shutting down or starting up.
+RETRY_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "40001", "40P01", "57P01", "57P02", "57P03"}
+
+
+def _RetryErrors():
+    """Errors that mean Supabase wasn't reached, so the entry should be tried again."""
+    errors = [OSError, ImportError]     # ConnectionError, TimeoutError, DNS failures; no supabase package
+    try:
+        import httpx
+        errors.append(httpx.TransportError)
+    except ImportError:
+        pass
+    return tuple(errors)
+
+
+def Offline(error) -> bool:
+    """True if error means Supabase couldn't be reached or was briefly unavailable
+    (a journalled write will be retried); False if it refused the write (a 4xx)."""
+    if isinstance(error, _RetryErrors()):
+        return True
+    code = getattr(error, "code", None)
+    if str(code) in RETRY_CODES:
+        return True
+    # a reply that wasn't PostgREST JSON (the gateway's 502/503/504, a 429) carries the
+    # HTTP status as an int; PostgREST and Postgres codes are strings, even "23505"
+    if isinstance(code, int) and not isinstance(code, bool):
+        return code == 429 or code >= 500
+    return False
+
+
+def _Connect() -> sqlite3.Connection:
+    global _Db
+    with _Lock:
+        if _Db is None:
+            db = sqlite3.connect(JOURNAL_PATH, timeout=10, isolation_level=None, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=FULL")     # every commit is on disk before we return
+            db.executescript(SCHEMA)
+            _Db = db
+    return _Db
+
+
+def _Execute(sql: str, params=()) -> List[sqlite3.Row]:
+    with _Lock:
+        return _Connect().execute(sql, params).fetchall()
+
+
+def _Now() -> str:
+    return datetime.now().isoformat()
+
+
+#################################################################################################
+#
+# Writes (same arguments as Common.ScaleData; each returns the journal sequence number)
+#
+#################################################################################################
+
+def _Queue(op: str, **args) -> int:
+    with _Lock:
+        seq = _Connect().execute("INSERT INTO journal (Op, Args, Queued) VALUES (?, ?, ?)",
+                                 (op, json.dumps(args), _Now())).lastrowid
+    Start()
+    _Wake.set()
+    return seq
+
+def WeighPlant(PlantNo, PlantType: str, Weight: int, ScaleDate: str = None, Overwrite: bool = False) -> int:
+    return _Queue("WeighPlant", PlantNo=PlantNo, PlantType=PlantType, Weight=Weight,
+                  ScaleDate=ScaleDate or _Now(), Overwrite=Overwrite)
+
+def UpdateWetWeight(PlantNo, WetWeight) -> int:
+    return _Queue("UpdateWetWeight", PlantNo=PlantNo, WetWeight=WetWeight, WetDate=_Now())
+
+def UpdateDryWeight(PlantNo, DryWeight) -> int:
+    return _Queue("UpdateDryWeight", PlantNo=PlantNo, DryWeight=DryWeight, DryDate=_Now())
+
+def InsertScaleLog(PlantNo: str, Strain: str, PlantType: str, Weight: int) -> int:
+    return _Queue("InsertScaleLog", PlantNo=PlantNo, Strain=Strain, PlantType=PlantType,
+                  Weight=Weight, ScaleDate=_Now())
+
+def InsertNewTag(CropNo: int, Strain: str, TagNo: str, Weight) -> int:
+    return _Queue("InsertNewTag", CropNo=CropNo, Strain=Strain, TagNo=TagNo, Weight=Weight, BuckDate=_Now())
+
+def UpdateTagWeight(CropNo: int, Strain: str, TagNo: str, Weight) -> int:
+    return _Queue("UpdateTagWeight", CropNo=CropNo, Strain=Strain, TagNo=TagNo, Weight=Weight)
+
+def InsertTrimBag(CropNo: int, Strain: str, Type: str, MetrcId: str, Weight, TrimDate) -> int:
+    return _Queue("InsertTrimBag", CropNo=CropNo, Strain=Strain, Type=Type, MetrcId=MetrcId,
+                  Weight=Weight, TrimDate=TrimDate or _Now())
+
+def InsertPackage(CropNo, Strain, CaseNo, MetrcID, PackageType, TotUnits, TotWeight, PackDate: str = None) -> int:
+    return _Queue("InsertPackage", CropNo=CropNo, Strain=Strain, CaseNo=CaseNo, MetrcID=MetrcID,
+                  PackageType=PackageType, TotUnits=TotUnits, TotWeight=TotWeight, PackDate=PackDate or _Now())
+
+
+#################################################################################################
+#
+# Pushing one entry to Supabase
+#
+#################################################################################################
+
+def _PushWeighPlant(a):
+    res = ScaleData.WeighPlant(**a) or {}
+    if res.get("status") == "missing":
+        raise Conflict(f"plant {a['PlantNo']} is not in scaleplants")
+    if res.get("status") == "exists":
+        raise Conflict(f"plant {a['PlantNo']} already has a {a['PlantType']} weight of {res.get('previous')} g")
+
+def _PushWetWeight(a):
+    if not ScaleData.FindRows("scaleplants", {"PlantNo": a["PlantNo"]}, "PlantNo"):
+        raise Conflict(f"plant {a['PlantNo']} is not in scaleplants")
+    ScaleData.UpdateWetWeight(**a)
+
+def _PushDryWeight(a):
+    if not ScaleData.FindRows("scaleplants", {"PlantNo": a["PlantNo"]}, "PlantNo"):
+        raise Conflict(f"plant {a['PlantNo']} is not in scaleplants")
+    ScaleData.UpdateDryWeight(**a)
+
+def _PushScaleLog(a):
+    if not ScaleData.FindRows("scalelog", {"PlantNo": a["PlantNo"], "ScaleDate": a["ScaleDate"]}, "PlantNo"):
+        ScaleData.InsertScaleLog(**a)
+
+def _PushNewTag(a):
+    key = {"CropNo": a["CropNo"], "Strain": a["Strain"], "TagNo": a["TagNo"]}
+    rows = ScaleData.FindRows("scalebuck", key, "Weight")
+    if rows:
+        if ScaleData.FindRows("scalebuck", dict(key, BuckDate=a["BuckDate"]), "TagNo"):
+            return
+        raise Conflict(f"tag {a['TagNo']} was already weighed at {rows[0].get('Weight')} g")
+    ScaleData.InsertNewTag(**a)
+
+def _PushTagWeight(a):
+    if not ScaleData.UpdateTagWeight(**a):
+        raise Conflict(f"tag {a['TagNo']} is not in scalebuck for {a['CropNo']} {a['Strain']}")
+
+def _PushTrimBag(a):
+    if ScaleData.FindRows("scaletrim", {"MetrcId": a["MetrcId"], "TrimDate": a["TrimDate"]}, "MetrcId"):
+        return
+    if ScaleData.CheckTrimBag(a["CropNo"], a["Strain"], a["MetrcId"]) == "Error":
+        raise Conflict(f"Metric tag {a['MetrcId']} belongs to a different crop or strain")
+    ScaleData.InsertTrimBag(**a)
+
+def _PushPackage(a):
+    rows = ScaleData.FindRows("packages", {"MetrcID": a["MetrcID"]}, "CaseNo")
+    if rows:
+        if ScaleData.FindRows("packages", {"MetrcID": a["MetrcID"], "PackDate": a["PackDate"]}, "MetrcID"):
+            return
+        raise Conflict(f"Metrc {a['MetrcID']} is already packed in case {rows[0].get('CaseNo')}")
+    ScaleData.InsertPackage(**a)
+
+PUSH = {
+    "WeighPlant": _PushWeighPlant,
+    "UpdateWetWeight": _PushWetWeight,
+    "UpdateDryWeight": _PushDryWeight,
+    "InsertScaleLog": _PushScaleLog,
+    "InsertNewTag": _PushNewTag,
+    "UpdateTagWeight": _PushTagWeight,
+    "InsertTrimBag": _PushTrimBag,
+    "InsertPackage": _PushPackage,
+}
+
+
+#################################################################################################
+#
+# Sync
+#
+#################################################################################################
+
+def _TakeLease() -> bool:
+    """Become (or stay) the process that pushes; False while another screen is."""
+    now = time.time()
+    with _Lock:
+        db = _Connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT Owner, Expires FROM lease WHERE Id = 1").fetchone()
+            if row and row["Owner"] != _Owner and row["Expires"] > now:
+                db.execute("ROLLBACK")
+                return False
+            db.execute("INSERT OR REPLACE INTO lease (Id, Owner, Expires) VALUES (1, ?, ?)",
+                       (_Owner, now + LEASE_SECONDS))
+            db.execute("COMMIT")
+            return True
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+def _ReleaseLease():
+    if _Db is not None:
+        try:
+            _Execute("DELETE FROM lease WHERE Owner = ?", (_Owner,))
+        except sqlite3.Error:
+            pass
+
+def SyncOnce() -> int:
+    """Push pending entries in order until none are left; return how many were sent.
+
+    Raises the network error that stopped it.
+    """
+    global LastError
+    sent = 0
+    while _TakeLease():
+        rows = _Execute("SELECT Seq, Op, Args FROM journal WHERE Status = 'pending' ORDER BY Seq LIMIT 1")
+        if not rows:
+            break
+        seq, op = rows[0]["Seq"], rows[0]["Op"]
+        _Execute("UPDATE journal SET Attempts = Attempts + 1 WHERE Seq = ?", (seq,))
+        try:
+            PUSH[op](json.loads(rows[0]["Args"]))
+        except Exception as e:
+            if Offline(e):
+                _Execute("UPDATE journal SET Error = ? WHERE Seq = ?", (str(e), seq))
+                raise
+            # Supabase answered and said no; retrying won't change that
+            _Execute("UPDATE journal SET Status = 'conflict', Error = ? WHERE Seq = ?", (str(e), seq))
+            print(f"WriteJournal: {op} #{seq} set aside: {e}")
+            continue
+        _Execute("DELETE FROM journal WHERE Seq = ?", (seq,))
+        sent += 1
+    LastError = None
+    return sent
+
+def _Run():
+    global LastError
+    delay = RETRY_MIN_SECONDS
+    while True:
+        try:
+            SyncOnce()
+            delay = RETRY_MIN_SECONDS
+            wait = IDLE_SECONDS
+        except Exception as e:
+            LastError = e
+            wait = delay
+            delay = min(delay * 2, RETRY_MAX_SECONDS)
+        _Wake.wait(wait)
+        _Wake.clear()
+
+def Start():
+    """Start the sync thread (once per process)."""
+    global _Thread
+    with _Lock:
+        if _Thread is None:
+            _Thread = threading.Thread(target=_Run, name="WriteJournal", daemon=True)
+            _Thread.start()
+            atexit.register(_ReleaseLease)
+
+
+#################################################################################################
+#
+# Queue state for the screens
+#
+#################################################################################################
+
+def Counts() -> Tuple[int, int]:
+    """(entries waiting to be sent, entries set aside as conflicts)"""
+    rows = _Execute("SELECT Status, COUNT(*) AS N FROM journal GROUP BY Status")
+    counts = {r["Status"]: r["N"] for r in rows}
+    return counts.get("pending", 0), counts.get("conflict", 0)
+
+def Pending(Op: str, **Match) -> List[dict]:
+    """The arguments of the Op entries not sent yet whose arguments equal Match, oldest first.
+
+    A screen adds these to what it reads back from Supabase, so a write it has
+    just queued shows up before sync has sent it. Read them before Supabase:
+    an entry sent in between is then in the Supabase read instead.
+    """
+    rows = _Execute("SELECT Args FROM journal WHERE Status = 'pending' AND Op = ? ORDER BY Seq", (Op,))
+    entries = [json.loads(r["Args"]) for r in rows]
+    return [a for a in entries if all(str(a.get(k)) == str(v) for k, v in Match.items())]
+
+def Conflicts() -> List[dict]:
+    rows = _Execute("SELECT Seq, Op, Args, Queued, Error FROM journal WHERE Status = 'conflict' ORDER BY Seq")
+    return [dict(r, Args=json.loads(r["Args"])) for r in rows]
+
+def Retry(Seq: int):
+    """Put a conflict back in the queue (after fixing whatever it ran into).
+
+    A retried WeighPlant replaces the weight it ran into.
+    """
+    with _Lock:
+        rows = _Execute("SELECT Op, Args FROM journal WHERE Seq = ?", (Seq,))
+        if rows and rows[0]["Op"] == "WeighPlant":
+            args = dict(json.loads(rows[0]["Args"]), Overwrite=True)
+            _Execute("UPDATE journal SET Args = ? WHERE Seq = ?", (json.dumps(args), Seq))
+        _Execute("UPDATE journal SET Status = 'pending', Error = NULL WHERE Seq = ?", (Seq,))
+    _Wake.set()
+
+def Discard(Seq: int):
+    _Execute("DELETE FROM journal WHERE Seq = ? AND Status = 'conflict'", (Seq,))
+
+def ShowConflicts(parent=None):
+    """List the conflicts in a message box and offer to retry them."""
+    from tkinter import messagebox
+    conflicts = Conflicts()
+    if not conflicts:
+        messagebox.showinfo("Sync", "Nothing has been set aside.", parent=parent)
+        return
+    lines = [f"{c['Queued'][:16]}  {c['Op']}: {c['Error']}" for c in conflicts[:20]]
+    if len(conflicts) > 20:
+        lines.append(f"... and {len(conflicts) - 20} more")
+    if messagebox.askyesno("Sync conflicts", "\n".join(lines) + "\n\nTry these again?", parent=parent):
+        for c in conflicts:
+            Retry(c["Seq"])
+
+def Watch(widget, label, interval_ms: int = 2000):
+    """Keep label (a CTkLabel on widget's window) showing the queue depth; click it for conflicts."""
+    Start()
+    label.bind("<Button-1>", lambda _e: ShowConflicts(widget))
+
+    def tick():
+        try:
+            pending, conflicts = Counts()
+        except sqlite3.Error as e:
+            label.configure(text=f"Sync: {e}", text_color="#ff4444")
+        else:
+            if conflicts:
+                label.configure(text=f"Sync: {conflicts} conflict(s)", text_color="#ff4444")
+            elif pending:
+                state = "offline" if LastError is not None else "sending"
+                label.configure(text=f"Sync: {pending} waiting ({state})", text_color="#ffaa00")
+            else:
+                label.configure(text="Sync: up to date", text_color="#00aa00")
+        try:
+            widget.after(interval_ms, tick)
+        except Exception:
+            # window closed
+            pass
+
+    tick()
@@ -0,0 +1,18 @@
+-- scale.cropstrains: the strains of each crop with their plant counts
+-- (Common.ScaleData.LoadStrainCounts / LoadStrains)
+--
+-- Grouped in Postgres, so picking a crop fetches one row per strain instead
+-- of one per plant. The index lets the count come from the index alone.
+--
+-- Run once in the Supabase SQL editor.
+
+create index if not exists scaleplants_crop_strain
+    on scale.scaleplants ("CropNo", "Strain");
+
+create or replace view scale.cropstrains as
+select "CropNo", "Strain", count(*)::integer as "Plants"
+  from scale.scaleplants
+ where coalesce("Strain", '') <> ''
+ group by "CropNo", "Strain";
+
+grant select on scale.cropstrains to anon, authenticated;
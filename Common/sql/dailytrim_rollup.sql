@@ -0,0 +1,150 @@
+-- scale.dailytrim_rollup: a trimmer's day on one crop/strain, kept up to date on write
+-- (Common.ScaleData.LoadTrimRollup, for Trimmers/TrimmerSummary.py, Common/Payroll.py;
+--  Common.ScaleData.RebuildTrimRollup, for Common/RebuildTrimRollup.py)
+--
+-- One row per (TrimDate, TrimmerName, CropNo, Strain) with the Flower and
+-- Smalls grams of its sessions summed, the earliest StartTime, the latest
+-- EndTime, Hours worked (each session's EndTime - StartTime, rounded to the
+-- hundredth as the screen always has, then summed) and the number of Sessions.
+--
+-- This used to be a view grouping dailytrim on every read. It is now a table:
+-- a trigger on dailytrim recomputes the one group a session belongs to (before
+-- and after the change) in the same transaction as the write, so
+-- upsert_dailytrim and the editor's updates keep it current, and a report
+-- reads one row per trimmer per day. dailytrim_rollup_live is the old view,
+-- used by the trigger for one group at a time and by rebuild_dailytrim_rollup
+-- to check and repair a date range.
+--
+-- A session may have no CropNo or Strain; like the view's group by, the
+-- trigger and the rollup's unique index treat those nulls as one group
+-- (is not distinct from, nulls not distinct; Postgres 15 or later).
+--
+-- Run once in the Supabase SQL editor (it fills the table from dailytrim).
+
+create index if not exists dailytrim_trimdate
+    on scale.dailytrim ("TrimDate");
+
+do $$
+begin
+    if exists (select 1 from pg_views where schemaname = 'scale' and viewname = 'dailytrim_rollup') then
+        drop view scale.dailytrim_rollup;
+    end if;
+end $$;
+
+create or replace view scale.dailytrim_rollup_live as
+select "TrimDate", "TrimmerName", "CropNo", "Strain",
+       sum(coalesce("FlowerGrams", 0)) as "FlowerGrams",
+       sum(coalesce("SmallsGrams", 0)) as "SmallsGrams",
+       min("StartTime") as "StartTime",
+       max("EndTime") as "EndTime",
+       coalesce(sum(round(greatest(extract(epoch from ("EndTime" - "StartTime")), 0) / 3600.0, 2)), 0) as "Hours",
+       count(*)::integer as "Sessions"
+  from scale.dailytrim
+ group by "TrimDate", "TrimmerName", "CropNo", "Strain";
+
+create table if not exists scale.dailytrim_rollup as
+select * from scale.dailytrim_rollup_live;
+
+-- the trigger used to compare CropNo and Strain with =, which missed their
+-- null groups (and the key let them repeat): recount those before keying them
+delete from scale.dailytrim_rollup where "CropNo" is null or "Strain" is null;
+insert into scale.dailytrim_rollup
+select * from scale.dailytrim_rollup_live where "CropNo" is null or "Strain" is null;
+
+drop index if exists scale.dailytrim_rollup_key;
+create unique index dailytrim_rollup_key
+    on scale.dailytrim_rollup ("TrimDate", "TrimmerName", "CropNo", "Strain") nulls not distinct;
+
+-- recompute the group of one dailytrim row (through the dailytrim_session index)
+create or replace function scale.dailytrim_rollup_group(p scale.dailytrim)
+returns void
+language plpgsql
+security definer
+set search_path = scale, pg_temp
+as $$
+begin
+    -- one writer per group at a time: a session saved from another station waits
+    -- here until that write commits, so the live view below includes it
+    perform pg_advisory_xact_lock(hashtext(concat_ws('|', 'dailytrim_rollup', p."TrimDate", p."TrimmerName",
+                                                     p."CropNo", p."Strain")));
+    insert into scale.dailytrim_rollup as r
+    select * from scale.dailytrim_rollup_live v
+     where v."TrimDate" = p."TrimDate" and v."TrimmerName" = p."TrimmerName"
+       and v."CropNo" is not distinct from p."CropNo" and v."Strain" is not distinct from p."Strain"
+    on conflict ("TrimDate", "TrimmerName", "CropNo", "Strain") do update
+       set "FlowerGrams" = excluded."FlowerGrams",
+           "SmallsGrams" = excluded."SmallsGrams",
+           "StartTime" = excluded."StartTime",
+           "EndTime" = excluded."EndTime",
+           "Hours" = excluded."Hours",
+           "Sessions" = excluded."Sessions";
+    if not found then
+        -- its last session is gone
+        delete from scale.dailytrim_rollup r
+         where r."TrimDate" = p."TrimDate" and r."TrimmerName" = p."TrimmerName"
+           and r."CropNo" is not distinct from p."CropNo" and r."Strain" is not distinct from p."Strain";
+    end if;
+end;
+$$;
+
+create or replace function scale.dailytrim_rollup_sync()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        perform scale.dailytrim_rollup_group(old);
+    end if;
+    if tg_op = 'INSERT'
+       or (tg_op = 'UPDATE' and (new."TrimDate", new."TrimmerName", new."CropNo", new."Strain")
+                                 is distinct from (old."TrimDate", old."TrimmerName", old."CropNo", old."Strain")) then
+        perform scale.dailytrim_rollup_group(new);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists dailytrim_rollup_sync on scale.dailytrim;
+create trigger dailytrim_rollup_sync
+    after insert or delete
+       or update of "TrimDate", "TrimmerName", "CropNo", "Strain", "FlowerGrams", "SmallsGrams", "StartTime", "EndTime"
+    on scale.dailytrim
+    for each row execute function scale.dailytrim_rollup_sync();
+
+-- Count the rollup groups between the dates (null = open) that differ from
+-- dailytrim; with p_fix, recompute the range when any do.
+create or replace function scale.rebuild_dailytrim_rollup(p_from date default null, p_to date default null,
+                                                          p_fix boolean default true)
+returns integer
+language plpgsql
+security definer
+set search_path = scale, pg_temp
+as $$
+declare
+    v_wrong integer;
+begin
+    select count(distinct ("TrimDate", "TrimmerName", "CropNo", "Strain")) into v_wrong
+      from ((select * from scale.dailytrim_rollup
+              where (p_from is null or "TrimDate" >= p_from) and (p_to is null or "TrimDate" <= p_to)
+             except
+             select * from scale.dailytrim_rollup_live
+              where (p_from is null or "TrimDate" >= p_from) and (p_to is null or "TrimDate" <= p_to))
+            union all
+            (select * from scale.dailytrim_rollup_live
+              where (p_from is null or "TrimDate" >= p_from) and (p_to is null or "TrimDate" <= p_to)
+             except
+             select * from scale.dailytrim_rollup
+              where (p_from is null or "TrimDate" >= p_from) and (p_to is null or "TrimDate" <= p_to))) d;
+    if p_fix and v_wrong > 0 then
+        delete from scale.dailytrim_rollup
+         where (p_from is null or "TrimDate" >= p_from) and (p_to is null or "TrimDate" <= p_to);
+        insert into scale.dailytrim_rollup
+        select * from scale.dailytrim_rollup_live
+         where (p_from is null or "TrimDate" >= p_from) and (p_to is null or "TrimDate" <= p_to);
+    end if;
+    return v_wrong;
+end;
+$$;
+
+grant select on scale.dailytrim_rollup to anon, authenticated;
+grant execute on function scale.rebuild_dailytrim_rollup(date, date, boolean) to anon, authenticated;
@@ -0,0 +1,77 @@
+-- Numbering for totes, cases, hash runs and rosin runs
+-- (Common.ScaleData.NextNumber, NewHashRun, NewRosinRun, GetNewToteNo, GetNewCaseNo)
+--
+-- seqcounters holds the last number handed out per Kind and Scope. next_number
+-- bumps it with one UPDATE, which locks the counter row, so two stations on
+-- the same crop/strain or batch can never get the same number. A new counter
+-- starts from the highest number already in the table it numbers.
+--
+--   Kind       Scope
+--   tote       CropNo/Strain
+--   case       CropNo/Strain/PackageType
+--   hashrun    BatchId
+--   rosinrun   BatchId
+--
+-- p_count > 1 reserves a block and returns its first number.
+--
+-- Run once in the Supabase SQL editor.
+
+create table if not exists scale.seqcounters (
+    "Kind"   text    not null,
+    "Scope"  text    not null,
+    "LastNo" integer not null,
+    primary key ("Kind", "Scope")
+);
+
+create or replace function scale.next_number(p_kind text, p_scope text, p_count integer default 1)
+returns integer
+language plpgsql
+as $$
+declare
+    v_start integer;
+    v_last  integer;
+begin
+    if not exists (select 1 from scale.seqcounters where "Kind" = p_kind and "Scope" = p_scope) then
+        v_start := case p_kind
+            when 'tote' then (select max("ToteNo"::integer) from scale.scalebuck
+                               where "CropNo"::text || '/' || "Strain" = p_scope)
+            when 'case' then (select max("CaseNo"::integer) from scale.packages
+                               where "CropNo"::text || '/' || "Strain" || '/' || "PackageType" = p_scope)
+            when 'hashrun' then (select max("RunNo"::integer) from scale.hashruns where "BatchId" = p_scope)
+            when 'rosinrun' then (select max("RunNo"::integer) from scale.rosinruns where "BatchId" = p_scope)
+        end;
+        insert into scale.seqcounters ("Kind", "Scope", "LastNo")
+        values (p_kind, p_scope, coalesce(v_start, 0))
+        on conflict do nothing;
+    end if;
+
+    update scale.seqcounters set "LastNo" = "LastNo" + p_count
+     where "Kind" = p_kind and "Scope" = p_scope
+    returning "LastNo" into v_last;
+    return v_last - p_count + 1;
+end;
+$$;
+
+-- Number and insert a new, empty run in one call; returns the new row.
+create or replace function scale.new_hash_run(p_batch text)
+returns setof scale.hashruns
+language sql
+as $$
+    insert into scale.hashruns ("BatchId", "RunNo", "StartWeight", "EndWeight")
+    values (p_batch, scale.next_number('hashrun', p_batch), 0, 0)
+    returning *;
+$$;
+
+create or replace function scale.new_rosin_run(p_batch text)
+returns setof scale.rosinruns
+language sql
+as $$
+    insert into scale.rosinruns ("BatchId", "RunNo", "StartWeight", "EndWeight")
+    values (p_batch, scale.next_number('rosinrun', p_batch), 0, 0)
+    returning *;
+$$;
+
+grant select on scale.seqcounters to anon, authenticated;
+grant execute on function scale.next_number(text, text, integer) to anon, authenticated;
+grant execute on function scale.new_hash_run(text) to anon, authenticated;
+grant execute on function scale.new_rosin_run(text) to anon, authenticated;
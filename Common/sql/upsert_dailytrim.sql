@@ -0,0 +1,59 @@
+-- scale.upsert_dailytrim: save many trimmer sessions in one call
+-- (Common.ScaleData.SaveDailyTrim, SaveTrimmer, UpdateDailyTrim)
+--
+-- A session is one row per (TrimmerName, TrimDate, CropNo, Strain, AmPm).
+-- p_rows is a JSON array of dailytrim rows; each is inserted, or merged into
+-- the existing session: a zero FlowerGrams or SmallsGrams keeps the grams
+-- already recorded, and StartTime/EndTime of an existing session are kept.
+--
+-- Returns one row per input, in order: Row (1-based), Status ('inserted',
+-- 'updated' or 'error'), the session's Flower and Smalls grams after the
+-- write, and Error. A bad row doesn't stop the others.
+--
+-- The unique index needs the sessions to be unique already; merge any
+-- duplicates before running this once in the Supabase SQL editor.
+
+create unique index if not exists dailytrim_session
+    on scale.dailytrim ("TrimmerName", "TrimDate", "CropNo", "Strain", "AmPm");
+
+create or replace function scale.upsert_dailytrim(p_rows jsonb)
+returns table ("Row" integer, "Status" text, "Flower" numeric, "Smalls" numeric, "Error" text)
+language plpgsql
+as $$
+declare
+    v_json jsonb;
+    v_row  scale.dailytrim;
+    v_i    integer;
+    v_new  boolean;
+begin
+    for v_json, v_i in select value, ordinality::integer from jsonb_array_elements(p_rows) with ordinality loop
+        "Row" := v_i;
+        begin
+            v_row := jsonb_populate_record(null::scale.dailytrim, v_json);
+            insert into scale.dailytrim as d
+                   ("TrimmerName", "TrimDate", "CropNo", "Strain", "AmPm",
+                    "FlowerGrams", "SmallsGrams", "StartTime", "EndTime")
+            values (v_row."TrimmerName", v_row."TrimDate", v_row."CropNo", v_row."Strain", v_row."AmPm",
+                    coalesce(v_row."FlowerGrams", 0), coalesce(v_row."SmallsGrams", 0),
+                    v_row."StartTime", v_row."EndTime")
+            on conflict ("TrimmerName", "TrimDate", "CropNo", "Strain", "AmPm") do update
+               set "FlowerGrams" = case when excluded."FlowerGrams" = 0 then d."FlowerGrams"
+                                        else excluded."FlowerGrams" end,
+                   "SmallsGrams" = case when excluded."SmallsGrams" = 0 then d."SmallsGrams"
+                                        else excluded."SmallsGrams" end
+            returning d.xmax = 0, d."FlowerGrams", d."SmallsGrams"
+                 into v_new, "Flower", "Smalls";
+            "Status" := case when v_new then 'inserted' else 'updated' end;
+            "Error" := null;
+        exception when others then
+            "Status" := 'error';
+            "Flower" := null;
+            "Smalls" := null;
+            "Error" := sqlerrm;
+        end;
+        return next;
+    end loop;
+end;
+$$;
+
+grant execute on function scale.upsert_dailytrim(jsonb) to anon, authenticated;
@@ -0,0 +1,78 @@
+-- scale.weigh_plant: record one plant weight (Common.ScaleData.WeighPlant)
+--
+-- Updates WetWeight/WetDate or DryWeight/DryDate in scaleplants and appends the
+-- matching scalelog row in the same transaction, so the log can't disagree
+-- with the plant. Returns json {"status", "strain", "previous"}:
+--
+--   recorded   written (or already written by an earlier call with this ScaleDate)
+--   exists     the plant already has this weight; nothing written, call again
+--              with p_overwrite => true to replace it
+--   missing    no such PlantNo
+--
+-- p_plant_no arrives as text and is converted once to the type of each table's
+-- PlantNo, so the lookups compare the columns as they are and can use their
+-- indexes; a PlantNo that doesn't convert is "missing". The scalelog index serves the retry check.
+--
+-- Run once in the Supabase SQL editor.
+
+create index if not exists scalelog_plant_date
+    on scale.scalelog ("PlantNo", "ScaleDate");
+
+create or replace function scale.weigh_plant(
+    p_plant_no   text,
+    p_plant_type text,              -- 'wet' or 'dry'
+    p_weight     integer,
+    p_scale_date timestamp,
+    p_overwrite  boolean default false
+) returns json
+language plpgsql
+as $$
+declare
+    v_dry      boolean := lower(p_plant_type) = 'dry';
+    v_plant_no scale.scaleplants."PlantNo"%type;
+    v_log_no   scale.scalelog."PlantNo"%type;
+    v_strain   text;
+    v_previous numeric;
+begin
+    begin
+        v_plant_no := p_plant_no;
+        v_log_no := p_plant_no;
+    exception when data_exception then
+        return json_build_object('status', 'missing', 'strain', null, 'previous', null);
+    end;
+
+    select "Strain", case when v_dry then "DryWeight" else "WetWeight" end
+      into v_strain, v_previous
+      from scale.scaleplants
+     where "PlantNo" = v_plant_no
+       for update;
+    if not found then
+        return json_build_object('status', 'missing', 'strain', null, 'previous', null);
+    end if;
+
+    -- a retry of a call that already went through
+    if exists (select 1 from scale.scalelog
+                where "PlantNo" = v_log_no and "ScaleDate" = p_scale_date) then
+        return json_build_object('status', 'recorded', 'strain', v_strain, 'previous', v_previous);
+    end if;
+
+    if coalesce(v_previous, 0) > 0 and not p_overwrite then
+        return json_build_object('status', 'exists', 'strain', v_strain, 'previous', v_previous);
+    end if;
+
+    if v_dry then
+        update scale.scaleplants set "DryWeight" = p_weight, "DryDate" = p_scale_date
+         where "PlantNo" = v_plant_no;
+    else
+        update scale.scaleplants set "WetWeight" = p_weight, "WetDate" = p_scale_date
+         where "PlantNo" = v_plant_no;
+    end if;
+
+    insert into scale.scalelog ("PlantNo", "Strain", "PlantType", "Weight", "ScaleDate")
+    values (v_log_no, v_strain, initcap(p_plant_type), p_weight, p_scale_date);
+
+    return json_build_object('status', 'recorded', 'strain', v_strain, 'previous', v_previous);
+end;
+$$;
+
+grant execute on function scale.weigh_plant(text, text, integer, timestamp, boolean) to anon, authenticated;
@@ -5,6 +5,13 @@ import os
 import sys
 import subprocess
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.Prefetch as Prefetch
+import Common.TaskRunner as TaskRunner
+
 APP_TITLE = "Assign Batch IDs"
 DEFAULT_FONT = ("Arial", 15)
 BATCH_TYPES = ["Select", "Flower", "Smalls", "Hash", "Rosin"]
@@ -110,18 +117,18 @@ class AssignBatchIdApp(ctk.CTk):
             pass
 
     def LoadCrops(self):
-        try:
-            crops = SubSupa.LoadCrops()
-            if crops:
-                self.CropCombo.configure(values=crops)
-                self.CropCombo.set(crops[0])
-                # pre-load strains and batch list
-                self.OnCropSelected()
-            else:
-                self.CropCombo.configure(values=["Select"])
-                self.CropCombo.set("Select")
-        except Exception as e:
-            self.SetStatus(f"LoadCrops failed: {e}")
+        TaskRunner.Run(self, SubSupa.LoadCrops, on_done=self.ShowCrops,
+                       on_error=lambda e: self.SetStatus(f"LoadCrops failed: {e}"))
+
+    def ShowCrops(self, crops):
+        if crops:
+            self.CropCombo.configure(values=crops)
+            self.CropCombo.set(crops[0])
+            # pre-load strains and batch list
+            self.OnCropSelected()
+        else:
+            self.CropCombo.configure(values=["Select"])
+            self.CropCombo.set("Select")
 
     def OnCropSelected(self, val=None):
         sel = (self.CropCombo.get() or "").strip()
@@ -141,18 +148,21 @@ class AssignBatchIdApp(ctk.CTk):
             except Exception:
                 self.SetStatus("Cannot parse Crop number")
                 return
-        try:
-            strains = SubSupa.LoadStrains(crop_no)
-            if strains:
-                self.StrainCombo.configure(values=strains)
-                self.StrainCombo.set(strains[0])
-            else:
-                self.StrainCombo.configure(values=["Select"])
-                self.StrainCombo.set("Select")
-            # load batch list for crop
-            self.LoadBatchList(crop_no)
-        except Exception as e:
-            self.SetStatus(f"LoadStrains failed: {e}")
+        # the batch list is on its way while the strains are shown
+        Prefetch.Start((SubSupa.LoadStrains, crop_no), (SubSupa.LoadAllBatches, crop_no))
+        TaskRunner.Run(self, Prefetch.Take, SubSupa.LoadStrains, crop_no,
+                       on_done=lambda strains: self.ShowStrains(crop_no, strains),
+                       on_error=lambda e: self.SetStatus(f"LoadStrains failed: {e}"))
+
+    def ShowStrains(self, crop_no: int, strains):
+        if strains:
+            self.StrainCombo.configure(values=strains)
+            self.StrainCombo.set(strains[0])
+        else:
+            self.StrainCombo.configure(values=["Select"])
+            self.StrainCombo.set("Select")
+        # load batch list for crop
+        self.LoadBatchList(crop_no)
 
     def OnStrainSelected(self, val=None):
         # populate tree with one row per BatchType for this strain
@@ -169,11 +179,15 @@ class AssignBatchIdApp(ctk.CTk):
             except Exception:
                 self.SetStatus("Cannot parse Crop number")
                 return
-            # clear tree
+        TaskRunner.Run(self, SubSupa.LoadOneBatch, crop_no, selStrain,
+                       on_done=lambda res: self.ShowStrainBatches(selStrain, res),
+                       on_error=lambda e: self.SetStatus(f"LoadOneBatch failed: {e}"))
+
+    def ShowStrainBatches(self, selStrain: str, res):
+        # clear tree
         for iid in self.BatchTree.get_children():
             self.BatchTree.delete(iid)
-        res = SubSupa.LoadOneBatch(crop_no, selStrain)
-        for i, r in enumerate(res):
+        for i, r in enumerate(res or []):
             bid = None
             bid = r.get('BatchId')
             bt = r.get('BatchType')
@@ -183,25 +197,26 @@ class AssignBatchIdApp(ctk.CTk):
 
     def LoadBatchList(self, crop_no: int):
         # Use SubSupa.LoadAllBatches to retrieve all batch rows for the crop and display in tree
-        try:
-            # clear tree
-            for iid in self.BatchTree.get_children():
-                self.BatchTree.delete(iid)
-            rows = SubSupa.LoadAllBatches(crop_no) or []
-            entries = []
-            for r in rows:
-                strain = r.get('Strain') if isinstance(r, dict) else getattr(r, 'Strain', '')
-                btype = r.get('BatchType') if isinstance(r, dict) else getattr(r, 'BatchType', '')
-                bid = r.get('BatchId') if isinstance(r, dict) else getattr(r, 'BatchId', '')
-                entries.append((btype, bid or "", strain))
-            # sort by strain then type
-            entries.sort(key=lambda x: (x[2] or "", x[0] or ""))
-            for i, e in enumerate(entries):
-                tag = "odd" if i % 2 else "even"
-                self.BatchTree.insert('', 'end', values=e, tags=(tag,))
-            self.SetStatus(f"Loaded {len(entries)} batch ids for crop {crop_no}")
-        except Exception as e:
-            self.SetStatus(f"LoadBatchList failed: {e}")
+        TaskRunner.Run(self, Prefetch.Take, SubSupa.LoadAllBatches, crop_no,
+                       on_done=lambda rows: self.ShowBatchList(crop_no, rows),
+                       on_error=lambda e: self.SetStatus(f"LoadBatchList failed: {e}"))
+
+    def ShowBatchList(self, crop_no: int, rows):
+        # clear tree
+        for iid in self.BatchTree.get_children():
+            self.BatchTree.delete(iid)
+        entries = []
+        for r in rows or []:
+            strain = r.get('Strain') if isinstance(r, dict) else getattr(r, 'Strain', '')
+            btype = r.get('BatchType') if isinstance(r, dict) else getattr(r, 'BatchType', '')
+            bid = r.get('BatchId') if isinstance(r, dict) else getattr(r, 'BatchId', '')
+            entries.append((btype, bid or "", strain))
+        # sort by strain then type
+        entries.sort(key=lambda x: (x[2] or "", x[0] or ""))
+        for i, e in enumerate(entries):
+            tag = "odd" if i % 2 else "even"
+            self.BatchTree.insert('', 'end', values=e, tags=(tag,))
+        self.SetStatus(f"Loaded {len(entries)} batch ids for crop {crop_no}")
 
     def OnTreeSelect(self):
         try:
@@ -263,15 +278,16 @@ class AssignBatchIdApp(ctk.CTk):
                 return
 
         # Insert a new BatchId (allow multiple per strain/type)
-        try:
-            SubSupa.InsertBatchId(crop_no, selStrain, selBatchType, newBatchId)
+        def inserted(res):
             self.SetStatus(f"Inserted BatchId {newBatchId}")
-        except Exception as e:
-            self.SetStatus(f"InsertBatchId failed: {e}")
-            return
+            # refresh list
+            Prefetch.Forget()
+            self.LoadBatchList(crop_no)
 
-        # refresh list
-        self.LoadBatchList(crop_no)
+        TaskRunner.Run(self, SubSupa.InsertBatchId, crop_no, selStrain, selBatchType, newBatchId,
+                       on_done=inserted,
+                       on_error=lambda e: self.SetStatus(f"InsertBatchId failed: {e}"),
+                       disable=(self.BtnAdd, self.BtnUpdate))
 
     def UpdateBatch(self):
         """Update the selected tree row's BatchId to the value in the entry.
@@ -317,16 +333,17 @@ class AssignBatchIdApp(ctk.CTk):
             self.SetStatus("Update cancelled")
             return
 
-        try:
-            # call new SubSupa.UpdateBatchRow to update only the selected row
-            SubSupa.UpdateBatchRow(crop_no, old_strain, old_btype, old_bid, newBid)
+        # update only the selected row
+        def updated(res):
             self.SetStatus(f"Updated BatchId {old_bid} -> {newBid}")
-        except Exception as e:
-            self.SetStatus(f"UpdateBatchRow failed: {e}")
-            return
+            # refresh
+            Prefetch.Forget()
+            self.LoadBatchList(crop_no)
 
-        # refresh
-        self.LoadBatchList(crop_no)
+        TaskRunner.Run(self, SubSupa.UpdateBatchRow, crop_no, old_strain, old_btype, old_bid, newBid,
+                       on_done=updated,
+                       on_error=lambda e: self.SetStatus(f"UpdateBatchRow failed: {e}"),
+                       disable=(self.BtnAdd, self.BtnUpdate))
 
 
 if __name__ == '__main__':
@@ -6,6 +6,12 @@ import os
 import sys
 import subprocess
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.TaskRunner as TaskRunner
+
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -17,6 +23,23 @@ def restart_menu():
 GRAMS_TO_LBS = 0.00220462262185
 DEFAULT_FONT = ("Arial", 12)
 
+def SumPlantWeights(rows) -> dict:
+    """Strain -> wet/dry grams and counts, folded from rows as they stream in."""
+    agg = {}
+    for r in rows:
+        strain = (r.get("Strain") or "").strip()
+        wet = float(r.get("WetWeight") or 0.0)
+        dry = float(r.get("DryWeight") or 0.0)
+        if strain not in agg:
+            agg[strain] = {"wet_g": 0.0, "dry_g": 0.0, "wet_count": 0, "dry_count": 0}
+        agg[strain]["wet_g"] += wet
+        agg[strain]["dry_g"] += dry
+        if wet > 0:
+            agg[strain]["wet_count"] += 1
+        if dry > 0:
+            agg[strain]["dry_count"] += 1
+    return agg
+
 class PlantWeightsSummary(ctk.CTk):
     """Summary of plant wet/dry weights per strain for a selected crop.
 
@@ -47,31 +70,22 @@ class PlantWeightsSummary(ctk.CTk):
         # Crop selector
         ctk.CTkLabel(top, text="Harvest Date:", font=("Arial", 14, "bold")).pack(side="left", padx=(10, 6))
         
-        # Load crops from database
-        try:
-            crop_options = SubSupa.LoadCrops() or []
-            # LoadCrops already returns formatted strings like "CropNo - HarvestDate"
-            if not crop_options:
-                crop_options = ["No crops found"]
-        except Exception as e:
-            crop_options = ["No crops found"]
-        
         self.crop_combo = ctk.CTkComboBox(
             top, 
-            values=crop_options,
+            values=["Loading..."],
             width=250,
             font=DEFAULT_FONT,
             command=self.on_crop_select
         )
         self.crop_combo.pack(side="left", padx=6)
-        
-        # Set first crop if available
-        if crop_options and crop_options[0] != "No crops found":
-            self.crop_combo.set(crop_options[0])
-            # Auto-load first crop
-            self.after(100, self.on_crop_select)
-        
-        ctk.CTkButton(top, text="Refresh", command=self.on_crop_select, width=100, font=DEFAULT_FONT).pack(side="left", padx=6)
+        self.crop_combo.set("Loading...")
+
+        self.btn_refresh = ctk.CTkButton(top, text="Refresh", command=self.on_crop_select, width=100, font=DEFAULT_FONT)
+        self.btn_refresh.pack(side="left", padx=6)
+
+        # Load crops from database
+        TaskRunner.Run(self, SubSupa.LoadCrops, on_done=self.show_crops,
+                       on_error=lambda e: self.show_crops([]))
 
         # Configure treeview style for dark theme
         style = ttk.Style(self)
@@ -116,6 +130,15 @@ class PlantWeightsSummary(ctk.CTk):
         ctk.CTkButton(bottom, text="Export CSV", command=self.export_csv, width=140, font=DEFAULT_FONT).pack(side="right", padx=6)
         ctk.CTkButton(bottom, text="Close", command=self.destroy, width=100, font=DEFAULT_FONT).pack(side="right", padx=6)
 
+    def show_crops(self, crop_options):
+        # LoadCrops already returns formatted strings like "CropNo - HarvestDate"
+        crop_options = crop_options or ["No crops found"]
+        self.crop_combo.configure(values=crop_options)
+        self.crop_combo.set(crop_options[0])
+        # Auto-load first crop
+        if crop_options[0] != "No crops found":
+            self.on_crop_select()
+
     def show_status(self, msg, secs=4):
         self.status.configure(text=msg)
         if secs:
@@ -143,32 +166,17 @@ class PlantWeightsSummary(ctk.CTk):
         self.load_summary(crop_no)
 
     def load_summary(self, crop_no: int):
+        # every page of the crop's plants, summed on the worker as it arrives
+        TaskRunner.Run(self, lambda: SumPlantWeights(SubSupa.IterPlantWeights(crop_no)),
+                       on_done=self.show_summary,
+                       on_error=lambda e: self.show_status(f"Error querying scaleplants: {e}"),
+                       disable=(self.crop_combo, self.btn_refresh))
+
+    def show_summary(self, agg):
         # Clear tree
         for iid in self.tree.get_children():
             self.tree.delete(iid)
 
-        try:
-            res = SubSupa.sb.schema("scale").table("scaleplants").select("Strain,WetWeight,DryWeight").eq("CropNo", crop_no).execute()
-            rows = res.data or []
-        except Exception as e:
-            self.show_status(f"Error querying scaleplants: {e}")
-            return
-
-        # aggregate by strain
-        agg = {}
-        for r in rows:
-            strain = (r.get("Strain") or "").strip()
-            wet = float(r.get("WetWeight") or 0.0)
-            dry = float(r.get("DryWeight") or 0.0)
-            if strain not in agg:
-                agg[strain] = {"wet_g": 0.0, "dry_g": 0.0, "wet_count": 0, "dry_count": 0}
-            agg[strain]["wet_g"] += wet
-            agg[strain]["dry_g"] += dry
-            if wet > 0:
-                agg[strain]["wet_count"] += 1
-            if dry > 0:
-                agg[strain]["dry_count"] += 1
-
         # display sorted by strain
         total_wet_g = 0.0
         total_dry_g = 0.0
@@ -22,6 +22,7 @@ if ROOT_DIR not in sys.path:
 
 import Common.SubScale as SubScale
 import Common.SubReadQRCode as SubReadQRCode
+import Common.TaskRunner as TaskRunner
 
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -95,6 +96,7 @@ class PrintPlantTagsApp(ctk.CTk):
 
         ctk.CTkLabel(frame, text="Strain", font=DEFAULT_FONT).grid(row=1, column=0, sticky="e", padx=(6,6))
         self.StrainCombo = ctk.CTkComboBox(frame, values=["Select"], width=280, font=DEFAULT_FONT, command=self.on_strain_selected)
+        self.PlantCounts = {}   # Strain -> plant count for the selected crop
         self.StrainCombo.grid(row=1, column=1, sticky="w", pady=6)
 
         ctk.CTkLabel(frame, text="Number of Labels", font=DEFAULT_FONT).grid(row=2, column=0, sticky="e", padx=(6,6))
@@ -118,8 +120,7 @@ class PrintPlantTagsApp(ctk.CTk):
         # Initialize status tracking and start periodic status checks
         self.PrevQrStatus = None
         self.PrevRangerStatus = None
-        self.check_hardware_status()
-        self.schedule_status_check()
+        self.after(100, self.schedule_status_check)   # opens the scanner and scale
 
     def set_status(self, text: str):
         try:
@@ -128,16 +129,16 @@ class PrintPlantTagsApp(ctk.CTk):
             pass
 
     def load_crops(self):
-        try:
-            crops = SubSupa.LoadCrops()
-            if crops:
-                self.CropCombo.configure(values=crops)
-                self.CropCombo.set(crops[0])
-            else:
-                self.CropCombo.configure(values=["Select"])
-                self.CropCombo.set("Select")
-        except Exception as e:
-            self.set_status(f"LoadCrops failed: {e}")
+        TaskRunner.Run(self, SubSupa.LoadCrops, on_done=self.show_crops,
+                       on_error=lambda e: self.set_status(f"LoadCrops failed: {e}"))
+
+    def show_crops(self, crops):
+        if crops:
+            self.CropCombo.configure(values=crops)
+            self.CropCombo.set(crops[0])
+        else:
+            self.CropCombo.configure(values=["Select"])
+            self.CropCombo.set("Select")
 
     def on_crop_selected(self, val=None):
         sel = (self.CropCombo.get() or "").strip()
@@ -157,23 +158,28 @@ class PrintPlantTagsApp(ctk.CTk):
             except Exception:
                 self.set_status("Cannot parse Crop number")
                 return
-        try:
-            strains = SubSupa.LoadStrains(crop_no)
-            if strains:
-                self.StrainCombo.configure(values=strains)
-                self.StrainCombo.set(strains[0])
-                # Trigger strain selection to update count
-                self.on_strain_selected()
-            else:
-                self.StrainCombo.configure(values=["Select"])
-                self.StrainCombo.set("Select")
-                self.LabelCountEntry.delete(0, "end")
-                self.LabelCountEntry.insert(0, "0")
-        except Exception as e:
-            self.set_status(f"LoadStrains failed: {e}")
+        TaskRunner.Run(self, SubSupa.LoadStrainCounts, crop_no,
+                       on_done=self.show_strains,
+                       on_error=lambda e: self.set_status(f"LoadStrainCounts failed: {e}"),
+                       disable=(self.StrainCombo, self.BtnPrint))
+
+    def show_strains(self, rows):
+        # plant counts come with the strains, so picking a strain needs no query
+        self.PlantCounts = {r["Strain"]: r.get("Plants") or 0 for r in rows if r.get("Strain")}
+        strains = ["Select"] + list(self.PlantCounts) if self.PlantCounts else []
+        if strains:
+            self.StrainCombo.configure(values=strains)
+            self.StrainCombo.set(strains[0])
+            # Trigger strain selection to update count
+            self.on_strain_selected()
+        else:
+            self.StrainCombo.configure(values=["Select"])
+            self.StrainCombo.set("Select")
+            self.LabelCountEntry.delete(0, "end")
+            self.LabelCountEntry.insert(0, "0")
 
     def on_strain_selected(self, val=None):
-        """Query plant count when strain is selected"""
+        """Show the plant count of the selected strain"""
         sel_crop = (self.CropCombo.get() or "").strip()
         sel_strain = (self.StrainCombo.get() or "").strip()
         
@@ -187,33 +193,16 @@ class PrintPlantTagsApp(ctk.CTk):
             self.LabelCountEntry.insert(0, "0")
             return
         
-        # Parse crop number
-        token = sel_crop.split('-')[0].strip()
-        try:
-            crop_no = int(token.split()[0])
-        except Exception:
-            try:
-                crop_no = int(token)
-            except Exception:
-                self.set_status("Cannot parse Crop number")
-                return
-        
-        # Query scaleplants table for count
-        try:
-            count = SubSupa.CountPlants(crop_no, sel_strain)
-            
-            self.LabelCountEntry.delete(0, "end")
-            self.LabelCountEntry.insert(0, str(count))
-            self.set_status(f"Found {count} plants for {sel_strain}")
-        except Exception as e:
-            self.set_status(f"Query failed: {e}")
-            self.LabelCountEntry.delete(0, "end")
-            self.LabelCountEntry.insert(0, "0")
+        count = self.PlantCounts.get(sel_strain, 0)
+        self.LabelCountEntry.delete(0, "end")
+        self.LabelCountEntry.insert(0, str(count))
+        self.set_status(f"Found {count} plants for {sel_strain}")
 
     def check_hardware_status(self):
         """Check QR scanner and Ranger scale status"""
         # Check QR scanner
         try:
+            SubReadQRCode.Connect()
             qr_available = hasattr(SubReadQRCode, 'QrReader') and SubReadQRCode.QrReader is not None
             if qr_available != self.PrevQrStatus:
                 self.PrevQrStatus = qr_available
@@ -0,0 +1,129 @@
+"""Local index of Metric tags for WeighBucked.
+
+TagIndex loads the issued tag numbers from metrictags once per session, then
+on a background thread fetches only tags above the highest one it holds (the
+high-water mark). For each crop the screen is working on it also keeps the
+scalebuck weights, so "is this tag issued" and "has it been weighed" are local
+lookups that keep answering through short Wi-Fi drops.
+
+A tag missing from the index is checked once against Supabase before it is
+refused, which covers tags issued since the last refresh.
+"""
+import threading
+
+import SubSupa
+
+REFRESH_SECONDS = 60
+PAGE_SIZE = 1000
+
+
+class TagIndex:
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.loaded = False         # issued tags have been loaded once
+        self.high_water = None      # largest TagNo held
+        self.error = None           # last refresh failure, None once it works again
+        self._tags = set()
+        self._weights = {}          # CropNo -> {(Strain, TagNo): Weight}
+        self._since = {}            # CropNo -> newest BuckDate seen
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._tags)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="TagIndex", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread = None
+
+    def watch_crop(self, crop_no: int):
+        """Keep the weights for crop_no; they load on the background thread."""
+        with self._lock:
+            if crop_no in self._weights:
+                return
+            self._weights[crop_no] = None
+        self._wake.set()
+
+    # ---- lookups ----
+    def is_issued(self, tag_no: str) -> bool:
+        """True if Metric issued tag_no.
+
+        Raises only when the index has never loaded and Supabase can't be reached.
+        """
+        if tag_no in self._tags:
+            return True
+        try:
+            found = SubSupa.CheckTag(tag_no)
+        except Exception:
+            if not self.loaded:
+                raise
+            return False
+        if found:
+            with self._lock:
+                self._tags.add(tag_no)
+        return found
+
+    def weight(self, crop_no: int, strain: str, tag_no: str):
+        """Weight recorded for the tag, or None if it hasn't been weighed."""
+        weights = self._weights.get(crop_no)
+        if weights is None:
+            return SubSupa.GetOneTag(crop_no, strain, tag_no)
+        return weights.get((strain, tag_no))
+
+    def record(self, crop_no: int, strain: str, tag_no: str, weight):
+        """Note a weight this screen has just saved."""
+        with self._lock:
+            weights = self._weights.get(crop_no)
+            if weights is not None:
+                weights[(strain, tag_no)] = weight
+
+    # ---- refresh ----
+    def refresh(self) -> int:
+        """Fetch tags above the high-water mark and new weights; return the new tag count."""
+        added = 0
+        while True:
+            page = SubSupa.LoadMetricTags(self.high_water, PAGE_SIZE)
+            with self._lock:
+                before = len(self._tags)
+                self._tags.update(page)
+                added += len(self._tags) - before
+                if page:
+                    self.high_water = max(self.high_water or page[-1], page[-1])
+            if len(page) < PAGE_SIZE:
+                break
+        self.loaded = True
+
+        for crop_no in list(self._weights):
+            rows = SubSupa.LoadBuckTags(crop_no, self._since.get(crop_no))
+            with self._lock:
+                weights = self._weights.get(crop_no) or {}
+                for row in rows:
+                    weights[(row.get("Strain"), row.get("TagNo"))] = row.get("Weight")
+                    if row.get("BuckDate"):
+                        self._since[crop_no] = row["BuckDate"]
+                self._weights[crop_no] = weights
+        return added
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                added = self.refresh()
+                if added:
+                    print(f"TagIndex: {added} new tags, {len(self._tags)} total")
+                self.error = None
+            except Exception as e:
+                # keep serving what we have; try again next time round
+                self.error = e
+                print(f"TagIndex refresh failed: {e}")
+            self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
@@ -10,6 +10,7 @@ import subprocess
 
 from SubPrintLabels import PrintOneLabel
 import SubSupa
+from SubTagIndex import TagIndex
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
@@ -17,8 +18,8 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 import Common.SubScale as SubScale
 import Common.SubReadQRCode as SubReadQRCode
-
-SubReadQRCode.ConnectScanner()
+import Common.TaskRunner as TaskRunner
+import Common.WriteJournal as WriteJournal
 
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -91,6 +92,12 @@ class WeighBuckedApp(ctk.CTk):
                                              fg_color="#2b2b2b", padx=10, pady=5)
         self.ScaleStatusLabel.pack(side="right", padx=(0, 0))
 
+        # Weights waiting in the local journal to reach Supabase
+        self.SyncLabel = ctk.CTkLabel(header_frame, text="Sync: ...", font=("Arial", 12),
+                                      corner_radius=6, fg_color="#2b2b2b", padx=10, pady=5, cursor="hand2")
+        self.SyncLabel.pack(side="right", padx=(0, 8))
+        WriteJournal.Watch(self, self.SyncLabel)
+
         # Crop selector
         ctk.CTkLabel(frame, text="Crop", font=DEFAULT_FONT).grid(row=1, column=0, sticky="e", padx=(6,6))
         self.CropCombo = ctk.CTkComboBox(frame, values=[], width=200, font=DEFAULT_FONT, command=self.onCropSelected)
@@ -130,8 +137,14 @@ class WeighBuckedApp(ctk.CTk):
         # Polling state
         self._PollId = None
         self._PrevWeight = None
+        self._StableWeight = None   # settled weight from the scale, not yet saved
+        self._ScanPending = False   # tag came from a scan and is waiting for a weight
         self._PrevRangerStatus = None
         self._QrStatusCheckCounter = 0  # Counter for periodic QR status checks
+        self._Saving = False        # a tote save is waiting on Supabase
+
+        # issued tags and weighed totes, kept locally (see SubTagIndex)
+        self.Tags = TagIndex().start()
 
         # Check QR reader status initially
         self.checkQrStatus()
@@ -139,8 +152,8 @@ class WeighBuckedApp(ctk.CTk):
         # Load crops
         self.loadCrops()
 
-        # start polling
-        self.startPolling()
+        # start polling once the window is up (opens the scanner and scale)
+        self.after(100, self.startPolling)
 
         # ensure stop on close
         try:
@@ -167,18 +180,18 @@ class WeighBuckedApp(ctk.CTk):
             pass
 
     def loadCrops(self):
-        try:
-            crops = SubSupa.LoadCrops()
-            if crops:
-                self.CropCombo.configure(values=crops)
-                self.CropCombo.set(crops[0])
-                # also populate strains for initial selection
-                self.onCropSelected()
-            else:
-                self.CropCombo.configure(values=["Select"])
-                self.CropCombo.set("Select")
-        except Exception as e:
-            self.setStatus(f"LoadCrops failed: {e}")
+        TaskRunner.Run(self, SubSupa.LoadCrops, on_done=self.showCrops,
+                       on_error=lambda e: self.setStatus(f"LoadCrops failed: {e}"))
+
+    def showCrops(self, crops):
+        if crops:
+            self.CropCombo.configure(values=crops)
+            self.CropCombo.set(crops[0])
+            # also populate strains for initial selection
+            self.onCropSelected()
+        else:
+            self.CropCombo.configure(values=["Select"])
+            self.CropCombo.set("Select")
 
     def onCropSelected(self, val=None):
         sel = (self.CropCombo.get() or "").strip()
@@ -195,19 +208,22 @@ class WeighBuckedApp(ctk.CTk):
             except Exception:
                 self.setStatus("Cannot parse Crop number")
                 return
+        self.Tags.watch_crop(crop_no)
         # load strains for this crop
-        try:
-            strains = SubSupa.LoadStrains(crop_no)
-            if strains:
-                self.StrainCombo.configure(values=strains)
-                self.StrainCombo.set(strains[0])
-                # trigger strain selection
-                self.onStrainSelected()
-            else:
-                self.StrainCombo.configure(values=["Select"])
-                self.StrainCombo.set("Select")
-        except Exception as e:
-            self.setStatus(f"LoadStrains failed: {e}")
+        TaskRunner.Run(self, SubSupa.LoadStrains, crop_no,
+                       on_done=self.showStrains,
+                       on_error=lambda e: self.setStatus(f"LoadStrains failed: {e}"),
+                       disable=(self.StrainCombo, self.BtnSave))
+
+    def showStrains(self, strains):
+        if strains:
+            self.StrainCombo.configure(values=strains)
+            self.StrainCombo.set(strains[0])
+            # trigger strain selection
+            self.onStrainSelected()
+        else:
+            self.StrainCombo.configure(values=["Select"])
+            self.StrainCombo.set("Select")
 
     def onStrainSelected(self, val=None):
         selCrop = (self.CropCombo.get() or "").strip()
@@ -219,29 +235,37 @@ class WeighBuckedApp(ctk.CTk):
 
     # ---- Polling ----
     def startPolling(self):
+        self.Reader = SubScale.StartReader(POLL_INTERVAL_MS / 1000)
+        self.Reader.on_change(self, self.showWeight)
+        self.Reader.on_stable(self, self.onStableWeight)
         self.pollWeight()
 
-    def pollWeight(self):
-        wstr = '0'
+    def showWeight(self, weight):
+        """Called on the Tk thread by SubScale.ScaleReader when the weight changes."""
+        wstr = str(weight)
+        if wstr == self._PrevWeight:
+            return
+        self._PrevWeight = wstr
         try:
-            if SubScale is not None:
-                w = SubScale.GetRangerWeight()
-                wstr = str(w)
-            else:
-                wstr = 'Error'
+            self.WeightEntry.configure(state='normal')
+            self.WeightEntry.delete(0, 'end')
+            self.WeightEntry.insert(0, wstr)
+            self.WeightEntry.configure(state='disabled')
         except Exception:
-            wstr = 'Error'
+            pass
 
-        if wstr != self._PrevWeight:
-            self._PrevWeight = wstr
-            try:
-                self.WeightEntry.configure(state='normal')
-                self.WeightEntry.delete(0, 'end')
-                self.WeightEntry.insert(0, wstr)
-                self.WeightEntry.configure(state='disabled')
-            except Exception:
-                pass
-        
+    def onStableWeight(self, weight):
+        """Called on the Tk thread when the scale settles (weight) or moves (None).
+
+        Saves the tote as soon as both a scanned tag and a stable weight exist.
+        """
+        self._StableWeight = weight
+        if weight is not None and self._ScanPending:
+            self.saveToteWeight()
+
+    def pollWeight(self):
+        # Weight display is driven by the background reader (see showWeight);
+        # this loop refreshes the scale status and checks the QR reader.
         # Check scale status and update if changed
         try:
             scout_connected, ranger_connected = SubScale.GetScaleStatus()
@@ -261,18 +285,10 @@ class WeighBuckedApp(ctk.CTk):
             if hasattr(SubReadQRCode, 'QrReader'):
                 qr_code = SubReadQRCode.CheckMetricQr()
                 if qr_code and qr_code != "none":
-                    # Verify tag is valid before accepting
-                    try:
-                        tag_valid = SubSupa.CheckTag(qr_code)
-                        if tag_valid:
-                            # Update metric tag entry
-                            self.MetricTagEntry.delete(0, 'end')
-                            self.MetricTagEntry.insert(0, qr_code)
-                            self.setStatus(f"Scanned metric tag: {qr_code}")
-                        else:
-                            self.setStatus(f"Invalid tag: {qr_code} - Not found in Metric tag list")
-                    except Exception as e:
-                        self.setStatus(f"CheckTag error: {e}")
+                    # Verify tag is valid before accepting (may ask Supabase)
+                    TaskRunner.Run(self, self.Tags.is_issued, qr_code,
+                                   on_done=lambda valid, tag=qr_code: self.onTagScanned(tag, valid),
+                                   on_error=lambda e: self.setStatus(f"CheckTag error: {e}"))
         except Exception as e:
             self.setStatus(f"QR Reader error: {e}")
         
@@ -287,7 +303,26 @@ class WeighBuckedApp(ctk.CTk):
         except Exception:
             self._PollId = None
 
+    def onTagScanned(self, qr_code: str, tag_valid: bool):
+        if tag_valid:
+            # Update metric tag entry
+            self.MetricTagEntry.delete(0, 'end')
+            self.MetricTagEntry.insert(0, qr_code)
+            self.setStatus(f"Scanned metric tag: {qr_code}")
+            # save automatically once the weight has settled
+            self._ScanPending = True
+            if self._StableWeight is not None:
+                self.saveToteWeight()
+            else:
+                self.setStatus(f"Scanned metric tag: {qr_code}. Waiting for stable weight...")
+        else:
+            self.setStatus(f"Invalid tag: {qr_code} - Not found in Metric tag list")
+
     def stopPolling(self):
+        try:
+            SubScale.StopReader()
+        except Exception:
+            pass
         try:
             if self._PollId:
                 self.after_cancel(self._PollId)
@@ -297,12 +332,16 @@ class WeighBuckedApp(ctk.CTk):
 
     def onClose(self):
         self.stopPolling()
+        self.Tags.stop()
         try:
             self.destroy()
         except Exception:
             pass
 
     def saveToteWeight(self):
+        if self._Saving:
+            return
+        self._ScanPending = False
         selCrop = (self.CropCombo.get() or "").strip()
         selStrain = (self.StrainCombo.get() or "").strip()
         metricTag = (self.MetricTagEntry.get() or "").strip()
@@ -315,16 +354,7 @@ class WeighBuckedApp(ctk.CTk):
         if not metricTag:
             messagebox.showwarning("Enter Metric Tag", "Please scan or enter a metric tag number")
             return
-        
-        # Validate that tag exists in metrictags table
-        try:
-            if not SubSupa.CheckTag(metricTag):
-                messagebox.showerror("Invalid Tag", f"Tag {metricTag} is not in the Metric tag list. Please verify the tag number.")
-                return
-        except Exception as e:
-            self.setStatus(f"CheckTag failed: {e}")
-            return
-        
+
         token = selCrop.split('-')[0].strip()
         try:
             crop_no = int(token.split()[0])
@@ -335,45 +365,68 @@ class WeighBuckedApp(ctk.CTk):
                 self.setStatus("Cannot parse Crop number")
                 return
 
-        # Check if tag already has weight data
         try:
-            existingWeight = SubSupa.GetOneTag(crop_no, selStrain, metricTag)
-        except Exception as e:
-            self.setStatus(f"GetOneTag failed: {e}")
-            return
-
-        try:
-            currentWeight = float((self.WeightEntry.get() or "0").strip())
+            if self._StableWeight is not None:
+                currentWeight = float(self._StableWeight)
+            else:
+                currentWeight = float((self.WeightEntry.get() or "0").strip())
         except Exception:
             self.setStatus("Invalid weight")
             return
 
+        # Validate that tag exists in metrictags table, and check if it already has weight data
+        def lookup():
+            if not self.Tags.is_issued(metricTag):
+                return False, None
+            return True, self.Tags.weight(crop_no, selStrain, metricTag)
+
+        def failed(e):
+            self._Saving = False
+            self.setStatus(f"Tag lookup failed: {e}")
+
+        self._Saving = True
+        TaskRunner.Run(self, lookup,
+                       on_done=lambda res: self.confirmToteWeight(selCrop, crop_no, selStrain, metricTag,
+                                                                  int(currentWeight), *res),
+                       on_error=failed,
+                       disable=(self.BtnSave, self.BtnPrintLabel))
+
+    def confirmToteWeight(self, selCrop, crop_no, selStrain, metricTag, weight, issued, existingWeight):
+        if not issued:
+            self._Saving = False
+            messagebox.showerror("Invalid Tag", f"Tag {metricTag} is not in the Metric tag list. Please verify the tag number.")
+            return
+
         if existingWeight and float(existingWeight) > 0:
             resp = messagebox.askyesno("Tag Already Weighed", f"Metric tag {metricTag} has weight {existingWeight} g. Replace this weight?")
             if not resp:
+                self._Saving = False
                 self.setStatus("Update cancelled")
                 return
             # Update existing weight
-            try:
-                SubSupa.UpdateTagWeight(crop_no, selStrain, metricTag, int(currentWeight))
-                self.setStatus(f"Updated metric tag {metricTag} weight to {int(currentWeight)} g")
-            except Exception as e:
-                self.setStatus(f"UpdateTagWeight failed: {e}")
-                return
+            write, done = WriteJournal.UpdateTagWeight, "Updated metric tag {} weight to {} g"
         else:
             # Insert new tag weight
-            try:
-                SubSupa.InsertNewTag(crop_no, selStrain, metricTag, int(currentWeight))
-                self.setStatus(f"Saved metric tag {metricTag} weight: {int(currentWeight)} g")
-            except Exception as e:
-                self.setStatus(f"InsertNewTag failed: {e}")
-                return
-        
-        PrintOneLabel(selStrain, "Bucked Flower", selCrop, "Metric", metricTag, int(currentWeight))
-        
-        # Clear metric tag for next bag
-        self.MetricTagEntry.delete(0, 'end')
-        
+            write, done = WriteJournal.InsertNewTag, "Saved metric tag {} weight: {} g"
+
+        def saved(res):
+            self._Saving = False
+            self.Tags.record(crop_no, selStrain, metricTag, weight)
+            self.setStatus(done.format(metricTag, weight))
+
+            PrintOneLabel(selStrain, "Bucked Flower", selCrop, "Metric", metricTag, weight)
+
+            # Clear metric tag for next bag; this weight is used
+            self.MetricTagEntry.delete(0, 'end')
+            self._StableWeight = None
+
+        def failed(e):
+            self._Saving = False
+            self.setStatus(f"{write.__name__} failed: {e}")
+
+        TaskRunner.Run(self, write, crop_no, selStrain, metricTag, weight,
+                       on_done=saved, on_error=failed,
+                       disable=(self.BtnSave, self.BtnPrintLabel))
 
     def printLabel(self):
         selCrop = (self.CropCombo.get() or "").strip()
@@ -399,16 +452,15 @@ class WeighBuckedApp(ctk.CTk):
                 return
 
         # retrieve weight (if any)
-        try:
-            weight = SubSupa.GetOneTag(crop_no, selStrain, metricTag)
+        def printOne(weight):
             weight_val = int(weight) if weight else 0
-        except Exception as e:
-            self.setStatus(f"GetOneTag failed: {e}")
-            return
-
-        PrintOneLabel(selStrain, "Bucked Flower", selCrop, "Metric", metricTag, weight_val)
+            PrintOneLabel(selStrain, "Bucked Flower", selCrop, "Metric", metricTag, weight_val)
+            self.setStatus(f"Sent label to printer for metric tag {metricTag}")
 
-        self.setStatus(f"Sent label to printer for metric tag {metricTag}")
+        TaskRunner.Run(self, self.Tags.weight, crop_no, selStrain, metricTag,
+                       on_done=printOne,
+                       on_error=lambda e: self.setStatus(f"GetOneTag failed: {e}"),
+                       disable=(self.BtnPrintLabel,))
 
 if __name__ == '__main__':
     ctk.set_appearance_mode("dark")
@@ -3,7 +3,6 @@ from tkinter import ttk, messagebox
 from tkinter.scrolledtext import ScrolledText
 from datetime import datetime
 from pathlib import Path
-import SubSupa
 import os
 import sys
 import subprocess
@@ -14,6 +13,8 @@ if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 import Common.SubScale as SubScale
 import Common.SubReadQRCode as SubReadQRCode
+import Common.TaskRunner as TaskRunner
+import Common.WriteJournal as WriteJournal
 
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -130,20 +131,25 @@ class WeighHarvestApp(ctk.CTk):
 
         # Status label
         self.StatusLabel = ctk.CTkLabel(container, text="", font=("Arial", 12), text_color="#00aa00")
-        self.StatusLabel.grid(row=5, column=0, columnspan=4, sticky="w", pady=(6,0))
+        self.StatusLabel.grid(row=5, column=0, columnspan=3, sticky="w", pady=(6,0))
+
+        # Weights waiting in the local journal to reach Supabase
+        self.SyncLabel = ctk.CTkLabel(container, text="Sync: ...", font=("Arial", 12), cursor="hand2")
+        self.SyncLabel.grid(row=5, column=3, sticky="e", pady=(6,0))
+        WriteJournal.Watch(self, self.SyncLabel)
 
         # Polling state
         self._PollId = None
         self._QrPollId = None
         self._PrevWeight = None
+        self._StableWeight = None   # settled weight from the scale, not yet recorded
+        self._ScanPending = False   # plant ID came from a scan and is waiting for a weight
         self._PrevRangerStatus = None
         self._QrStatusCheckCounter = 0  # Counter for periodic QR status checks
+        self._Saving = False        # a plant is being recorded in the journal
 
-        # Check QR reader status initially
-        self.CheckQrStatus()
-
-        # Start polling scale and QR
-        self.StartPolling()
+        # Open the scanner and scale once the window is up, then start polling
+        self.after(100, self.StartHardware)
 
         # Ensure stop on close
         try:
@@ -151,6 +157,12 @@ class WeighHarvestApp(ctk.CTk):
         except Exception:
             pass
 
+    def StartHardware(self):
+        SubReadQRCode.Connect()
+        SubScale.Connect()
+        self.CheckQrStatus()
+        self.StartPolling()
+
     # ---- QR Reader Status ----
     def CheckQrStatus(self):
         """Check if QR reader is connected and update status label."""
@@ -165,26 +177,15 @@ class WeighHarvestApp(ctk.CTk):
 
     # ---- Polling ----
     def StartPolling(self, interval_ms: int = 500):
+        self.Reader = SubScale.StartReader(interval_ms / 1000)
+        self.Reader.on_change(self, self.ShowWeight)
+        self.Reader.on_stable(self, self.OnStableWeight)
         self.PollWeight(interval_ms)
         self.PollQr(interval_ms)
 
     def PollWeight(self, interval_ms: int):
-        wstr = '0'
-        try:
-            wstr = SubScale.GetRangerWeight()
-        except Exception:
-            wstr = 'Error'
-        if wstr != self._PrevWeight:
-            self._PrevWeight = wstr
-            try:
-                self.WeightEntry.configure(state='normal')
-                self.WeightEntry.delete(0, 'end')
-                self.WeightEntry.insert(0, wstr)
-                self.WeightEntry.configure(state='disabled')
-            except Exception:
-                pass
-        
-        # Check scale status and update if changed
+        # Weight display is driven by the background reader (see ShowWeight);
+        # this loop only refreshes the scale status indicator.
         try:
             scout_connected, ranger_connected = SubScale.GetScaleStatus()
             if ranger_connected != self._PrevRangerStatus:
@@ -203,6 +204,29 @@ class WeighHarvestApp(ctk.CTk):
         except Exception:
             self._PollId = None
 
+    def ShowWeight(self, weight):
+        """Called on the Tk thread by SubScale.ScaleReader when the weight changes."""
+        wstr = str(weight)
+        if wstr == self._PrevWeight:
+            return
+        self._PrevWeight = wstr
+        try:
+            self.WeightEntry.configure(state='normal')
+            self.WeightEntry.delete(0, 'end')
+            self.WeightEntry.insert(0, wstr)
+            self.WeightEntry.configure(state='disabled')
+        except Exception:
+            pass
+
+    def OnStableWeight(self, weight):
+        """Called on the Tk thread when the scale settles (weight) or moves (None).
+
+        Records the plant as soon as both a scanned plant ID and a stable weight exist.
+        """
+        self._StableWeight = weight
+        if weight is not None and self._ScanPending:
+            self.ProcessCurrent()
+
     def PollQr(self, interval_ms: int):
         try:
             # SubReadQRCode.CheckQr should return a PlantNo or None/empty
@@ -224,8 +248,12 @@ class WeighHarvestApp(ctk.CTk):
                     self.PlantEntry.insert(0, str(plantno))
                 except Exception:
                     pass
-                # automatically process when QR scanned
-                self.ProcessCurrent()
+                # automatically process once the weight has settled
+                self._ScanPending = True
+                if self._StableWeight is not None:
+                    self.ProcessCurrent()
+                else:
+                    self.SetStatus("Waiting for stable weight...", kind='warning')
         except Exception:
             pass
         
@@ -241,6 +269,10 @@ class WeighHarvestApp(ctk.CTk):
             self._QrPollId = None
 
     def StopPolling(self):
+        try:
+            SubScale.StopReader()
+        except Exception:
+            pass
         try:
             if self._PollId:
                 self.after_cancel(self._PollId)
@@ -267,8 +299,14 @@ class WeighHarvestApp(ctk.CTk):
         self.ProcessCurrent()
 
     def ProcessCurrent(self):
+        if self._Saving:
+            return
+        self._ScanPending = False
         plantno = (self.PlantEntry.get() or "").strip()
-        weight_s = (self.WeightEntry.get() or "").strip()
+        if self._StableWeight is not None:
+            weight_s = str(self._StableWeight)
+        else:
+            weight_s = (self.WeightEntry.get() or "").strip()
         plant_type = (self.TypeCombo.get() or "").strip().lower()
 
         if not plantno:
@@ -283,58 +321,45 @@ class WeighHarvestApp(ctk.CTk):
             self.SetStatus("Weight must be > 0", kind='warning')
             return
 
-        # fetch plant record
-        try:
-            rec = SubSupa.GetOnePlant(plantno)
-        except Exception as e:
-            self.SetStatus(f"DB lookup failed: {e}", kind='error')
-            return
-
-        strain = ""
-        wet_existing = 0.0
-        dry_existing = 0.0
-        if rec:
-            # GetOnePlant returns list of rows (or single row); handle both
-            row = rec[0] if isinstance(rec, (list, tuple)) and len(rec) else rec
-            strain = (row.get('Strain') or "")
-            wet_existing = float(row.get('WetWeight') or 0.0)
-            dry_existing = float(row.get('DryWeight') or 0.0)
-
-        # Duplicate check
-        if plant_type == 'wet' and wet_existing > 0:
-            resp = messagebox.askyesno("Duplicate", f"Wet weight already recorded ({wet_existing} g). Continue and overwrite?")
-            if not resp:
-                self.SetStatus("Operation cancelled by user", kind='info')
-                return
-        if plant_type == 'dry' and dry_existing > 0:
-            resp = messagebox.askyesno("Duplicate", f"Dry weight already recorded ({dry_existing} g). Continue and overwrite?")
-            if not resp:
-                self.SetStatus("Operation cancelled by user", kind='info')
+        self._Saving = True
+        self.WeighPlant(plantno, plant_type, weight, overwrite=False)
+
+    def WeighPlant(self, plantno: str, plant_type: str, weight: float, overwrite: bool):
+        """Commit the weight to the local journal and confirm it at once; WriteJournal
+        sends it to Supabase through weigh_plant. A weight Supabase already holds (or a
+        plant it doesn't know) comes back as a sync conflict, which the Sync label
+        offers to retry as an overwrite."""
+        def record():
+            # a weight for this plant taken here and not sent yet: ask before replacing it
+            earlier = WriteJournal.Pending("WeighPlant", PlantNo=plantno, PlantType=plant_type)
+            if earlier and not overwrite:
+                return earlier[-1]
+            WriteJournal.WeighPlant(plantno, plant_type, int(weight), datetime.now().isoformat(), overwrite)
+            return None
+
+        def recorded(earlier):
+            if earlier is not None:
+                resp = messagebox.askyesno("Duplicate", f"{plant_type.capitalize()} weight already taken on this station ({earlier.get('Weight')} g). Continue and overwrite?")
+                if not resp:
+                    self._Saving = False
+                    self.SetStatus("Operation cancelled by user", kind='info')
+                    return
+                self.WeighPlant(plantno, plant_type, weight, overwrite=True)
                 return
+            self.Recorded(plantno, plant_type, weight, "Recorded")
 
-        # Update DB
-        try:
-            if plant_type == 'dry':
-                SubSupa.UpdateDryWeight(plantno, int(weight))
-            else:
-                SubSupa.UpdateWetWeight(plantno, int(weight))
-        except Exception as e:
-            self.SetStatus(f"DB update failed: {e}", kind='error')
-            return
+        def failed(e):
+            self._Saving = False
+            self.SetStatus(f"Journal write failed: {e}", kind='error')
 
-        # Insert scale log (SubSupa.InsertScaleLog signature: PlantNo, Strain, PlantType, Weight)
-        try:
-            SubSupa.InsertScaleLog(str(plantno), strain, plant_type.capitalize(), int(weight))
-        except Exception as e:
-            # Surface API errors to the status label for debugging
-            try:
-                self.SetStatus(f"Scale log failed: {e}", kind='error')
-            except Exception:
-                pass
+        TaskRunner.Run(self, record, on_done=recorded, on_error=failed,
+                       disable=(self.BtnProcess,))
 
+    def Recorded(self, plantno: str, plant_type: str, weight: float, status: str):
+        self._Saving = False
         # Add to on-screen log and clear plant entry
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_line = f"{ts} {strain} {plantno} {plant_type.capitalize()} {int(weight)} grams\n"
+        log_line = f"{ts} {plantno} {plant_type.capitalize()} {int(weight)} grams\n"
         try:
             self.LogBox.insert('end', log_line)
             self.LogBox.see('end')
@@ -342,7 +367,9 @@ class WeighHarvestApp(ctk.CTk):
             pass
 
         self.PlantEntry.delete(0, 'end')
-        self.SetStatus("Recorded", kind='info')
+        # this weight is used; wait for the next plant to settle
+        self._StableWeight = None
+        self.SetStatus(status, kind='info')
 
     def ClearLog(self):
         try:
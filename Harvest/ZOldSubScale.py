@@ -1,88 +0,0 @@
-#!/usr/bin/python3
-
-# Scout Scale: p.vid = 1027 p.pid = 24597
-# Ranger Scale: p.vid = 1027 p.pid = 24577
-import serial
-import serial.tools.list_ports
-from tkinter import messagebox
-import sys
-
-ScaleRanger = None
-ScaleScout = None
-ScoutConnected = False
-RangerConnected = False
-
-def ConnectScales():
-    """Connect to Ohaus scales with retry logic. Call this after app initialization."""
-    global ScaleRanger, ScaleScout, ScoutConnected, RangerConnected
-    
-    while not (ScoutConnected or RangerConnected):
-        try:
-            ports = list(serial.tools.list_ports.comports())
-            for p in ports:
-                if p.vid == 1027 and p.pid == 24577:
-                    scaleport = p.device
-                    print("Connecting to Ranger Scale on " + scaleport)
-                    ScaleRanger = serial.Serial(port=scaleport, baudrate=9600, timeout=2)
-                    RangerConnected = True
-                    print("Connected to Ranger Scale " + scaleport)
-                if p.vid == 1027 and p.pid == 24597:
-                    scaleport = p.device
-                    print("Connecting to Scout Scale on " + scaleport)
-                    ScaleScout = serial.Serial(port=scaleport, baudrate=9600, timeout=2)
-                    ScoutConnected = True
-                    print("Connected to Scout Scale " + scaleport)
-            
-            if not (ScoutConnected or RangerConnected):
-                raise Exception("No Ohaus scale detected")
-                
-        except Exception as e:
-            print(f"Failed to connect to scale: {e}")
-            retry = messagebox.askretrycancel(
-                "Scale Not Available",
-                f"Could not connect to scale.\n\n"
-                f"Please check:\n"
-                f"1. Scale is turned on and connected via USB\n"
-                f"2. Scale is not being used by another application\n"
-                f"3. USB cable is properly connected\n\n"
-                f"Error: {e}\n\n"
-                f"Click Retry to try again, or Cancel to exit."
-            )
-            if not retry:
-                sys.exit(1)
-
-def GetScaleStatus():
-    """Return tuple of (ScoutConnected, RangerConnected)."""
-    return (ScoutConnected, RangerConnected)
-
-
-def GetScoutWeight():
-    ScaleScout.reset_input_buffer()
-    ScaleScout.write("IP\r\n".encode())
-    weight = str(ScaleScout.readline())
-    w = weight.split()
-#    print(w)
-    Weight = '0'
-    if len(w) < 3:
-        Weight = 0
-    elif w[2].find("g") == 0:
-        Weight = str(round(float(w[1])))
-    return Weight
-
-def GetRangerWeight():
-    ScaleRanger.reset_input_buffer()
-    ScaleRanger.write("IP\r\n".encode())
-    weight = str(ScaleRanger.readline())
-    w = weight.split()
-#    print(w)
-    Weight = '0'
-    if len(w) < 3:
-        Weight = 0
-    elif w[2].find("g") == 0:
-        Weight = str(round(float(w[1])))
-    return Weight
-
-
-
-#w = GetWeight()
-#print("Weight is ", w)
\ No newline at end of file
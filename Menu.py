@@ -11,13 +11,20 @@ Implementation details:
 - If launching a script fails, an error dialog is shown and the status label is updated with the error.
 - A busy overlay is displayed while launching a script to indicate to the user that the application is working.
 - After launching a script, the menu window is destroyed.
+- On start the menu makes sure the local hardware service (Common/HardwareService.py) is running,
+  so the scales and scanner stay open while screens come and go.
+- Diagnostics opens a window over Common/querylog.jsonl (written by Common/QueryStats.py in every
+  screen): per-screen timing histograms for each data-layer call and query, and the latest slow
+  or failed ones with their table and filters.
 """
 import time
 import os
 import sys
 import subprocess
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import messagebox, ttk
+import Common.HardwareService as HardwareService
+import Common.QueryStats as QueryStats
 
 ROOT_DIR = os.path.dirname(__file__)
 DEFAULT_FONT = ("Arial", 14)
@@ -153,6 +160,82 @@ def open_script(rel_path: str, status_label: ctk.CTkLabel, parent: ctk.CTk):
         status_label.configure(text=f"Launch failed: {e}")
 
 
+class DiagnosticsWindow(ctk.CTkToplevel):
+    """Timing of Supabase calls and queries, per screen, from Common/querylog.jsonl."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Diagnostics")
+        self.geometry("1180x640")
+
+        frame = ctk.CTkFrame(self)
+        frame.pack(fill="both", expand=True, padx=12, pady=12)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(1, weight=3)
+        frame.grid_rowconfigure(3, weight=1)
+
+        style = ttk.Style(self)
+        style.theme_use('clam')
+        style.configure("Treeview", background="#2b2b2b", foreground="#dce4ee",
+                        fieldbackground="#2b2b2b", borderwidth=0, font=("Arial", 11))
+        style.configure("Treeview.Heading", background="#1f538d", foreground="#dce4ee",
+                        borderwidth=1, font=("Arial", 11, "bold"))
+        style.map("Treeview", background=[("selected", "#144870")])
+
+        # one row per screen / call, each screen's last QueryStats.WINDOW records
+        limits = [f"<{int(b * 1000)}ms" for b in QueryStats.BUCKETS]
+        limits.append(f">{int(QueryStats.BUCKETS[-1] * 1000)}ms")
+        cols = ("Screen", "Kind", "Name", "Count", "Errors", "Slow", "p50 ms", "p95 ms", "Max ms",
+                "Rows", "KB") + tuple(limits)
+        ctk.CTkLabel(frame, text="Calls by screen", font=("Arial", 14, "bold")).grid(row=0, column=0, sticky="w")
+        self.tree = ttk.Treeview(frame, columns=cols, show="headings", height=14)
+        for c in cols:
+            self.tree.heading(c, text=c)
+            wide = c in ("Screen", "Name")
+            self.tree.column(c, width=170 if wide else 62, anchor="w" if wide else "center")
+        self.tree.grid(row=1, column=0, sticky="nsew", pady=(4, 10))
+
+        slow_cols = ("When", "Screen", "Name", "Call", "ms", "Error / filters")
+        ctk.CTkLabel(frame, text=f"Slow (over {QueryStats.SlowSeconds():g}s) or failed",
+                     font=("Arial", 14, "bold")).grid(row=2, column=0, sticky="w")
+        self.slow = ttk.Treeview(frame, columns=slow_cols, show="headings", height=7)
+        for c, width in zip(slow_cols, (130, 140, 170, 140, 70, 520)):
+            self.slow.heading(c, text=c)
+            self.slow.column(c, width=width, anchor="w")
+        self.slow.grid(row=3, column=0, sticky="nsew", pady=(4, 10))
+
+        buttons = ctk.CTkFrame(frame, fg_color="transparent")
+        buttons.grid(row=4, column=0, sticky="ew")
+        self.status = ctk.CTkLabel(buttons, text="", font=("Arial", 12))
+        self.status.pack(side="left")
+        ctk.CTkButton(buttons, text="Close", width=100, font=DEFAULT_FONT, command=self.destroy).pack(side="right", padx=4)
+        ctk.CTkButton(buttons, text="Refresh", width=100, font=DEFAULT_FONT, command=self.refresh).pack(side="right", padx=4)
+
+        self.refresh()
+
+    def refresh(self):
+        records = QueryStats.ReadLog()
+        for tree in (self.tree, self.slow):
+            for iid in tree.get_children():
+                tree.delete(iid)
+
+        for s in QueryStats.Summary(records):
+            values = (s["screen"], s["kind"], s["name"], s["count"], s["errors"], s["slow"],
+                      f"{s['p50']:.0f}", f"{s['p95']:.0f}", f"{s['max']:.0f}",
+                      f"{s['rows']:.0f}", f"{s['bytes'] / 1024:.1f}") + tuple(s["hist"])
+            self.tree.insert("", "end", values=values)
+
+        for r in QueryStats.SlowCalls(records):
+            when = time.strftime("%m-%d %H:%M:%S", time.localtime(r.get("at", 0)))
+            detail = r.get("error") or r.get("filters", "")
+            if r.get("error") and r.get("filters"):
+                detail += f"  [{r['filters']}]"
+            self.slow.insert("", "end", values=(when, r.get("screen", ""), r.get("name", ""),
+                                                r.get("call", ""), f"{r.get('ms', 0):.0f}", detail))
+
+        self.status.configure(text=f"{len(records)} records in {QueryStats.LOG_PATH}")
+
+
 class MenuApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -211,12 +294,21 @@ class MenuApp(ctk.CTk):
                 sop_btn.grid(row=idx, column=1, pady=6, padx=(2, 6))
 
 
+        diag_btn = ctk.CTkButton(main, text="Diagnostics", font=DEFAULT_FONT,
+                                 command=lambda: DiagnosticsWindow(self))
+        diag_btn.grid(row=100, column=0, sticky="w", pady=12)
+
         # Exit button
         exit_btn = ctk.CTkButton(main, text="Exit", command=self.destroy, font=DEFAULT_FONT)
         exit_btn.grid(row=100, column=2, sticky="e", pady=12)
 
 
 def main():
+    try:
+        HardwareService.EnsureRunning()
+    except Exception as e:
+        # screens fall back to opening the ports themselves
+        print(f"Could not start hardware service: {e}")
     app = MenuApp()
     app.mainloop()
 
@@ -5,7 +5,8 @@ UI flow:
  - Select Strain (SubSupa.LoadStrains)
  - Select Type (Flower, Jars, PreRolls, Trim, Hash, Rosin)
  - Enter Metrc ID (via QR scanner or manual entry)
- - Enter Quantity, Save -> uses SubSupa.GetPackageWeight and SubSupa.InsertPackage
+ - Enter Quantity, Save -> uses SubSupa.GetPackageWeight, then queues the package in
+   Common.WriteJournal, which sends it with InsertPackage
  - Shows existing packages for Type via SubSupa.GetPackages
 """
 import customtkinter as ctk
@@ -21,6 +22,14 @@ import subprocess
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Common'))
 import SubReadQRCode
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.Prefetch as Prefetch
+import Common.TaskRunner as TaskRunner
+import Common.WriteJournal as WriteJournal
+
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -70,6 +79,12 @@ class AddPackageApp(ctk.CTk):
                                           text_color="#ff8800", corner_radius=6, 
                                           fg_color="#2b2b2b", padx=10, pady=5)
         self.QrStatusLabel.pack(side="right", padx=6, pady=4)
+
+        # Packages waiting in the local journal to reach Supabase
+        self.SyncLabel = ctk.CTkLabel(menu_bar, text="Sync: ...", font=("Arial", 12), corner_radius=6,
+                                      fg_color="#2b2b2b", padx=10, pady=5, cursor="hand2")
+        self.SyncLabel.pack(side="right", padx=6, pady=4)
+        WriteJournal.Watch(self, self.SyncLabel)
         
         self.title(APP_TITLE)
         self.geometry("1100x520")
@@ -180,11 +195,8 @@ class AddPackageApp(ctk.CTk):
         frame.rowconfigure(4, weight=1)
         frame.columnconfigure(3, weight=1)
 
-        # Initialize QR scanner
-        SubReadQRCode.ConnectScanner()
-
-        # Start checking for QR codes
-        self.check_qr_code()
+        # Connect the QR scanner once the window is up
+        self.after(100, self.start_scanner)
         
         # Initialize QR status tracking and start periodic status checks
         self.PrevQrStatus = None
@@ -198,19 +210,20 @@ class AddPackageApp(ctk.CTk):
         self.status.configure(text=text)
 
     def load_crops(self):
-        try:
-            crops = SubSupa.LoadCrops() or []
-            self.cmb_crop.configure(values=crops)
-            self.cmb_crop.set('Select')
-            # Reset downstream combos
-            self.cmb_strain.configure(values=['Select'])
-            self.cmb_strain.set('Select')
-            self.cmb_type.set('Select')
-            self.cmb_caseno.configure(values=['Select'])
-            self.cmb_caseno.set('Select')
-            self.ent_metrc.delete(0, 'end')
-        except Exception as e:
-            self.set_status(f"LoadCrops failed: {e}")
+        TaskRunner.Run(self, SubSupa.LoadCrops, on_done=self.show_crops,
+                       on_error=lambda e: self.set_status(f"LoadCrops failed: {e}"),
+                       disable=(self.btn_refresh,))
+
+    def show_crops(self, crops):
+        self.cmb_crop.configure(values=crops or [])
+        self.cmb_crop.set('Select')
+        # Reset downstream combos
+        self.cmb_strain.configure(values=['Select'])
+        self.cmb_strain.set('Select')
+        self.cmb_type.set('Select')
+        self.cmb_caseno.configure(values=['Select'])
+        self.cmb_caseno.set('Select')
+        self.ent_metrc.delete(0, 'end')
 
     def on_crop_selected(self):
         crop_display = (self.cmb_crop.get() or '').strip()
@@ -225,12 +238,15 @@ class AddPackageApp(ctk.CTk):
             except Exception:
                 self.set_status('Cannot parse Crop number')
                 return
-        try:
-            strains = SubSupa.LoadStrains(crop_no) or ['Select']
-            self.cmb_strain.configure(values=strains)
+        def show(strains):
+            self.cmb_strain.configure(values=strains or ['Select'])
             self.cmb_strain.set('Select')
-        except Exception as e:
-            self.set_status(f"LoadStrains failed: {e}")
+
+        # the harvest date is for the label; GetHarvestDate keeps it in RefCache
+        Prefetch.Start((SubSupa.LoadStrains, crop_no), (SubSupa.GetHarvestDate, crop_no))
+        TaskRunner.Run(self, Prefetch.Take, SubSupa.LoadStrains, crop_no, on_done=show,
+                       on_error=lambda e: self.set_status(f"LoadStrains failed: {e}"),
+                       disable=(self.cmb_strain, self.btn_save))
 
     def on_strain_selected(self):
         crop_display = (self.cmb_crop.get() or '').strip()
@@ -246,7 +262,11 @@ class AddPackageApp(ctk.CTk):
             except Exception:
                 self.set_status('Cannot parse Crop number')
                 return
-        # Load packages for the selected crop and strain
+        # Load packages for the selected crop and strain, and the cases of every type
+        # at the same time, so picking the type doesn't wait on another query
+        types = [t for t in self.cmb_type.cget('values') if t != 'Select']
+        Prefetch.Start((SubSupa.GetPackages, crop_no, strain),
+                       *[(SubSupa.LoadCases, crop_no, strain, t) for t in types])
         self.load_packages(crop_no, strain)
 
     def load_cases(self):
@@ -275,15 +295,14 @@ class AddPackageApp(ctk.CTk):
                 self.set_status('Cannot parse Crop number')
                 return
         
-        try:
+        def show(result):
             # LoadCases returns (cases, metrcid) - list of cases and metrc id
-            result = SubSupa.LoadCases(crop_no, strain, ptype)
             if result:
                 cases, metrcid = result
                 cases = cases or ['Select']
                 self.cmb_caseno.configure(values=cases)
                 self.cmb_caseno.set('Select')
-                
+
                 # If metrcid is not None, populate the Metrc ID entry
                 if metrcid:
                     self.ent_metrc.delete(0, 'end')
@@ -295,8 +314,10 @@ class AddPackageApp(ctk.CTk):
                 self.cmb_caseno.configure(values=['Select'])
                 self.cmb_caseno.set('Select')
                 self.set_status(f"Type selected: {ptype}")
-        except Exception as e:
-            self.set_status(f"LoadCases failed: {e}")
+
+        TaskRunner.Run(self, Prefetch.Take, SubSupa.LoadCases, crop_no, strain, ptype, on_done=show,
+                       on_error=lambda e: self.set_status(f"LoadCases failed: {e}"),
+                       disable=(self.cmb_caseno, self.btn_save))
 
     def on_case_selected(self):
         """Called when Case No is selected - populate Metrc ID if available"""
@@ -335,14 +356,23 @@ class AddPackageApp(ctk.CTk):
 #        if metrc_id and ptype:
 #            self.load_packages(metrc_id, ptype)
 
+    def start_scanner(self):
+        """Scans arrive from the scanner thread; poll only in Test Mode"""
+        if not SubReadQRCode.OnScan(self, self.on_qr_scanned):
+            self.check_qr_code()
+        self.check_qr_status()
+
+    def on_qr_scanned(self, qr_code):
+        """QR code scanned, populate Metrc ID field"""
+        self.ent_metrc.delete(0, 'end')
+        self.ent_metrc.insert(0, qr_code)
+        self.on_metrc_entered()
+
     def check_qr_code(self):
         """Periodically check for QR code scans"""
         qr_code = SubReadQRCode.CheckQr()
         if qr_code and qr_code != "none":
-            # QR code scanned, populate Metrc ID field
-            self.ent_metrc.delete(0, 'end')
-            self.ent_metrc.insert(0, qr_code)
-            self.on_metrc_entered()
+            self.on_qr_scanned(qr_code)
         # Check again in 100ms
         self.after(100, self.check_qr_code)
     
@@ -370,12 +400,22 @@ class AddPackageApp(ctk.CTk):
             pass
 
     def load_packages(self, crop_no: int, strain: str):
-        try:
-            rows = SubSupa.GetPackages(crop_no, strain) or []
-        except Exception as e:
+        def failed(e):
+            self.show_packages(crop_no, strain, [])
             self.set_status(f"GetPackages failed: {e}")
-            rows = []
 
+        def fetch():
+            # plus packages saved here that the journal hasn't sent yet
+            pending = WriteJournal.Pending("InsertPackage", CropNo=crop_no, Strain=strain)
+            rows = Prefetch.Take(SubSupa.GetPackages, crop_no, strain) or []
+            sent = {r.get('MetrcID') for r in rows}
+            return rows + [p for p in pending if p.get('MetrcID') not in sent]
+
+        TaskRunner.Run(self, fetch,
+                       on_done=lambda rows: self.show_packages(crop_no, strain, rows),
+                       on_error=failed)
+
+    def show_packages(self, crop_no: int, strain: str, rows):
         # clear tree
         for iid in self.tree.get_children():
             self.tree.delete(iid)
@@ -472,31 +512,38 @@ class AddPackageApp(ctk.CTk):
             messagebox.showwarning('Invalid Case', case_no)
             return
         
-        # Get the full package data using GetOnePackage
-        try:
+        # Get the full package data using GetOnePackage, and the HarvestDate from scalecrops
+        def fetch():
             package_data = SubSupa.GetOnePackage(crop_no_int, strain, package_type, case_no_int)
             if not package_data or len(package_data) == 0:
+                return None, None
+            return package_data[0], SubSupa.GetHarvestDate(crop_no_int)
+
+        def print_label(res):
+            pkg, harvest_date = res
+            if pkg is None:
                 messagebox.showwarning('No Data', 'Could not retrieve package data from database')
                 return
-            
-            pkg = package_data[0]
-            tot_units = pkg.get('TotUnits', '')
-            tot_weight = pkg.get('TotWeight', '')
-            pack_date = pkg.get('PackDate', '')
-            
-            # Get HarvestDate from scalecrops table
-            harvest_date = SubSupa.GetHarvestDate(crop_no_int)
-            if not harvest_date:
-                harvest_date = pack_date  # Use pack date as fallback
-            
-            # Print the label
-            SubPrintLabels.PrintPackageLabel(strain, harvest_date, package_type, case_no, metrc_id, tot_units, tot_weight)
-            self.set_status(f'Label printed for {package_type} - Case {case_no}')
-            
-        except Exception as e:
+            try:
+                tot_units = pkg.get('TotUnits', '')
+                tot_weight = pkg.get('TotWeight', '')
+                pack_date = pkg.get('PackDate', '')
+                if not harvest_date:
+                    harvest_date = pack_date  # Use pack date as fallback
+
+                # Print the label
+                SubPrintLabels.PrintPackageLabel(strain, harvest_date, package_type, case_no, metrc_id, tot_units, tot_weight)
+                self.set_status(f'Label printed for {package_type} - Case {case_no}')
+            except Exception as e:
+                failed(e)
+
+        def failed(e):
             self.set_status(f"Print failed: {e}")
             messagebox.showerror('Print Error', f'Failed to print label: {e}')
 
+        TaskRunner.Run(self, fetch, on_done=print_label, on_error=failed,
+                       disable=(self.btn_print,))
+
     def on_save(self):
         self.set_status('Saving package...')
 
@@ -529,11 +576,9 @@ class AddPackageApp(ctk.CTk):
                 messagebox.showwarning('Crop Error', 'Cannot parse crop number')
                 return
 
-        # Validate case selection
-        if case_no.lower().startswith('new'):
-            case_no = SubSupa.GetNewCaseNo(crop_no, strain, pkgtype)
-
-        if not case_no or case_no.lower().startswith('select'):
+        # Validate case selection ('New' is numbered below, once the rest is valid)
+        new_case = case_no.lower().startswith('new')
+        if not new_case and (not case_no or case_no.lower().startswith('select')):
             messagebox.showwarning('Select Case', 'Please select a case')
             return
         
@@ -556,11 +601,19 @@ class AddPackageApp(ctk.CTk):
             messagebox.showwarning('Quantity', 'Please enter a positive integer quantity')
             return
 
-        # get unit weight
-        try:
-            unit_weight = SubSupa.GetPackageWeight(pkgtype)
-        except Exception as e:
-            self.set_status(f"GetPackageWeight failed: {e}")
+        # get the case number (if new) and the unit weight
+        def prepare():
+            new_no = SubSupa.GetNewCaseNo(crop_no, strain, pkgtype) if new_case else case_no
+            return new_no, SubSupa.GetPackageWeight(pkgtype)
+
+        TaskRunner.Run(self, prepare,
+                       on_done=lambda res: self.insert_package(crop_no, strain, metrc_id, pkgtype, qty, *res),
+                       on_error=lambda e: self.set_status(f"GetPackageWeight failed: {e}"),
+                       disable=(self.btn_save,))
+
+    def insert_package(self, crop_no, strain, metrc_id, pkgtype, qty, case_no, unit_weight):
+        if not case_no:
+            messagebox.showwarning('Select Case', 'Please select a case')
             return
         if unit_weight is None:
             messagebox.showwarning('Unit Weight', f'No unit weight found for {pkgtype}')
@@ -572,27 +625,32 @@ class AddPackageApp(ctk.CTk):
             return
 
         tot_weight = unit_w * qty
-        self.set_status('Inserting package...')
-        try:
-            # InsertPackage(CropNo, Strain, CaseNo, MetrcID, PackageType, TotUnits, TotWeight, PackDate)
-            SubSupa.InsertPackage(crop_no, strain, case_no, metrc_id, pkgtype, qty, tot_weight, datetime.now().isoformat())
-            self.set_status(f'Inserted {qty} x {pkgtype} ({tot_weight} g) for Case {case_no}, Metrc {metrc_id}')
-        except Exception as e:
-            self.set_status(f"InsertPackage failed: {e}")
-            messagebox.showerror('Insert Failed', f"Failed to insert package: {e}")
-            return
+        self.set_status('Saving package...')
 
-        # refresh tree with crop_no and strain
-        self.load_packages(crop_no, strain)
-        # clear metrc and quantity so user can start a new entry
-        try:
-            self.ent_metrc.delete(0, 'end')
-        except Exception:
-            pass
-        try:
-            self.ent_qty.delete(0, 'end')
-        except Exception:
-            pass
+        def inserted(res):
+            self.set_status(f'Saved {qty} x {pkgtype} ({tot_weight} g) for Case {case_no}, Metrc {metrc_id}')
+            # refresh tree with crop_no and strain
+            Prefetch.Forget()
+            self.load_packages(crop_no, strain)
+            # clear metrc and quantity so user can start a new entry
+            try:
+                self.ent_metrc.delete(0, 'end')
+            except Exception:
+                pass
+            try:
+                self.ent_qty.delete(0, 'end')
+            except Exception:
+                pass
+
+        def failed(e):
+            self.set_status(f"Saving package failed: {e}")
+            messagebox.showerror('Save Failed', f"Failed to save package: {e}")
+
+        # Journalled; WriteJournal sends it with InsertPackage(CropNo, Strain, CaseNo, MetrcID, PackageType, TotUnits, TotWeight, PackDate)
+        TaskRunner.Run(self, WriteJournal.InsertPackage, crop_no, strain, case_no, metrc_id, pkgtype, qty, tot_weight,
+                       datetime.now().isoformat(),
+                       on_done=inserted, on_error=failed,
+                       disable=(self.btn_save,))
 
 
 def main():
@@ -10,6 +10,13 @@ import os
 import sys
 import subprocess
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.RefCache as RefCache
+import Common.TaskRunner as TaskRunner
+
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -105,12 +112,17 @@ class EditPackageTypesApp(ctk.CTk):
             pass
 
     def load_rows(self):
-        try:
-            rows = SubSupa.LoadPackageTypes() or []
-        except Exception as e:
+        def failed(e):
+            self.show_rows([])
             self.set_status(f"LoadPackageTypes failed: {e}")
-            rows = []
 
+        # always what is in Supabase now, not the cached list the other screens use
+        TaskRunner.Run(self, RefCache.Reload, SubSupa.LoadPackageTypes,
+                       on_done=lambda rows: self.show_rows(rows or []),
+                       on_error=failed,
+                       disable=(self.btn_refresh,))
+
+    def show_rows(self, rows):
         # clear
         for iid in self.tree.get_children():
             self.tree.delete(iid)
@@ -174,14 +186,14 @@ class EditPackageTypesApp(ctk.CTk):
             messagebox.showwarning("Unit Weight", "Unit Weight must be a number")
             return
 
-        try:
-            SubSupa.InsertPackageType(t, uwf)
+        def inserted(res):
+            self.clear_form()
             self.set_status(f"Inserted {t}")
-        except Exception as e:
-            self.set_status(f"InsertPackageType failed: {e}")
-            return
-        self.load_rows()
-        self.clear_form()
+            self.load_rows()
+
+        TaskRunner.Run(self, SubSupa.InsertPackageType, t, uwf, on_done=inserted,
+                       on_error=lambda e: self.set_status(f"InsertPackageType failed: {e}"),
+                       disable=(self.btn_add, self.btn_update))
 
     def update_row(self):
         if not self.selected_id:
@@ -199,13 +211,15 @@ class EditPackageTypesApp(ctk.CTk):
             messagebox.showwarning("Unit Weight", "Unit Weight must be a number")
             return
 
-        try:
-            SubSupa.UpdatePackageType(self.selected_id, t, uwf)
-            self.set_status(f"Updated id {self.selected_id}")
-        except Exception as e:
-            self.set_status(f"UpdatePackageType failed: {e}")
-            return
-        self.load_rows()
+        row_id = self.selected_id
+
+        def updated(res):
+            self.set_status(f"Updated id {row_id}")
+            self.load_rows()
+
+        TaskRunner.Run(self, SubSupa.UpdatePackageType, row_id, t, uwf, on_done=updated,
+                       on_error=lambda e: self.set_status(f"UpdatePackageType failed: {e}"),
+                       disable=(self.btn_add, self.btn_update))
 
 
 def main():
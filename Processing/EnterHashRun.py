@@ -13,9 +13,7 @@ ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 import Common.SubScale as SubScale
-
-# Connect to hardware after imports
-SubScale.ConnectScales()
+import Common.TaskRunner as TaskRunner
 
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -149,7 +147,7 @@ class EnterHashRunApp(ctk.CTk):
         self.LoadBatches()
 
         # start polling weight
-        self.StartPolling()
+        self.after(100, self.StartPolling)   # the first weight read opens the scale
 
         # ensure stop on close
         try:
@@ -207,26 +205,29 @@ class EnterHashRunApp(ctk.CTk):
             pass
 
     # --- Batch and runs management ---
-    def LoadBatches(self):
-        try:
-            rows = SubSupa.GetHashBatches("Hash") or []
-            vals = rows if rows else ["Select"]
-            self.BatchIdCombo.configure(values=vals)
-            self.BatchIdCombo.set('Select')
-            # reset downstream
-            self.RunNoCombo.configure(values=['Select'])
-            self.RunNoCombo.set('Select')
-            self.CropNoCombo.configure(values=['Select'])
-            self.CropNoCombo.set('Select')
-            self.StrainCombo.configure(values=['Select'])
-            self.StrainCombo.set('Select')
-            self.SourceCombo.configure(values=['Select', 'Trim', 'Flower', 'Smalls'])
-            self.SourceCombo.set('Select')
-            self.WeighTypeEntry.configure(state='normal')
-            self.WeighTypeEntry.delete(0, 'end')
-            self.WeighTypeEntry.configure(state='disabled')
-        except Exception as e:
-            self.SetStatus(f"LoadBatches failed: {e}")
+    def LoadBatches(self, select=None):
+        TaskRunner.Run(self, SubSupa.GetHashBatches, "Hash",
+                       on_done=lambda rows: self.ShowBatches(rows, select),
+                       on_error=lambda e: self.SetStatus(f"LoadBatches failed: {e}"))
+
+    def ShowBatches(self, rows, select=None):
+        vals = rows if rows else ["Select"]
+        self.BatchIdCombo.configure(values=vals)
+        self.BatchIdCombo.set('Select')
+        # reset downstream
+        self.RunNoCombo.configure(values=['Select'])
+        self.RunNoCombo.set('Select')
+        self.CropNoCombo.configure(values=['Select'])
+        self.CropNoCombo.set('Select')
+        self.StrainCombo.configure(values=['Select'])
+        self.StrainCombo.set('Select')
+        self.SourceCombo.configure(values=['Select', 'Trim', 'Flower', 'Smalls'])
+        self.SourceCombo.set('Select')
+        self.WeighTypeEntry.configure(state='normal')
+        self.WeighTypeEntry.delete(0, 'end')
+        self.WeighTypeEntry.configure(state='disabled')
+        if select:
+            self.BatchIdCombo.set(select)
 
     def OnNewBatch(self):
         newId = (self.NewBatchIdEntry.get() or '').strip()
@@ -234,31 +235,30 @@ class EnterHashRunApp(ctk.CTk):
         if not newId:
             messagebox.showwarning('New Batch', 'Please enter a batch id')
             return
-        try:
-            SubSupa.NewHashBatch(newId, btype)
+
+        def inserted(res):
             self.SetStatus(f'Inserted hash batch {newId} ({btype})')
-            self.LoadBatches()
-            # select new batch
-            try:
-                self.BatchIdCombo.set(newId)
-            except Exception:
-                pass
+            # reload and select new batch
+            self.LoadBatches(select=newId)
             # clear new batch entry so user can enter another
             try:
                 self.NewBatchIdEntry.delete(0, 'end')
             except Exception:
                 pass
-        except Exception as e:
-            self.SetStatus(f'NewHashBatch failed: {e}')
 
-    def OnBatchChanged(self):
+        TaskRunner.Run(self, SubSupa.NewHashBatch, newId, btype, on_done=inserted,
+                       on_error=lambda e: self.SetStatus(f'NewHashBatch failed: {e}'),
+                       disable=(self.NewBatchButton,))
+
+    def OnBatchChanged(self, then=None):
+        """Load the run numbers for the selected batch; `then` runs once they are shown."""
         batch = (self.BatchIdCombo.get() or '').strip()
         if not batch or batch.lower().startswith('select'):
             return
-        try:
-            runNos = SubSupa.GetRunNos(batch) or []
+
+        def show(runNos):
             # include "New" option
-            values = ['Select', 'New'] + [str(r) for r in runNos]
+            values = ['Select', 'New'] + [str(r) for r in runNos or []]
             self.RunNoCombo.configure(values=values)
             self.RunNoCombo.set('Select')
             # reset others
@@ -273,8 +273,12 @@ class EnterHashRunApp(ctk.CTk):
             self.WeighTypeEntry.configure(state='normal')
             # load tree
             self.LoadRuns(batch)
-        except Exception as e:
-            self.SetStatus(f'GetRunNos failed: {e}')
+            if then is not None:
+                then()
+
+        TaskRunner.Run(self, SubSupa.GetRunNos, batch, on_done=show,
+                       on_error=lambda e: self.SetStatus(f'GetRunNos failed: {e}'),
+                       disable=(self.RunNoCombo, self.SaveButton))
 
     def OnRunChanged(self):
         batch = (self.BatchIdCombo.get() or '').strip()
@@ -285,53 +289,62 @@ class EnterHashRunApp(ctk.CTk):
             return
 
         if runVal == 'New':
-            try:
-                newRun = SubSupa.GetNewRunNo(batch)
-            except Exception as e:
-                self.SetStatus(f'GetNewRunNo failed: {e}')
-                return
-            try:
-                SubSupa.InsertHashRun(batch, newRun)
+            def add_run():
+                # numbered and inserted in one call, so two stations can't take the same run
+                try:
+                    return SubSupa.NewHashRun(batch)['RunNo']
+                except Exception as e:
+                    raise RuntimeError(f'NewHashRun failed: {e}')
+
+            def added(newRun):
                 self.SetStatus(f'Inserted new run {newRun} for {batch}')
-            except Exception as e:
-                self.SetStatus(f'InsertHashRun failed: {e}')
-                return
-            # init fields
-            cropNo = 0
-            strain = ''
-            source = ''
-            startW = 0
-            endW = 0
-            # refresh run list
-            self.OnBatchChanged()
-            # select the new run in combobox
-            try:
-                self.RunNoCombo.set(str(newRun))
-            except Exception:
-                pass
+
+                def select_new():
+                    # select the new run in combobox; its fields start empty
+                    try:
+                        self.RunNoCombo.set(str(newRun))
+                    except Exception:
+                        pass
+                    self.ShowRun(batch, {}, load_runs=False)
+
+                # refresh run list
+                self.OnBatchChanged(then=select_new)
+
+            TaskRunner.Run(self, add_run, on_done=added,
+                           on_error=lambda e: self.SetStatus(str(e)),
+                           disable=(self.RunNoCombo, self.SaveButton))
         else:
-            try:
-                rec = SubSupa.GetRunRec(batch, runVal) or {}
-                # expected rec contains keys: CropNo, Strain, Source, StartWeight, EndWeight
-                cropNo = rec.get('CropNo') if isinstance(rec, dict) else getattr(rec, 'CropNo', None)
-                strain = rec.get('Strain') if isinstance(rec, dict) else getattr(rec, 'Strain', None)
-                source = rec.get('Source') if isinstance(rec, dict) else getattr(rec, 'Source', None)
-                startW = rec.get('StartWeight') if isinstance(rec, dict) else getattr(rec, 'StartWeight', None)
-                endW = rec.get('EndWeight') if isinstance(rec, dict) else getattr(rec, 'EndWeight', None)
-            except Exception as e:
-                self.SetStatus(f'GetRunRec failed: {e}')
-                return
+            TaskRunner.Run(self, SubSupa.GetRunRec, batch, runVal,
+                           on_done=lambda rec: self.ShowRun(batch, rec or {}),
+                           on_error=lambda e: self.SetStatus(f'GetRunRec failed: {e}'),
+                           disable=(self.SaveButton,))
+
+    def ShowRun(self, batch: str, rec, load_runs: bool = True):
+        # expected rec contains keys: CropNo, Strain, Source, StartWeight, EndWeight
+        try:
+            cropNo = rec.get('CropNo') if isinstance(rec, dict) else getattr(rec, 'CropNo', None)
+            strain = rec.get('Strain') if isinstance(rec, dict) else getattr(rec, 'Strain', None)
+            source = rec.get('Source') if isinstance(rec, dict) else getattr(rec, 'Source', None)
+            startW = rec.get('StartWeight') if isinstance(rec, dict) else getattr(rec, 'StartWeight', None)
+        except Exception as e:
+            self.SetStatus(f'GetRunRec failed: {e}')
+            return
 
         # populate crop/strain/source combos
         try:
             if not cropNo or int(cropNo) == 0:
-                crops = SubSupa.LoadCrops() or ['Select']
-                self.CropNoCombo.configure(values=crops)
-                self.CropNoCombo.set('Select')
                 self.StrainCombo.configure(values=['Select'])
                 self.StrainCombo.set('Select')
                 self.SourceCombo.configure(values=['Select', 'Trim', 'Flower', 'Smalls'])
                 self.SourceCombo.set('Select')
+
+                def show_crops(crops):
+                    self.CropNoCombo.configure(values=crops or ['Select'])
+                    self.CropNoCombo.set('Select')
+
+                TaskRunner.Run(self, SubSupa.LoadCrops, on_done=show_crops,
+                               on_error=lambda e: self.SetStatus(f'LoadCrops failed: {e}'),
+                               disable=(self.CropNoCombo,))
             else:
                 # show specific crop and strain
                 try:
@@ -371,29 +384,29 @@ class EnterHashRunApp(ctk.CTk):
         self.WeighTypeEntry.configure(state='disabled')
 
         # refresh tree for this batch
-        try:
+        if load_runs:
             self.LoadRuns(batch)
-        except Exception:
-            pass
 
     def OnCropChanged(self):
+        token = (self.CropNoCombo.get() or '').strip()
+        if not token or token.lower().startswith('select'):
+            return
         try:
-            token = (self.CropNoCombo.get() or '').strip()
-            if not token or token.lower().startswith('select'):
-                return
+            crop_no = int(token.split()[0])
+        except Exception:
             try:
-                crop_no = int(token.split()[0])
+                crop_no = int(token)
             except Exception:
-                try:
-                    crop_no = int(token)
-                except Exception:
-                    self.SetStatus('Cannot parse Crop number')
-                    return
-            strains = SubSupa.LoadStrains(crop_no) or ['Select']
-            self.StrainCombo.configure(values=strains)
+                self.SetStatus('Cannot parse Crop number')
+                return
+
+        def show(strains):
+            self.StrainCombo.configure(values=strains or ['Select'])
             self.StrainCombo.set('Select')
-        except Exception as e:
-            self.SetStatus(f'LoadStrains failed: {e}')
+
+        TaskRunner.Run(self, SubSupa.LoadStrains, crop_no, on_done=show,
+                       on_error=lambda e: self.SetStatus(f'LoadStrains failed: {e}'),
+                       disable=(self.StrainCombo, self.SaveButton))
 
     def OnSave(self):
         batch = (self.BatchIdCombo.get() or '').strip()
@@ -429,32 +442,30 @@ class EnterHashRunApp(ctk.CTk):
             messagebox.showwarning('Weight', 'Please enter a valid numeric weight')
             return
 
-        try:
-            if weighType.lower() == 'start':
-                # SaveHashStartWeight(BatchId, RunNo, CropNo, Source, Strain, Weight)
-                SubSupa.SaveHashStartWeight(batch, runVal, cropInt or 0, strainVal or '', sourceVal or '', w)
-                self.SetStatus(f'Saved start weight for run {runVal} in {batch}')
-            else:
-                # SaveHashEndWeight(BatchId, RunNo, Weight)
-                SubSupa.SaveHashEndWeight(batch, runVal, w)
-                self.SetStatus(f'Saved end weight for run {runVal} in {batch}')
-        except Exception as e:
-            self.SetStatus(f'Save failed: {e}')
-            return
+        if weighType.lower() == 'start':
+            # SaveHashStartWeight(BatchId, RunNo, CropNo, Source, Strain, Weight)
+            save = lambda: SubSupa.SaveHashStartWeight(batch, runVal, cropInt or 0, strainVal or '', sourceVal or '', w)
+            done = f'Saved start weight for run {runVal} in {batch}'
+        else:
+            # SaveHashEndWeight(BatchId, RunNo, Weight)
+            save = lambda: SubSupa.SaveHashEndWeight(batch, runVal, w)
+            done = f'Saved end weight for run {runVal} in {batch}'
 
-        # refresh runs
-        try:
+        def saved(res):
+            self.SetStatus(done)
+            # refresh runs
             self.LoadRuns(batch)
-        except Exception:
-            pass
+            # clear weigh type and weight so user can proceed
+            try:
+                self.WeighTypeEntry.configure(state='normal')
+                self.WeighTypeEntry.delete(0, 'end')
+                self.WeighTypeEntry.configure(state='disabled')
+            except Exception:
+                pass
 
-        # clear weigh type and weight so user can proceed
-        try:
-            self.WeighTypeEntry.configure(state='normal')
-            self.WeighTypeEntry.delete(0, 'end')
-            self.WeighTypeEntry.configure(state='disabled')
-        except Exception:
-            pass
+        TaskRunner.Run(self, save, on_done=saved,
+                       on_error=lambda e: self.SetStatus(f'Save failed: {e}'),
+                       disable=(self.SaveButton,))
 
     def OnPrintLabel(self):
         # Print a label for the currently selected batch using SubPrintLabels.PrintLabel
@@ -464,21 +475,28 @@ class EnterHashRunApp(ctk.CTk):
             messagebox.showwarning('Select Batch', 'Please select a batch to print')
             return
 
-        (BatchDate, NumStrains, Strain1, Strain2, Strain3, Strain4, TotalGrams) = SubSupa.GetHashLabelData(batch)
+        def print_label(data):
+            (BatchDate, NumStrains, Strain1, Strain2, Strain3, Strain4, TotalGrams) = data
+            try:
+                SubPrintLabels.PrintLabel(batch, 'Hash', BatchDate, Strain1, Strain2, Strain3, Strain4, TotalGrams)
+                self.SetStatus(f'Printed label for {batch}')
+            except Exception as e:
+                self.SetStatus(f'Print label failed: {e}')
 
-        try:
-            SubPrintLabels.PrintLabel(batch, 'Hash', BatchDate, Strain1, Strain2, Strain3, Strain4, TotalGrams)
-            self.SetStatus(f'Printed label for {batch}')
-        except Exception as e:
-            self.SetStatus(f'Print label failed: {e}')
+        TaskRunner.Run(self, SubSupa.GetHashLabelData, batch, on_done=print_label,
+                       on_error=lambda e: self.SetStatus(f'GetHashLabelData failed: {e}'),
+                       disable=(self.PrintLabelButton,))
 
     def LoadRuns(self, batchId: str):
-        try:
-            rows = SubSupa.GetRuns(batchId) or []
-        except Exception as e:
+        def failed(e):
+            self.ShowRuns(batchId, [])
             self.SetStatus(f'GetRuns failed: {e}')
-            rows = []
 
+        TaskRunner.Run(self, SubSupa.GetRuns, batchId,
+                       on_done=lambda rows: self.ShowRuns(batchId, rows or []),
+                       on_error=failed)
+
+    def ShowRuns(self, batchId: str, rows):
         # clear tree
         for iid in self.Tree.get_children():
             self.Tree.delete(iid)
@@ -12,9 +12,7 @@ ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 import Common.SubScale as SubScale
-
-# Connect to hardware after imports
-SubScale.ConnectScales()
+import Common.TaskRunner as TaskRunner
 
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -133,7 +131,7 @@ class EnterRosinRunApp(ctk.CTk):
 
         # initial loads
         self.LoadBatches()
-        self.StartPolling()
+        self.after(100, self.StartPolling)   # the first weight read opens the scale
 
         try:
             self.protocol("WM_DELETE_WINDOW", self.OnClose)
@@ -216,29 +214,32 @@ class EnterRosinRunApp(ctk.CTk):
             pass
 
     # Loads
-    def LoadBatches(self):
+    def LoadBatches(self, select=None):
+        TaskRunner.Run(self, SubSupa.GetRosinBatches,
+                       on_done=lambda rows: self.ShowBatches(rows or [], select),
+                       on_error=lambda e: self.SetStatus(f"LoadBatches failed: {e}"))
+
+    def ShowBatches(self, rows, select=None):
+        print(rows)
+#        vals = ["Select", "New"]
+#        vals = vals.append(rows) if rows else ["Select", "New"]
+#        print(vals)
+        self.BatchIdCombo.configure(values=rows)
+        self.BatchIdCombo.set('Select')
+        # reset downstream
+        self.RunNoCombo.configure(values=['Select'])
+        self.RunNoCombo.set('Select')
+        self.SourceCombo.configure(values=['Select'])
+        self.SourceCombo.set('Select')
+        # prepare weigh type
         try:
-            rows = SubSupa.GetRosinBatches() or []
-            print(rows)
-#            vals = ["Select", "New"]
-#            vals = vals.append(rows) if rows else ["Select", "New"]
-#            print(vals)
-            self.BatchIdCombo.configure(values=rows)
-            self.BatchIdCombo.set('Select')
-            # reset downstream
-            self.RunNoCombo.configure(values=['Select'])
-            self.RunNoCombo.set('Select')
-            self.SourceCombo.configure(values=['Select'])
-            self.SourceCombo.set('Select')
-            # prepare weigh type
-            try:
-                self.WeighTypeEntry.configure(state='normal')
-                self.WeighTypeEntry.delete(0, 'end')
-                self.WeighTypeEntry.configure(state='disabled')
-            except Exception:
-                pass
-        except Exception as e:
-            self.SetStatus(f"LoadBatches failed: {e}")
+            self.WeighTypeEntry.configure(state='normal')
+            self.WeighTypeEntry.delete(0, 'end')
+            self.WeighTypeEntry.configure(state='disabled')
+        except Exception:
+            pass
+        if select:
+            self.BatchIdCombo.set(select)
 
     def OnNewBatch(self):
         newId = (self.NewBatchIdEntry.get() or '').strip()
@@ -246,30 +247,29 @@ class EnterRosinRunApp(ctk.CTk):
         if not newId:
             messagebox.showwarning('New Batch', 'Please enter a batch id')
             return
-        try:
-            SubSupa.NewRosinBatch(newId, btype)
+
+        def inserted(res):
             self.SetStatus(f'Inserted rosin batch {newId} ({btype})')
-            self.LoadBatches()
-            try:
-                self.BatchIdCombo.set(newId)
-            except Exception:
-                pass
+            self.LoadBatches(select=newId)
             try:
                 self.NewBatchIdEntry.delete(0, 'end')
             except Exception:
                 pass
-        except Exception as e:
-            self.SetStatus(f'NewRosinBatch failed: {e}')
 
-    def OnBatchChanged(self):
+        TaskRunner.Run(self, SubSupa.NewRosinBatch, newId, btype, on_done=inserted,
+                       on_error=lambda e: self.SetStatus(f'NewRosinBatch failed: {e}'),
+                       disable=(self.NewBatchButton,))
+
+    def OnBatchChanged(self, then=None):
+        """Load the run numbers for the selected batch; `then` runs once they are shown."""
         batch = (self.BatchIdCombo.get() or '').strip()
         if not batch or batch.lower().startswith('select'):
             return
         self.SetBusyCursor()
 
-        try:
-            runNos = SubSupa.GetRosinRunNos(batch) or []
-            values = [str(r) for r in runNos]
+        def show(runNos):
+            self.SetNormalCursor()
+            values = [str(r) for r in runNos or []]
             self.RunNoCombo.configure(values=values)
             self.RunNoCombo.set('Select')
             self.SourceCombo.configure(values=['Select'])
@@ -281,10 +281,15 @@ class EnterRosinRunApp(ctk.CTk):
             except Exception:
                 pass
             self.LoadRuns(batch)
+            if then is not None:
+                then()
 
-        except Exception as e:
+        def failed(e):
+            self.SetNormalCursor()
             self.SetStatus(f'GetRosinRunNos failed: {e}')
-        self.SetNormalCursor()
+
+        TaskRunner.Run(self, SubSupa.GetRosinRunNos, batch, on_done=show, on_error=failed,
+                       disable=(self.RunNoCombo, self.SaveButton))
 
     def OnRunChanged(self):
         batch = (self.BatchIdCombo.get() or '').strip()
@@ -294,42 +299,58 @@ class EnterRosinRunApp(ctk.CTk):
         if not runVal or runVal.lower().startswith('select'):
             return
         self.SetBusyCursor()
+
+        def failed(e):
+            self.SetStatus(str(e))
+            self.SetNormalCursor()
+
         if runVal == 'New':
-            try:
-                newRun = SubSupa.GetNewRosinRunNo(batch)
-            except Exception as e:
-                self.SetStatus(f'GetNewRosinRunNo failed: {e}')
-                self.SetNormalCursor()
-                return
-            try:
-                SubSupa.InsertRosinRun(batch, newRun)
+            def add_run():
+                # numbered and inserted in one call, so two stations can't take the same run
+                try:
+                    return SubSupa.NewRosinRun(batch)['RunNo']
+                except Exception as e:
+                    raise RuntimeError(f'NewRosinRun failed: {e}')
+
+            def added(newRun):
                 self.SetStatus(f'Inserted new rosin run {newRun} for {batch}')
-            except Exception as e:
-                self.SetStatus(f'InsertRosinRun failed: {e}')
-                self.SetNormalCursor()
-                return
-            source = ''
-            startW = 0
-            endW = 0
-            self.OnBatchChanged()
-            self.RunNoCombo.set(str(newRun))
+
+                def select_new():
+                    self.RunNoCombo.set(str(newRun))
+                    self.ShowRun(batch, {}, load_runs=False)
+
+                self.OnBatchChanged(then=select_new)
+
+            TaskRunner.Run(self, add_run, on_done=added, on_error=failed,
+                           disable=(self.RunNoCombo, self.SaveButton))
         else:
-            try:
-                rec = SubSupa.GetRosinRunRec(batch, runVal) or {}
-                source = rec.get('Source') if isinstance(rec, dict) else getattr(rec, 'Source', None)
-                startW = rec.get('StartWeight') if isinstance(rec, dict) else getattr(rec, 'StartWeight', None)
-                endW = rec.get('EndWeight') if isinstance(rec, dict) else getattr(rec, 'EndWeight', None)
-            except Exception as e:
-                self.SetStatus(f'GetRosinRunRec failed: {e}')
-                self.SetNormalCursor()
-                return
+            def get_rec():
+                try:
+                    return SubSupa.GetRosinRunRec(batch, runVal) or {}
+                except Exception as e:
+                    raise RuntimeError(f'GetRosinRunRec failed: {e}')
+
+            TaskRunner.Run(self, get_rec, on_done=lambda rec: self.ShowRun(batch, rec),
+                           on_error=failed, disable=(self.SaveButton,))
+
+    def ShowRun(self, batch: str, rec, load_runs: bool = True):
+        source = rec.get('Source') if isinstance(rec, dict) else getattr(rec, 'Source', None)
+        startW = rec.get('StartWeight') if isinstance(rec, dict) else getattr(rec, 'StartWeight', None)
 
         # determine weigh type and source options
         if not startW or int(startW) == 0:
             # enable and set Start
-            sources = SubSupa.LoadSourceCombo() or ['Select']
-            self.SourceCombo.configure(values=sources)
-            self.SourceCombo.set('Select')
+            def show_sources(sources):
+                self.SourceCombo.configure(values=sources or ['Select'])
+                self.SourceCombo.set('Select')
+                self.SetNormalCursor()
+
+            def failed(e):
+                self.SetStatus(f'LoadSourceCombo failed: {e}')
+                self.SetNormalCursor()
+
+            TaskRunner.Run(self, SubSupa.LoadSourceCombo, on_done=show_sources, on_error=failed,
+                           disable=(self.SourceCombo, self.SaveButton))
             self.WeighTypeEntry.configure(state='normal')
             self.WeighTypeEntry.delete(0, 'end')
             self.WeighTypeEntry.insert(0, 'Start')
@@ -342,9 +363,10 @@ class EnterRosinRunApp(ctk.CTk):
             self.WeighTypeEntry.delete(0, 'end')
             self.WeighTypeEntry.insert(0, 'End')
             self.WeighTypeEntry.configure(state='disabled')
+            self.SetNormalCursor()
 
-        self.LoadRuns(batch)
-        self.SetNormalCursor()
+        if load_runs:
+            self.LoadRuns(batch)
 
     def OnSave(self):
         batch = (self.BatchIdCombo.get() or '').strip()
@@ -369,24 +391,28 @@ class EnterRosinRunApp(ctk.CTk):
             return
 
         self.SetBusyCursor()
-        try:
-            if weighType.lower() == 'start':
-                SubSupa.SaveRosinStartWeight(batch, runVal, sourceVal or '', w)
-                self.SetStatus(f'Saved start weight for run {runVal} in {batch}')
-            else:
-                SubSupa.SaveRosinEndWeight(batch, runVal, w)
-                self.SetStatus(f'Saved end weight for run {runVal} in {batch}')
-        except Exception as e:
+        if weighType.lower() == 'start':
+            save = lambda: SubSupa.SaveRosinStartWeight(batch, runVal, sourceVal or '', w)
+            done = f'Saved start weight for run {runVal} in {batch}'
+        else:
+            save = lambda: SubSupa.SaveRosinEndWeight(batch, runVal, w)
+            done = f'Saved end weight for run {runVal} in {batch}'
+
+        def saved(res):
+            self.SetStatus(done)
+            self.LoadRuns(batch)
+            self.WeighTypeEntry.configure(state='normal')
+            self.WeighTypeEntry.delete(0, 'end')
+            self.WeighTypeEntry.configure(state='disabled')
+            self.LoadBatches()
+            self.SetNormalCursor()
+
+        def failed(e):
             self.SetStatus(f'Save failed: {e}')
             self.SetNormalCursor()
-            return
 
-        self.LoadRuns(batch)
-        self.WeighTypeEntry.configure(state='normal')
-        self.WeighTypeEntry.delete(0, 'end')
-        self.WeighTypeEntry.configure(state='disabled')
-        self.LoadBatches()
-        self.SetNormalCursor()
+        TaskRunner.Run(self, save, on_done=saved, on_error=failed,
+                       disable=(self.SaveButton,))
 
 
     def OnPrintLabel(self):
@@ -396,22 +422,33 @@ class EnterRosinRunApp(ctk.CTk):
             messagebox.showwarning('Select Batch', 'Please select a batch to print')
             return
         self.SetBusyCursor()
-        (BatchDate, Strain1, Strain2, Strain3, Strain4, TotalGrams) = SubSupa.GetRosinLabelData(batch)
 
-        try:
-            SubPrintLabels.PrintLabel(batch, 'Rosin', BatchDate, Strain1, Strain2, Strain3, Strain4, TotalGrams)
-            self.SetStatus(f'Printed rosin label for {batch}')
-        except Exception as e:
-            self.SetStatus(f'Print label failed: {e}')
-        self.SetNormalCursor()
+        def print_label(data):
+            (BatchDate, Strain1, Strain2, Strain3, Strain4, TotalGrams) = data
+            try:
+                SubPrintLabels.PrintLabel(batch, 'Rosin', BatchDate, Strain1, Strain2, Strain3, Strain4, TotalGrams)
+                self.SetStatus(f'Printed rosin label for {batch}')
+            except Exception as e:
+                self.SetStatus(f'Print label failed: {e}')
+            self.SetNormalCursor()
+
+        def failed(e):
+            self.SetStatus(f'GetRosinLabelData failed: {e}')
+            self.SetNormalCursor()
+
+        TaskRunner.Run(self, SubSupa.GetRosinLabelData, batch, on_done=print_label, on_error=failed,
+                       disable=(self.PrintLabelButton,))
 
     def LoadRuns(self, batchId: str):
-        try:
-            rows = SubSupa.GetRosinRuns(batchId) or []
-        except Exception as e:
+        def failed(e):
+            self.ShowRuns(batchId, [])
             self.SetStatus(f'GetRosinRuns failed: {e}')
-            rows = []
 
+        TaskRunner.Run(self, SubSupa.GetRosinRuns, batchId,
+                       on_done=lambda rows: self.ShowRuns(batchId, rows or []),
+                       on_error=failed)
+
+    def ShowRuns(self, batchId: str, rows):
         for iid in self.Tree.get_children():
             self.Tree.delete(iid)
 
@@ -1,14 +1,18 @@
 #!/usr/bin/python3
 
-import serial
-import serial.tools.list_ports
 import time
 from tkinter import messagebox
 import sys
+import os
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.ScaleDrivers as ScaleDrivers
 
-ScaleBuffer = ""
 LastWeight = None
-Scale = None
+Scale = None            # first ScaleDrivers driver found
 ScaleConnected = False
 
 def ConnectScales():
@@ -17,15 +21,12 @@ def ConnectScales():
     
     while not ScaleConnected:
         try:
-            ports = list(serial.tools.list_ports.comports())
-            for p in ports:
-                if p.vid == 1027 and (p.pid == 24577 or p.pid == 24597):
-                    scaleport = p.device
-                    print("Connecting to Scale on " + scaleport)
-                    Scale = serial.Serial(port=scaleport, baudrate=9600, timeout=2)
-                    ScaleConnected = True
-                    print("Connected to Scale " + scaleport)
-                    break
+            for driver in ScaleDrivers.FindScales():
+                print("Connecting to Scale on " + driver.port)
+                Scale = driver.open()
+                ScaleConnected = True
+                print("Connected to Scale " + driver.port)
+                break
             
             if not ScaleConnected:
                 raise Exception("No Ohaus scale detected")
@@ -51,42 +52,23 @@ def ConnectScales():
 ###########################################################
 
 def GetWeight():
-    global ScaleBuffer, LastWeight
-
-    # Read whatever is waiting, don't block
-    data = Scale.read(Scale.in_waiting or 0).decode(errors="ignore")
-    if data:
-        ScaleBuffer += data
+    global LastWeight
 
-        while "\r\n" in ScaleBuffer:
-            line, ScaleBuffer = ScaleBuffer.split("\r\n", 1)
-            line = line.strip()
-            if not line:
-                continue
-#            print("Scale line: '" + line + "'")
-            parts = line.split()
-            LastWeight =float(parts[0])
-            Unit = parts[1] 
-#            print("Parsed weight: ", LastWeight, Unit)
-#            val = _parse_ohaus_line(line)
-#            if val is not None:
-#                LastWeight = val
+    reading = Scale.read()
+    if reading is not None:
+        LastWeight = reading[0]
 
     return LastWeight
 
 
 
 def OldGetWeight():
-    Scale.reset_input_buffer()
-    Scale.write("IP\r\n".encode())
-    weight = str(Scale.readline())
-    w = weight.split()
-#    print(w)
+    reading = ScaleDrivers.RangerDriver.read(Scale)
     Weight = '0'
-    if len(w) < 3:
+    if reading is None:
         Weight = 0
-    elif w[2].find("g") == 0:
-        Weight = str(int(w[1]))
+    elif reading[1].startswith("g"):
+        Weight = str(int(reading[0]))
     return Weight
 
 
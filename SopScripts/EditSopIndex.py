@@ -10,6 +10,12 @@ import os
 import sys
 import subprocess
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.TaskRunner as TaskRunner
+
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -57,16 +63,10 @@ class EditSopIndexApp(ctk.CTk):
         
         ctk.CTkLabel(activity_frame, text="Activity:", font=("Arial", 15, "bold")).pack(side="left", padx=(0, 6))
         
-        # Load activities from database
-        try:
-            activities = SubSopSupa.GetSopActivities()
-        except Exception as e:
-            activities = []
-            
-        self.activity_var = ctk.StringVar(value=activities[0] if activities else "")
+        self.activity_var = ctk.StringVar(value="")
         self.activity_combo = ctk.CTkComboBox(
             activity_frame, 
-            values=activities if activities else ["No activities found"],
+            values=["Loading..."],
             variable=self.activity_var,
             font=DEFAULT_FONT,
             width=200,
@@ -121,6 +121,14 @@ class EditSopIndexApp(ctk.CTk):
         frame.columnconfigure(1, weight=1)
 
         self.selected_file = None
+
+        # Load activities from database
+        TaskRunner.Run(self, SubSopSupa.GetSopActivities, on_done=self.show_activities,
+                       on_error=lambda e: self.show_activities([]))
+
+    def show_activities(self, activities):
+        self.activity_combo.configure(values=activities if activities else ["No activities found"])
+        self.activity_var.set(activities[0] if activities else "")
         if activities:
             self.load_rows()
 
@@ -140,33 +148,44 @@ class EditSopIndexApp(ctk.CTk):
             self.set_status("No activity selected")
             return
 
-        try:
-            rows = SubSopSupa.GetSopFiles(activity) or []
-        except Exception as e:
-            self.set_status(f"GetSopFiles failed: {e}")
-            rows = []
-
+        def fetch():
+            """Return (files found, tree rows), or (error, []) if GetSopFiles failed."""
+            try:
+                rows = SubSopSupa.GetSopFiles(activity) or []
+            except Exception as e:
+                return e, []
+
+            # GetSopFiles returns list of tuples: (FileName, Descr)
+            # We need to get full details including SeqNo
+            tree_rows = []
+            for filename, descr in rows:
+                try:
+                    record = SubSopSupa.GetOneSopFile(activity, filename)
+                    if record:
+                        seq_no = record.get('SeqNo', 99)
+                        file_name = record.get('FileName', filename)
+                        description = record.get('Descr', descr)
+                        tree_rows.append((file_name, str(seq_no), description or ''))
+                except Exception as e:
+                    # If GetOneSopFile fails, use what we have
+                    tree_rows.append((filename, '99', descr or ''))
+            return len(rows), tree_rows
+
+        TaskRunner.Run(self, fetch, on_done=lambda res: self.show_rows(activity, *res),
+                       disable=(self.btn_refresh, self.btn_save))
+
+    def show_rows(self, activity, found, tree_rows):
         # clear
         for iid in self.tree.get_children():
             self.tree.delete(iid)
 
-        # GetSopFiles returns list of tuples: (FileName, Descr)
-        # We need to get full details including SeqNo
-        for filename, descr in rows:
-            try:
-                record = SubSopSupa.GetOneSopFile(activity, filename)
-                if record:
-                    seq_no = record.get('SeqNo', 99)
-                    file_name = record.get('FileName', filename)
-                    description = record.get('Descr', descr)
-                    vals = (file_name, str(seq_no), description or '')
-                    self.tree.insert('', 'end', values=vals)
-            except Exception as e:
-                # If GetOneSopFile fails, use what we have
-                vals = (filename, '99', descr or '')
-                self.tree.insert('', 'end', values=vals)
+        for vals in tree_rows:
+            self.tree.insert('', 'end', values=vals)
 
-        self.set_status(f"Loaded {len(rows)} SOP files for {activity}")
+        if isinstance(found, Exception):
+            self.set_status(f"GetSopFiles failed: {found}")
+        else:
+            self.set_status(f"Loaded {found} SOP files for {activity}")
 
     def on_tree_select(self):
         sel = self.tree.selection()
@@ -226,15 +245,17 @@ class EditSopIndexApp(ctk.CTk):
             messagebox.showwarning("Seq #", "Sequence number must be an integer")
             return
 
-        try:
-            SubSopSupa.UpdateSopIndex(activity, file_name, seq_no, descr)
+        def updated(res):
             self.set_status(f"Updated {file_name}")
-        except Exception as e:
+            self.load_rows()
+
+        def failed(e):
             self.set_status(f"UpdateSopIndex failed: {e}")
             messagebox.showerror("Update Failed", f"Failed to update: {e}")
-            return
-        
-        self.load_rows()
+
+        TaskRunner.Run(self, SubSopSupa.UpdateSopIndex, activity, file_name, seq_no, descr,
+                       on_done=updated, on_error=failed,
+                       disable=(self.btn_save,))
 
 
 def main():
@@ -36,6 +36,7 @@ from typing import Dict, List, Optional, Tuple
 SCALE_DIR = Path(__file__).resolve().parent.parent  # Go up to scale/ directory
 #sys.path.insert(0, str(SCALE_DIR / "Common"))
 from SubSopSupa import GetSopActivities, GetOneSopFile, InsertSopIndex
+import Common.TaskRunner as TaskRunner   # SubSopSupa has put scale/ on sys.path
 
 
 # ----------------------------
@@ -45,17 +46,13 @@ from SubSopSupa import GetSopActivities, GetOneSopFile, InsertSopIndex
 SOP_ROOT = SCALE_DIR / "sop"
 DEFAULT_FONT = ("Arial", 14)
 
-# Get activity order from database
-try:
-    DEFAULT_ACTIVITY_ORDER = GetSopActivities()
-except Exception:
-    # Fallback if database is not available
-    DEFAULT_ACTIVITY_ORDER = [
-        "Harvest",
-        "Trimmers",
-        "Packaging",
-        "Processing",
-    ]
+# Activity order if the database is not available (see _activity_order)
+DEFAULT_ACTIVITY_ORDER = [
+    "Harvest",
+    "Trimmers",
+    "Packaging",
+    "Processing",
+]
 
 # Manifest filename inside each activity folder
 MANIFEST_NAME = "manifest.json"
@@ -163,13 +160,21 @@ def _load_from_supabase() -> Optional[List[SopItem]]:
 # Local discovery + manifest
 # ----------------------------
 
+def _activity_order() -> List[str]:
+    """Get activity order from database, falling back to DEFAULT_ACTIVITY_ORDER."""
+    try:
+        return GetSopActivities()
+    except Exception:
+        return DEFAULT_ACTIVITY_ORDER
+
+
 def _list_activity_folders() -> List[str]:
     if not SOP_ROOT.exists():
         return []
     acts = [p.name for p in SOP_ROOT.iterdir() if p.is_dir() and not p.name.startswith("_")]
     # Apply preferred ordering
     ordered: List[str] = []
-    for a in DEFAULT_ACTIVITY_ORDER:
+    for a in _activity_order():
         if a in acts:
             ordered.append(a)
     for a in sorted(acts):
@@ -359,14 +364,22 @@ class SopViewApp(ctk.CTk):
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("dark-blue")
 
-        # Load data
-        self.activities, self.by_activity = load_sop_index()
-
-        if not self.activities:
-            raise RuntimeError(f"No activities found. Expected folders under: {SOP_ROOT}")
-
-        self.current_activity = ctk.StringVar(value=self.activities[0])
+        # Load data on the worker pool; the list fills in when it arrives
+        self.activities, self.by_activity = [], {}
+        self.current_activity = ctk.StringVar(value="Loading...")
         self.setup_ui()
+        TaskRunner.Run(self, load_sop_index, on_done=lambda res: self.show_index(*res),
+                       on_error=lambda e: self.show_index([], {}))
+
+    def show_index(self, activities: List[str], by_activity: Dict[str, List[SopItem]]) -> None:
+        if not activities:
+            messagebox.showerror("SOPs", f"No activities found. Expected folders under: {SOP_ROOT}")
+            self.destroy()
+            return
+        self.activities, self.by_activity = activities, by_activity
+        self.activity_menu.configure(values=self.activities)
+        self.current_activity.set(self.activities[0])
+        self.refresh_list()
 
     def get_items_for_activity(self, act: str) -> List[SopItem]:
         return self.by_activity.get(act, [])
@@ -411,9 +424,9 @@ class SopViewApp(ctk.CTk):
         ctk.CTkLabel(content, text="Activity", font=("Arial", 16, "bold")).pack(
             padx=12, pady=(12, 6), anchor="w"
         )
-        activity_menu = ctk.CTkOptionMenu(
+        self.activity_menu = activity_menu = ctk.CTkOptionMenu(
             content, 
-            values=self.activities, 
+            values=self.activities or ["Loading..."], 
             variable=self.current_activity, 
             command=lambda _: self.refresh_list(),
             font=DEFAULT_FONT
@@ -9,6 +9,12 @@ import os
 import sys
 import subprocess
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.TaskRunner as TaskRunner
+
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -64,6 +70,9 @@ def PgTimeToLabel(pg: str | None) -> str:
     label = t.strftime("%I:%M %p").lstrip("0")
     return label
 
+# How many days from the Trim Date one load shows
+SPANS = {"7 Days": 7, "14 Days": 14, "31 Days": 31}
+
 class DailyTrimEditor(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -109,22 +118,24 @@ class DailyTrimEditor(ctk.CTk):
         self.date_entry.grid(row=0, column=1, padx=6, pady=6)
         ctk.CTkLabel(f, text="Trimmer:", font=default_font).grid(row=0, column=2, padx=6, pady=6)
         self.var_trimmer = ctk.StringVar()
-        # Populate trimmer list with 'Select' as first entry
-        try:
-            trimmers = SubSupa.GetTrimmerList() or []
-        except Exception:
-            trimmers = []
-        values = ["Select"] + (trimmers if isinstance(trimmers, list) else list(trimmers))
-        self.trimmer_combo = ctk.CTkComboBox(f, variable=self.var_trimmer, values=values, font=default_font, width=150, state="readonly")
+        self.trimmer_combo = ctk.CTkComboBox(f, variable=self.var_trimmer, values=["Select"], font=default_font, width=150, state="readonly")
         self.trimmer_combo.set("Select")
         self.trimmer_combo.grid(row=0, column=3, padx=6, pady=6)
+        # Populate trimmer list with 'Select' as first entry
+        TaskRunner.Run(self, SubSupa.GetTrimmerList, on_done=self.show_trimmers,
+                       on_error=lambda e: self.show_trimmers([]),
+                       disable=(self.trimmer_combo,))
         ctk.CTkLabel(f, text="AM/PM:", font=default_font).grid(row=0, column=4, padx=6, pady=6)
         self.var_ampm = ctk.StringVar()
         self.ampm_combo = ctk.CTkComboBox(f, variable=self.var_ampm,
                      values=["", "Morning", "Afternoon"], font=default_font, width=120, state="readonly")
         self.ampm_combo.grid(row=0, column=5, padx=6, pady=6)
-        ctk.CTkButton(f, text="Load", command=self.load_rows, font=default_font).grid(row=0, column=6, padx=6, pady=6)
-        ctk.CTkButton(f, text="Close", command=self.destroy, font=default_font).grid(row=0, column=7, padx=6, pady=6)
+        self.span_combo = ctk.CTkComboBox(f, values=list(SPANS), font=default_font, width=120, state="readonly")
+        self.span_combo.set("7 Days")
+        self.span_combo.grid(row=0, column=6, padx=6, pady=6)
+        self.btn_load = ctk.CTkButton(f, text="Load", command=self.load_rows, font=default_font)
+        self.btn_load.grid(row=0, column=7, padx=6, pady=6)
+        ctk.CTkButton(f, text="Close", command=self.destroy, font=default_font).grid(row=0, column=8, padx=6, pady=6)
 
         # Table
         cols = ["TrimmerName", "TrimDate", "CropNo", "Strain",
@@ -174,12 +185,18 @@ class DailyTrimEditor(ctk.CTk):
                                     values=self._time_labels, state="readonly", font=default_font)
         self.cmb_end.grid(row=1, column=5, sticky="w", padx=(6,18), pady=6)
 
-        ctk.CTkButton(ef, text="Save", command=self.save_changes, font=default_font).grid(row=1, column=6, padx=6, pady=6)
+        self.btn_save = ctk.CTkButton(ef, text="Save", command=self.save_changes, font=default_font)
+        self.btn_save.grid(row=1, column=6, padx=6, pady=6)
         ctk.CTkButton(ef, text="Clear", command=self.clear_selection, font=default_font).grid(row=1, column=7, padx=6, pady=6)
         # Status label (in-window messages)
         self.status_label = ctk.CTkLabel(self, text="", font=default_font, text_color="#00aa00")
         self.status_label.pack(fill="x", padx=10, pady=(4, 8))
 
+    def show_trimmers(self, trimmers):
+        trimmers = trimmers or []
+        values = ["Select"] + (trimmers if isinstance(trimmers, list) else list(trimmers))
+        self.trimmer_combo.configure(values=values)
+
     def show_status(self, message: str, level: str = "info", duration: int = 4000):
         """Show a non-modal status message inside the window for `duration` ms.
 
@@ -201,7 +218,8 @@ class DailyTrimEditor(ctk.CTk):
             else:
                 messagebox.showinfo("Info", message)
 
-    def load_rows(self):
+    def load_rows(self, status: str = None):
+        """Reload the grid; status, if given, is shown once the rows are in instead of the row count."""
         # Ensure a valid trimmer is selected
         trimmer = self.trimmer_combo.get().strip()
         if trimmer == "" or trimmer == "Select":
@@ -214,32 +232,26 @@ class DailyTrimEditor(ctk.CTk):
             self.show_status("Invalid date (try YYYY-MM-DD).", level="error")
             return
 
+        ampm = self.var_ampm.get().strip()
+        end_date = start_date + timedelta(days=SPANS.get(self.span_combo.get(), 7) - 1)
+
+        # Every row from the selected date through the span
+        def fetch():
+            return SubSupa.SelectDailytrim(trimmer=trimmer, ampm=ampm,
+                                           start_date=start_date, end_date=end_date)
+
+        TaskRunner.Run(self, fetch,
+                       on_done=lambda rows: self.show_rows(start_date, end_date, rows, status),
+                       on_error=lambda e: self.show_status(f"Load failed: {e}", level="error"),
+                       disable=(self.btn_load, self.btn_save))
+
+    def show_rows(self, start_date: date, end_date: date, all_rows, status: str = None):
         # Clear tree
         for i in self.tree.get_children():
             self.tree.delete(i)
 
-        # Aggregate rows for selected date + next 6 days
-        all_rows = []
-        for d_off in range(7):
-            d = start_date + timedelta(days=d_off)
-            iso = d.isoformat()
-            try:
-                res = SubSupa.SelectDailytrim(
-                    trim_date=iso,
-                    trimmer=trimmer,
-                    ampm=self.var_ampm.get().strip()
-                )
-            except Exception:
-                # continue to next day if one day fails
-                continue
-            if res and getattr(res, 'data', None):
-                all_rows.extend(res.data or [])
-
-        # Sort rows by TrimDate then TrimmerName then Strain
-        def _sort_key(r):
-            return (r.get('TrimDate') or '', r.get('TrimmerName') or '', r.get('Strain') or '')
-
-        for r in sorted(all_rows, key=_sort_key):
+        # Rows arrive sorted by TrimDate then TrimmerName then Strain
+        for r in all_rows:
             # Show Start/End as labels in the grid for readability
             start_label = PgTimeToLabel(r.get("StartTime"))
             end_label = PgTimeToLabel(r.get("EndTime"))
@@ -256,9 +268,8 @@ class DailyTrimEditor(ctk.CTk):
             ]
             self.tree.insert("", "end", values=vals)
 
-        # Show status with date range and count
-        end_date = start_date + timedelta(days=6)
-        self.show_status(f"Loaded {len(all_rows)} rows for {start_date.isoformat()} to {end_date.isoformat()}")
+        # Show status with date range and count (or what the reload was for)
+        self.show_status(status or f"Loaded {len(all_rows)} rows for {start_date.isoformat()} to {end_date.isoformat()}")
 
         self.clear_selection()
 
@@ -316,47 +327,38 @@ class DailyTrimEditor(ctk.CTk):
             "AmPm": self.current_row["AmPm"],
         }
 
-        # Indicate busy cursor while saving (hourglass/watch) and ensure restoration
+        # Indicate busy cursor while saving (hourglass/watch) until the update returns
         try:
+            self.configure(cursor="watch")
+        except Exception:
+            # fallback cursor name (platform differences)
             try:
-                # set hourglass/wait cursor for whole window
-                try:
-                    self.configure(cursor="watch")
-                except Exception:
-                    # fallback cursor name (platform differences)
-                    try:
-                        self.configure(cursor="wait")
-                    except Exception:
-                        pass
-                # ensure UI updates so cursor change appears immediately
-                self.update_idletasks()
-
-                self.show_status("Saving...", level="info", duration=0)
-                SubSupa.UpdateDailytrim(match, new_vals)
-            except Exception as e:
-                self.show_status(f"Update failed: {e}", level="error")
-                return
-            finally:
-                # restore cursor
-                try:
-                    self.configure(cursor="")
-                except Exception:
-                    try:
-                        self.configure(cursor="arrow")
-                    except Exception:
-                        pass
-                self.update_idletasks()
-
-            # reload and report success
-            self.load_rows()
-            self.show_status("Row updated successfully.", level="info")
-        finally:
-            # Ensure any temporary status auto-clears shortly after completion
-            try:
-                # clear the 'Saving...' message after a short delay if it remained
-                self.after(1200, lambda: self.status_label.configure(text=""))
+                self.configure(cursor="wait")
             except Exception:
                 pass
+        self.show_status("Saving...", level="info", duration=0)
+
+        def restore_cursor():
+            try:
+                self.configure(cursor="")
+            except Exception:
+                try:
+                    self.configure(cursor="arrow")
+                except Exception:
+                    pass
+
+        def saved(res):
+            restore_cursor()
+            # reload, then report success once the rows are back
+            self.load_rows(status="Row updated successfully.")
+
+        def failed(e):
+            restore_cursor()
+            self.show_status(f"Update failed: {e}", level="error")
+
+        TaskRunner.Run(self, SubSupa.UpdateDailytrim, match, new_vals,
+                       on_done=saved, on_error=failed,
+                       disable=(self.btn_save, self.btn_load))
 
 if __name__ == "__main__":
     app = DailyTrimEditor()
@@ -6,6 +6,12 @@ import os
 import sys
 import subprocess
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.TaskRunner as TaskRunner
+
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -49,13 +55,11 @@ class EditTrimRatesApp(ctk.CTk):
         top.pack(fill="x", padx=10, pady=8)
 
         ctk.CTkLabel(top, text="Crop:", font=("Arial", 14)).pack(side="left", padx=(0, 6))
-        crops = SubSupa.LoadCrops()
-        self.crop_combo = ctk.CTkComboBox(top, values=crops, width=300, command=self.on_crop_select)
-        if crops:
-            self.crop_combo.set(crops[0])
+        self.crop_combo = ctk.CTkComboBox(top, values=[], width=300, command=self.on_crop_select)
         self.crop_combo.pack(side="left")
 
-        ctk.CTkButton(top, text="Ensure & Load", command=self.on_crop_select).pack(side="left", padx=6)
+        self.btn_load = ctk.CTkButton(top, text="Ensure & Load", command=self.on_crop_select)
+        self.btn_load.pack(side="left", padx=6)
 
         # Treeview for strains and rates
         tree_frame = ctk.CTkFrame(self)
@@ -87,7 +91,8 @@ class EditTrimRatesApp(ctk.CTk):
         self.rate_entry = ctk.CTkEntry(edit_frame, width=150)
         self.rate_entry.grid(row=0, column=3, padx=6, pady=6, sticky="w")
 
-        ctk.CTkButton(edit_frame, text="Update", command=self.update_rate).grid(row=0, column=4, padx=6, pady=6)
+        self.btn_update = ctk.CTkButton(edit_frame, text="Update", command=self.update_rate)
+        self.btn_update.grid(row=0, column=4, padx=6, pady=6)
 
         # Bottom buttons
         bottom = ctk.CTkFrame(self)
@@ -96,6 +101,14 @@ class EditTrimRatesApp(ctk.CTk):
         self.status.pack(side="left", padx=(4, 8))
         ctk.CTkButton(bottom, text="Close", command=self.destroy).pack(side="right", padx=(6, 0))
 
+        TaskRunner.Run(self, SubSupa.LoadCrops, on_done=self.show_crops,
+                       on_error=lambda e: self.show_status(f"Error loading crops: {e}"))
+
+    def show_crops(self, crops):
+        self.crop_combo.configure(values=crops or [])
+        if crops:
+            self.crop_combo.set(crops[0])
+
     def show_status(self, text, secs=3):
         self.status.configure(text=text)
         if secs:
@@ -121,28 +134,29 @@ class EditTrimRatesApp(ctk.CTk):
             return
         self.crop_no = crop_no
         self.show_status("Checking strains and rates...")
-        self.ensure_rates_for_crop(crop_no)
-        self.load_rates(crop_no)
+
+        def ensure_and_load():
+            # a failed ensure is reported, but whatever rates exist are still shown
+            try:
+                self.ensure_rates_for_crop(crop_no)
+                ensure_error = None
+            except Exception as e:
+                ensure_error = e
+            return SubSupa.LoadTrimRates(crop_no), ensure_error
+
+        TaskRunner.Run(self, ensure_and_load,
+                       on_done=lambda res: self.show_rates(*res),
+                       on_error=lambda e: self.show_status(f"Error loading rates: {e}"),
+                       disable=(self.crop_combo, self.btn_load, self.btn_update))
 
     def ensure_rates_for_crop(self, crop_no: int):
         """Ensure a row exists in trimrates for every strain in the crop. Insert default BigsRate=0.36 where missing."""
-        try:
-            strains = SubSupa.LoadStrains(crop_no)
-            # LoadStrains returns ["Select"] + strains
-            strains = [s for s in strains if s and s != "Select"]
-            for strain in strains:
-                q = SubSupa.sb.schema("scale").table("trimrates").select("CropNo").eq("CropNo", crop_no).eq("Strain", strain).execute()
-                exists = bool(q.data)
-                if not exists:
-                    SubSupa.sb.schema("scale").table("trimrates").insert({
-                        "CropNo": int(crop_no),
-                        "Strain": strain,
-                        "BigsRate": 0.36,
-                    }).execute()
-        except Exception as e:
-            self.show_status(f"Error ensuring rates: {e}")
-
-    def load_rates(self, crop_no: int):
+        strains = SubSupa.LoadStrains(crop_no)
+        # LoadStrains returns ["Select"] + strains
+        strains = [s for s in strains if s and s != "Select"]
+        SubSupa.EnsureTrimRates(crop_no, strains, 0.36)
+
+    def show_rates(self, rows, ensure_error=None):
         # Clear previous rows
         for item in self.tree.get_children():
             self.tree.delete(item)
@@ -150,21 +164,20 @@ class EditTrimRatesApp(ctk.CTk):
         self.strain_label.configure(text="")
         self.rate_entry.delete(0, 'end')
 
-        try:
-            res = SubSupa.sb.schema("scale").table("trimrates").select("Strain,BigsRate").eq("CropNo", crop_no).order("Strain").execute()
-            rows = res.data or []
-            if not rows:
+        if ensure_error is not None:
+            self.show_status(f"Error ensuring rates: {ensure_error}")
+        if not rows:
+            if ensure_error is None:
                 self.show_status("No rates found for this crop")
-                return
-            
-            for r in rows:
-                strain = r.get("Strain") or ""
-                bigs = r.get("BigsRate") or 0.0
-                self.tree.insert("", "end", values=(strain, f"{float(bigs):.4f}"))
-            
+            return
+
+        for r in rows:
+            strain = r.get("Strain") or ""
+            bigs = r.get("BigsRate") or 0.0
+            self.tree.insert("", "end", values=(strain, f"{float(bigs):.4f}"))
+
+        if ensure_error is None:
             self.show_status(f"Loaded {len(rows)} strains")
-        except Exception as e:
-            self.show_status(f"Error loading rates: {e}")
 
     def on_double_click(self, event):
         """Load selected row into edit fields on double-click"""
@@ -195,19 +208,21 @@ class EditTrimRatesApp(ctk.CTk):
             messagebox.showerror("Invalid Rate", "BigsRate must be a valid number")
             return
         
-        try:
-            SubSupa.sb.schema("scale").table("trimrates").update({"BigsRate": rate}).eq("CropNo", self.crop_no).eq("Strain", strain).execute()
-            
+        sel = self.tree.selection()
+
+        def updated(res):
             # Update the treeview
-            sel = self.tree.selection()
-            if sel:
+            if sel and self.tree.exists(sel[0]):
                 self.tree.item(sel[0], values=(strain, f"{rate:.4f}"))
-            
+
             self.show_status(f"Updated {strain} to {rate:.4f}")
             self.strain_label.configure(text="")
             self.rate_entry.delete(0, 'end')
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to update rate: {e}")
+
+        TaskRunner.Run(self, SubSupa.UpdateTrimRate, self.crop_no, strain, rate,
+                       on_done=updated,
+                       on_error=lambda e: messagebox.showerror("Error", f"Failed to update rate: {e}"),
+                       disable=(self.btn_update,))
 
 
 
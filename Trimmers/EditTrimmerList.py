@@ -30,6 +30,12 @@ def restart_menu():
 #       ...
 from SubSupa import GetTrimmers, AddTrimmer, UpdateTrimmer  # <-- adjust if your names differ
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.TaskRunner as TaskRunner
+
 # ---- GUI --------------------------------------------------------------------
 class TrimmerMaintApp(ctk.CTk):
     def __init__(self):
@@ -132,16 +138,16 @@ class TrimmerMaintApp(ctk.CTk):
         btns = ctk.CTkFrame(self)
         btns.pack(fill="x", padx=10, pady=(0, 10))
 
-        add_btn = ctk.CTkButton(btns, text="Add New", command=self.on_add, width=110)
+        self.add_btn = add_btn = ctk.CTkButton(btns, text="Add New", command=self.on_add, width=110)
         add_btn.pack(side="left")
 
-        save_btn = ctk.CTkButton(btns, text="Save Changes", command=self.on_save, width=130)
+        self.save_btn = save_btn = ctk.CTkButton(btns, text="Save Changes", command=self.on_save, width=130)
         save_btn.pack(side="left", padx=(8, 0))
 
         clear_btn = ctk.CTkButton(btns, text="Clear Form", command=self.clear_form, width=110)
         clear_btn.pack(side="left", padx=(8, 0))
 
-        refresh_btn = ctk.CTkButton(btns, text="Refresh", command=self.refresh_table, width=100)
+        self.refresh_btn = refresh_btn = ctk.CTkButton(btns, text="Refresh", command=self.refresh_table, width=100)
         refresh_btn.pack(side="right")
 
         close_btn = ctk.CTkButton(btns, text="Close", command=self.destroy, width=100)
@@ -151,13 +157,14 @@ class TrimmerMaintApp(ctk.CTk):
 
     def refresh_table(self):
         """Reload rows from DB into tree."""
+        TaskRunner.Run(self, GetTrimmers,  # <-- SubSupa call
+                       on_done=self.show_rows,
+                       on_error=lambda ex: messagebox.showerror("Error", f"Failed to load trimmers:\n{ex}"),
+                       disable=(self.refresh_btn, self.save_btn))
+
+    def show_rows(self, rows):
         for item in self.tree.get_children():
             self.tree.delete(item)
-        try:
-            rows = GetTrimmers()  # <-- SubSupa call
-        except Exception as ex:
-            messagebox.showerror("Error", f"Failed to load trimmers:\n{ex}")
-            return
 
         # Expecting keys: id, TrimmerName, TrimmerStat
         for row in rows or []:
@@ -215,25 +222,25 @@ class TrimmerMaintApp(ctk.CTk):
             messagebox.showwarning("Invalid Status", "Status must be Active or Inactive.")
             return
 
-        try:
-            new_row = AddTrimmer(trimmer_name, trimmer_stat)  # <-- SubSupa call
-        except Exception as ex:
-            messagebox.showerror("Error", f"Failed to add trimmer:\n{ex}")
-            return
-
-        # If API returns new row with id, insert; else refresh
-        if isinstance(new_row, dict) and "id" in new_row:
-            self.tree.insert(
-                "",
-                "end",
-                iid=str(new_row["id"]),
-                values=(new_row["id"], new_row.get("TrimmerName", trimmer_name), new_row.get("TrimmerStat", trimmer_stat)),
-            )
-        else:
-            self.refresh_table()
-
-        self.clear_form()
-        messagebox.showinfo("Added", "New trimmer added.")
+        def added(new_row):
+            # If API returns new row with id, insert; else refresh
+            if isinstance(new_row, dict) and "id" in new_row:
+                self.tree.insert(
+                    "",
+                    "end",
+                    iid=str(new_row["id"]),
+                    values=(new_row["id"], new_row.get("TrimmerName", trimmer_name), new_row.get("TrimmerStat", trimmer_stat)),
+                )
+            else:
+                self.refresh_table()
+
+            self.clear_form()
+            messagebox.showinfo("Added", "New trimmer added.")
+
+        TaskRunner.Run(self, AddTrimmer, trimmer_name, trimmer_stat,  # <-- SubSupa call
+                       on_done=added,
+                       on_error=lambda ex: messagebox.showerror("Error", f"Failed to add trimmer:\n{ex}"),
+                       disable=(self.add_btn, self.save_btn))
 
     def on_save(self):
         if self.selected_id is None:
@@ -250,15 +257,18 @@ class TrimmerMaintApp(ctk.CTk):
             messagebox.showwarning("Invalid Status", "Status must be Active or Inactive.")
             return
 
-        try:
-            updated = UpdateTrimmer(self.selected_id, trimmer_name, trimmer_stat)  # <-- SubSupa call
-        except Exception as ex:
-            messagebox.showerror("Error", f"Failed to save changes:\n{ex}")
-            return
+        row_id = self.selected_id
+
+        def saved(updated):
+            # Update the tree row
+            if self.tree.exists(str(row_id)):
+                self.tree.item(str(row_id), values=(row_id, trimmer_name, trimmer_stat))
+            messagebox.showinfo("Saved", "Changes saved.")
 
-        # Update the tree row
-        self.tree.item(str(self.selected_id), values=(self.selected_id, trimmer_name, trimmer_stat))
-        messagebox.showinfo("Saved", "Changes saved.")
+        TaskRunner.Run(self, UpdateTrimmer, row_id, trimmer_name, trimmer_stat,  # <-- SubSupa call
+                       on_done=saved,
+                       on_error=lambda ex: messagebox.showerror("Error", f"Failed to save changes:\n{ex}"),
+                       disable=(self.add_btn, self.save_btn))
 
 if __name__ == "__main__":
     app = TrimmerMaintApp()
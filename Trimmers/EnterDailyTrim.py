@@ -7,6 +7,12 @@ import os
 import sys
 import subprocess
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.TaskRunner as TaskRunner
+
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -134,20 +140,20 @@ class EnterDailyTrimApp(ctk.CTk):
             pass
 
     def LoadCrops(self):
-        try:
-            crops = SubSupa.LoadCrops() or []
-            self.CropNoCombo.configure(values=crops)
+        def show(crops):
+            self.CropNoCombo.configure(values=crops or [])
             self.CropNoCombo.set('Select')
-        except Exception as e:
-            self.SetStatus(f"LoadCrops failed: {e}")
+
+        TaskRunner.Run(self, SubSupa.LoadCrops, on_done=show,
+                       on_error=lambda e: self.SetStatus(f"LoadCrops failed: {e}"))
 
     def LoadTrimmers(self):
-        try:
-            trimmers = SubSupa.LoadTrimmers() or []
-            self.TrimmerNameCombo.configure(values=trimmers)
+        def show(trimmers):
+            self.TrimmerNameCombo.configure(values=trimmers or [])
             self.TrimmerNameCombo.set('Select')
-        except Exception as e:
-            self.SetStatus(f"LoadTrimmers failed: {e}")
+
+        TaskRunner.Run(self, SubSupa.LoadTrimmers, on_done=show,
+                       on_error=lambda e: self.SetStatus(f"LoadTrimmers failed: {e}"))
 
     def OnCropChanged(self, choice=None):
         crop_val = (self.CropNoCombo.get() or '').strip()
@@ -161,12 +167,13 @@ class EnterDailyTrimApp(ctk.CTk):
             self.SetStatus(f"Could not parse CropNo from '{crop_val}'")
             return
 
-        try:
-            strains = SubSupa.LoadStrains(crop_no) or []
-            self.StrainCombo.configure(values=strains)
+        def show(strains):
+            self.StrainCombo.configure(values=strains or [])
             self.StrainCombo.set('Select')
-        except Exception as e:
-            self.SetStatus(f"LoadStrains failed: {e}")
+
+        TaskRunner.Run(self, SubSupa.LoadStrains, crop_no, on_done=show,
+                       on_error=lambda e: self.SetStatus(f"LoadStrains failed: {e}"),
+                       disable=(self.StrainCombo, self.SaveButton))
 
         self.OnFilterChanged()
 
@@ -193,12 +200,15 @@ class EnterDailyTrimApp(ctk.CTk):
         self.LoadTreeview(trimmer, trim_date, crop_no, strain)
 
     def LoadTreeview(self, trimmer_name: str, trim_date: str, crop_no=None, strain=None):
-        try:
-            rows = SubSupa.GetOneTrimDay(trimmer_name, trim_date, crop_no, strain) or []
-        except Exception as e:
+        def failed(e):
+            self.ShowTreeview([])
             self.SetStatus(f"GetOneTrimDay failed: {e}")
-            rows = []
 
+        TaskRunner.Run(self, SubSupa.GetOneTrimDay, trimmer_name, trim_date, crop_no, strain,
+                       on_done=self.ShowTreeview, on_error=failed)
+
+    def ShowTreeview(self, rows):
+        rows = rows or []
         for iid in self.Tree.get_children():
             self.Tree.delete(iid)
 
@@ -251,38 +261,45 @@ class EnterDailyTrimApp(ctk.CTk):
             messagebox.showwarning("Select Strain", "Please select a strain")
             return
 
-        # Save AM Flower and smalls
-        try:
-            am_flower = float(self.AmFlowerEntry.get() or '0')
-            am_smalls = float(self.AmSmallsEntry.get() or '0')
-            if am_flower > 0 or am_smalls > 0:
-                SubSupa.UpdateDailyTrim(trimmer, trim_date, crop_no, strain, am_flower, am_smalls, "Morning")
-        except ValueError:
-            pass
-        except Exception as e:
-            self.SetStatus(f"Save AM Flower failed: {e}")
-
-        # Save PM Flower and smalls
-        try:
-            pm_flower = float(self.PmFlowerEntry.get() or '0')
-            pm_smalls = float(self.PmSmallsEntry.get() or '0')
-            if pm_flower > 0 or pm_smalls > 0:
-                SubSupa.UpdateDailyTrim(trimmer, trim_date, crop_no, strain, pm_flower, pm_smalls, "Afternoon")
-        except ValueError:
-            pass
-        except Exception as e:
-            self.SetStatus(f"Save PM Flower failed: {e}")
-
-        self.SetStatus("Saved daily trim records")
-        
-        # Clear entries
-        self.AmFlowerEntry.delete(0, 'end')
-        self.PmFlowerEntry.delete(0, 'end')
-        self.AmSmallsEntry.delete(0, 'end')
-        self.PmSmallsEntry.delete(0, 'end')
-
-        # Reload treeview
-        self.LoadTreeview(trimmer, trim_date, crop_no, strain)
+        # read the AM and PM amounts here; blank or non-numeric rows are skipped
+        shifts = []
+        for label, flower_entry, smalls_entry, ampm in (
+                ("AM", self.AmFlowerEntry, self.AmSmallsEntry, "Morning"),
+                ("PM", self.PmFlowerEntry, self.PmSmallsEntry, "Afternoon")):
+            try:
+                flower = float(flower_entry.get() or '0')
+                smalls = float(smalls_entry.get() or '0')
+            except ValueError:
+                continue
+            if flower > 0 or smalls > 0:
+                shifts.append((label, flower, smalls, ampm))
+
+        def save():
+            """Save both shifts in one request; returns the status of the last one that failed, if any."""
+            rows = [{"TrimmerName": trimmer, "TrimDate": trim_date, "CropNo": crop_no, "Strain": strain,
+                     "AmPm": ampm, "FlowerGrams": flower, "SmallsGrams": smalls}
+                    for label, flower, smalls, ampm in shifts]
+            status = None
+            for (label, *_), result in zip(shifts, SubSupa.SaveDailyTrim(rows)):
+                if result.get("Status") == "error":
+                    status = f"Save {label} Flower failed: {result.get('Error')}"
+            return status
+
+        def saved(status):
+            self.SetStatus(status or "Saved daily trim records")
+
+            # Clear entries
+            self.AmFlowerEntry.delete(0, 'end')
+            self.PmFlowerEntry.delete(0, 'end')
+            self.AmSmallsEntry.delete(0, 'end')
+            self.PmSmallsEntry.delete(0, 'end')
+
+            # Reload treeview
+            self.LoadTreeview(trimmer, trim_date, crop_no, strain)
+
+        TaskRunner.Run(self, save, on_done=saved,
+                       on_error=lambda e: self.SetStatus(f"Save failed: {e}"),
+                       disable=(self.SaveButton,))
 
 
 def main():
@@ -29,9 +29,7 @@ ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
 if ROOT_DIR not in sys.path:
     sys.path.insert(0, ROOT_DIR)
 import Common.SubScale as SubScale
-
-# Connect to hardware after imports
-# SubScale.ConnectScales()
+import Common.TaskRunner as TaskRunner
 
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -190,6 +188,11 @@ class WeighApp(ctk.CTk):
         self.StatusLabel = ctk.CTkLabel(Container, text="", font=DEFAULT_FONT, text_color="#00aa00")
         self.StatusLabel.grid(row=7, column=0, columnspan=4, sticky="w", pady=(8, 0))
 
+        # Saved entries not yet sent; entries saved while a send is in flight go in
+        # the next one, so a busy end of shift is a few requests, not one per trimmer
+        self.PendingRows = []
+        self.Sending = False
+
         # Initial data load
         self.LoadStaticLists()
 
@@ -197,7 +200,7 @@ class WeighApp(ctk.CTk):
         self.PrevScaleWeight = None
         self.PrevScoutStatus = None
         self.ScalePollId = None
-        self.StartScalePoll()
+        self.after(100, self.StartScalePoll)   # open the scale once the window is up
 
         # Ensure polling stops on window close
         try:
@@ -220,11 +223,18 @@ class WeighApp(ctk.CTk):
     # ---------- Data loading ----------
     def LoadStaticLists(self):
         """Populate Trimmer and Crop combos at startup or refresh."""
-        Trimmers = SubSupa.LoadTrimmers() or []
+        def load():
+            return SubSupa.LoadTrimmers() or [], SubSupa.LoadCrops() or []
+
+        TaskRunner.Run(self, load,
+                       on_done=lambda res: self.ShowStaticLists(*res),
+                       on_error=lambda e: self.ShowStatus(f"Could not load lists: {e}", kind="error"),
+                       disable=(self.BtnRefresh, self.BtnSave))
+
+    def ShowStaticLists(self, Trimmers, Crops):
         self.CmbTrimmer.configure(values=Trimmers)
         self.CmbTrimmer.set("Select")
 
-        Crops = SubSupa.LoadCrops() or []
         self.CmbCrop.configure(values=Crops)
         self.CmbCrop.set("Select")
 
@@ -257,9 +267,13 @@ class WeighApp(ctk.CTk):
             self.CmbStrain.configure(values=["Select"])
             self.CmbStrain.set("Select")
             return
-        Strains = SubSupa.LoadStrains(CropNo)
-        self.CmbStrain.configure(values=(Strains) if Strains else ["Select"])
-        self.CmbStrain.set("Select")
+        def show(Strains):
+            self.CmbStrain.configure(values=(Strains) if Strains else ["Select"])
+            self.CmbStrain.set("Select")
+
+        TaskRunner.Run(self, SubSupa.LoadStrains, CropNo, on_done=show,
+                       on_error=lambda e: self.ShowStatus(f"Could not load strains: {e}", kind="error"),
+                       disable=(self.CmbStrain, self.BtnSave))
 
     def OnAmpmChanged(self, value):
         """Adjust start/end combo values when AM/PM changes.
@@ -345,6 +359,10 @@ class WeighApp(ctk.CTk):
             self.ShowStatus("Please choose a Strain.", kind="warning")
             return
 
+        if TypeVal not in ("Flower", "Smalls"):
+            self.ShowStatus("Please choose a Type.", kind="warning")
+            return
+
         if Ampm == "Select" or Ampm == "":
             self.ShowStatus("Please choose Morning or Afternoon.", kind="warning")
             return
@@ -370,14 +388,43 @@ class WeighApp(ctk.CTk):
             self.ShowStatus("Could not parse start/end times.", kind="warning")
             return
 
-        try:
-            SubSupa.SaveTrimmer(trimmer=Trimmer, grams=Grams, crop_no=CropNo, strain=Strain, trimtype=TypeVal, trimdate=TrimDate, ampm=Ampm, StartTime=StartTime, EndTime=EndTime)
-        except Exception as e:
-            self.ShowStatus(f"Could not save entry: {e}", kind="error")
-            print({e})
-            return
-        self.ShowStatus("Trim weight recorded.", kind="info")
+        # the other type is sent as 0, which keeps what is already recorded
+        self.PendingRows.append({
+            "TrimmerName": Trimmer, "TrimDate": TrimDate, "CropNo": CropNo, "Strain": Strain, "AmPm": Ampm,
+            "FlowerGrams": Grams if TypeVal == "Flower" else 0,
+            "SmallsGrams": Grams if TypeVal == "Smalls" else 0,
+            "StartTime": StartTime, "EndTime": EndTime,
+        })
         self.OnClear()
+        self.SendPending()
+
+    def SendPending(self):
+        """Send every saved entry not yet sent in one SaveDailyTrim request."""
+        if self.Sending or not self.PendingRows:
+            return
+        rows, self.PendingRows = self.PendingRows, []
+        self.Sending = True
+
+        def sent(results):
+            self.Sending = False
+            errors = [f"{rows[r['Row'] - 1]['TrimmerName']}: {r.get('Error')}"
+                      for r in results if r.get("Status") == "error"]
+            if errors:
+                self.ShowStatus("Could not save entry: " + "; ".join(errors), kind="error")
+            elif len(rows) == 1:
+                self.ShowStatus("Trim weight recorded.", kind="info")
+            else:
+                self.ShowStatus(f"{len(rows)} trim weights recorded.", kind="info")
+            self.SendPending()
+
+        def failed(e):
+            # keep them; they go again with the next save
+            self.Sending = False
+            self.PendingRows[:0] = rows
+            self.ShowStatus(f"Could not save entry: {e} ({len(self.PendingRows)} waiting)", kind="error")
+            print({e})
+
+        TaskRunner.Run(self, SubSupa.SaveDailyTrim, rows, on_done=sent, on_error=failed)
 
     def ShowStatus(self, msg: str, kind: str = "info"):
         """Show a short, non-modal status message in the window.
@@ -463,6 +510,13 @@ class WeighApp(ctk.CTk):
             pass
 
     def _on_close(self):
+        if (self.PendingRows or self.Sending) and not getattr(self, 'CloseWarned', False):
+            # first close with entries unsent: warn in the window and try again
+            self.CloseWarned = True
+            waiting = len(self.PendingRows) or 1
+            self.ShowStatus(f"{waiting} trim weight(s) not saved yet. Close again to discard them.", kind="warning")
+            self.SendPending()
+            return
         # Stop polling then destroy
         try:
             self.StopScalePoll()
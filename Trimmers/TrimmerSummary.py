@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from datetime import time as dt_time
 import subprocess
 from tkcalendar import DateEntry
-from SubSupa import GetTrimSummary, GetTrimmerList, GetRatesMap, LoadCrops, LoadStrains
+from SubSupa import GetTrimmerList, GetRatesMap, LoadCrops, LoadStrains, LoadTrimRollup
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import LETTER, landscape
 from reportlab.lib.styles import getSampleStyleSheet
@@ -13,6 +13,13 @@ from reportlab.lib.units import inch
 import os, tempfile, sys
 from typing import Optional
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CURRENT_DIR)  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.TaskRunner as TaskRunner
+import Common.TrimPay as TrimPay
+
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -69,6 +76,7 @@ class SummaryScreen(ctk.CTkFrame):
         self.start_date = None
         self.create_widgets()
         self.load_trimmers()
+        self.load_crops()
 #        self.load_data()
 
     def export_data_pdf(self):
@@ -286,8 +294,8 @@ class SummaryScreen(ctk.CTkFrame):
         except Exception:
             pass
 
-        refresh_btn = ctk.CTkButton(filter_row, text="Load Week", command=self.load_data, width=110)
-        refresh_btn.pack(side="left", padx=4)
+        self.refresh_btn = ctk.CTkButton(filter_row, text="Load Week", command=self.load_data, width=110)
+        self.refresh_btn.pack(side="left", padx=4)
 
         # Export report PDF button
         ctk.CTkButton(filter_row, text="Export Report PDF", width=150, command=self.export_data_pdf).pack(side="left", padx=4)
@@ -330,8 +338,7 @@ class SummaryScreen(ctk.CTkFrame):
 
         # Crop selector
         ctk.CTkLabel(strain_filter, text="Crop:", font=("Arial", 14)).pack(side="left", padx=(0,6))
-        crops = LoadCrops() or ["Select"]
-        self.CropCombo = ctk.CTkComboBox(strain_filter, values=crops, width=180, font=("Arial",13), command=self.on_strain_crop_changed)
+        self.CropCombo = ctk.CTkComboBox(strain_filter, values=["Select"], width=180, font=("Arial",13), command=self.on_strain_crop_changed)
         self.CropCombo.set("Select")
         self.CropCombo.pack(side="left", padx=(0,10))
 
@@ -364,7 +371,8 @@ class SummaryScreen(ctk.CTkFrame):
         except Exception:
             pass
 
-        ctk.CTkButton(strain_filter, text="Load Strain Summary", command=self.load_strain_summary, width=170).pack(side="left", padx=6)
+        self.strain_btn = ctk.CTkButton(strain_filter, text="Load Strain Summary", command=self.load_strain_summary, width=170)
+        self.strain_btn.pack(side="left", padx=6)
         ctk.CTkButton(strain_filter, text="Export Strain PDF", command=self.export_strain_pdf, width=150).pack(side="left", padx=6)
 
         # Tree for strain summary: Date, Trimmer, Flower, Smalls
@@ -450,65 +458,37 @@ class SummaryScreen(ctk.CTkFrame):
 
 
 
-    def build_pay_aggregates(self, rows):
-        """
-        From raw rows (already filtered by date + trimmer), build dict:
-        bigs[(CropNo, Strain)] -> total flower grams
-        """
-        bigs = {}
-        for r in rows:
-            crop = int(r.get("CropNo") or 0)
-            strain = (r.get("Strain") or "").strip()
-            flower_grams = float(r.get("FlowerGrams") or 0)
-            key = (crop, strain)
-            bigs[key] = bigs.get(key, 0.0) + flower_grams
-        return bigs
-
-    def insert_pay_table(self, tree, grams_map, rate_type, rates_map, lunch_count=0):
+    def insert_pay_table(self, tree, pay):
         """
-        rate_type: 'bigs' or 'smalls'
-        grams_map: dict[(CropNo, Strain)] -> grams
-        rates_map: dict[(CropNo, Strain)] -> {'bigs': rate, 'smalls': rate}
+        pay: TrimPay.WeekPay() for the rows shown, one line per (CropNo, Strain)
         """
         tree.delete(*tree.get_children())
-        total_pay = 0.0
-        total_grams = 0.0
         # Sorted display by CropNo then Strain
-        items = sorted(grams_map.items(), key=lambda kv: (kv[0][0], kv[0][1]))
-        for i, (key, grams) in enumerate(items):
-            crop, strain = key
-            # rates_map now maps (CropNo, Strain) -> BigsRate (float)
-            # only bigs/pay is supported here, so read the float directly
-            rate = float(rates_map.get(key, 0.0))
-            pay = round(grams * rate, 2)
-            total_pay += pay
-            total_grams += grams
+        for i, (crop, strain, rate, grams, line_pay) in enumerate(pay["Lines"]):
             tag = "odd" if i % 2 else "even"
             tree.insert(
                 "",
                 "end",
-                values=(crop, strain, f"{rate:.4f}", f"{grams:.2f}", f"{pay:.2f}"),
+                values=(crop, strain, f"{rate:.4f}", f"{grams:.2f}", f"{line_pay:.2f}"),
                 tags=(tag,),
             )
 
-        # Insert Lunch row (one per day with >=6 hours)
-        if lunch_count and lunch_count > 0:
-            lunch_pay = round(lunch_count * 20.0, 2)
+        # Insert Lunch row (one per day with >= TrimPay.LUNCH_HOURS)
+        if pay["LunchCount"]:
             # choose tag based on current number of data rows
-            tag = "odd" if (len(items) % 2) else "even"
+            tag = "odd" if (len(pay["Lines"]) % 2) else "even"
             tree.insert(
                 "",
                 "end",
-                values=("", "Lunch", f"{20.00:.2f}", "", f"{lunch_pay:.2f}"),
+                values=("", "Lunch", f"{TrimPay.LUNCH_PAY:.2f}", "", f"{pay['LunchPay']:.2f}"),
                 tags=(tag,),
             )
-            total_pay += lunch_pay
 
         # Totals row
         tree.insert(
             "",
             "end",
-            values=("", "TOTAL", "", f"{total_grams:.2f}", f"{total_pay:.2f}"),
+            values=("", "TOTAL", "", f"{pay['FlowerGrams']:.2f}", f"{pay['GrossPay']:.2f}"),
             tags=("total",),
         )
 
@@ -517,15 +497,22 @@ class SummaryScreen(ctk.CTkFrame):
         self.total_pay_tree.insert("", "end", values=(f"{total_grams:.2f}", f"{total_pay:.2f}"), tags=("total",))
 
     def load_trimmers(self):
-        try:
-            trimmers = GetTrimmerList()
+        def show(trimmers):
             values = ["All"] + trimmers
             self.trimmer_combo.configure(values=values)
             if self.trimmer_combo.get() not in values:
                 self.trimmer_combo.set("All")
-        except Exception:
+
+        def failed(e):
             self.trimmer_combo.configure(values=["All"])
             self.trimmer_combo.set("All")
+
+        TaskRunner.Run(self, GetTrimmerList, on_done=show, on_error=failed)
+
+    def load_crops(self):
+        """Fill the Strain tab's Crop combo."""
+        TaskRunner.Run(self, LoadCrops,
+                       on_done=lambda crops: self.CropCombo.configure(values=crops or ["Select"]))
     
     def on_strain_crop_changed(self, val):
         """Called when the Crop combo in the Strain tab changes. Populate the Strain list."""
@@ -540,14 +527,14 @@ class SummaryScreen(ctk.CTkFrame):
             self.StrainCombo.configure(values=["Select"])
             self.StrainCombo.set("Select")
             return
-        try:
-            strains = LoadStrains(crop_no) or ["Select"]
-            self.StrainCombo.configure(values=strains)
-            self.StrainCombo.set("Select")
-        except Exception:
-            self.StrainCombo.configure(values=["Select"])
+        def show(strains):
+            self.StrainCombo.configure(values=strains or ["Select"])
             self.StrainCombo.set("Select")
 
+        TaskRunner.Run(self, LoadStrains, crop_no, on_done=show,
+                       on_error=lambda e: show(None),
+                       disable=(self.StrainCombo, self.strain_btn))
+
     def load_strain_summary(self):
         """Load trimmer rows for the selected CropNo+Strain between the Start and End dates and populate the StrainTree."""
         crop_display = (self.CropCombo.get() or "").strip()
@@ -570,31 +557,22 @@ class SummaryScreen(ctk.CTkFrame):
             # swap
             start, end = end, start
 
-        data = GetTrimSummary(start_date=start, end_date=end)
+        # only this crop/strain, one row per day and trimmer, comes back
+        TaskRunner.Run(self, LoadTrimRollup, start, end, crop_no=crop_no, strain=strain,
+                       group_by=("TrimDate", "TrimmerName"),
+                       on_done=lambda data: self.show_strain_summary(crop_no, strain, data),
+                       disable=(self.strain_btn,))
 
-        # Filter for crop and strain
-        filtered = [r for r in data if int(r.get("CropNo") or 0) == crop_no and (r.get("Strain") or "").strip() == strain]
-
-        # Group by (date, trimmer)
-        grouped = {}
-        for r in filtered:
-            td = (r.get("TrimDate") or "").split("T", 1)[0]
-            tr = (r.get("TrimmerName") or "").strip()
-            key = (td, tr)
-            if key not in grouped:
-                grouped[key] = {"flower": 0.0, "smalls": 0.0}
-            flower_grams = float(r.get("FlowerGrams") or 0.0)
-            smalls_grams = float(r.get("SmallsGrams") or 0.0)
-            grouped[key]["flower"] += flower_grams
-            grouped[key]["smalls"] += smalls_grams
-
-        # Populate tree
+    def show_strain_summary(self, crop_no: int, strain: str, data):
+        # data is already this crop/strain, one row per (date, trimmer), in that order
         self.StrainTree.delete(*self.StrainTree.get_children())
         total_flower = 0.0
         total_smalls = 0.0
-        for (date_str, trimmer), vals in sorted(grouped.items()):
-            f = round(vals["flower"], 2)
-            s = round(vals["smalls"], 2)
+        for r in data:
+            date_str = (r.get("TrimDate") or "").split("T", 1)[0]
+            trimmer = (r.get("TrimmerName") or "").strip()
+            f = round(float(r.get("FlowerGrams") or 0.0), 2)
+            s = round(float(r.get("SmallsGrams") or 0.0), 2)
             total_flower += f
             total_smalls += s
             self.StrainTree.insert("", "end", values=(date_str, trimmer, f if f else "", s if s else ""))
@@ -665,7 +643,7 @@ class SummaryScreen(ctk.CTkFrame):
         self._open_file(pdf_path)
         
     def insert_day_summary(self, tree, rows):
-        """Populate a per-day tree. Display each row with FlowerGrams and SmallsGrams."""
+        """Populate a per-day tree: one rollup row (a trimmer on one crop/strain) per line."""
         # Clear existing rows
         tree.delete(*tree.get_children())
 
@@ -673,29 +651,21 @@ class SummaryScreen(ctk.CTkFrame):
         total_smalls = 0.0
         total_hours = 0.0
 
-        # Sort rows for stable display: by TrimDate, CropNo, Strain
+        # Sort rows for stable display: by CropNo, Strain, Trimmer
         def _row_key(r):
-            td = (r.get("TrimDate") or "")
             crop = int(r.get("CropNo") or 0)
             strain = (r.get("Strain") or "")
-            ampm = (r.get("AmPm") or "")
-            return (td, crop, strain, ampm)
+            trimmer = (r.get("TrimmerName") or "")
+            return (crop, strain, trimmer)
 
         for i, r in enumerate(sorted(rows, key=_row_key)):
             flower_val = float(r.get("FlowerGrams") or 0)
             smalls_val = float(r.get("SmallsGrams") or 0)
 
-            start_pg = r.get("StartTime")
-            end_pg = r.get("EndTime")
-            start_label = pg_time_to_label(start_pg)
-            end_label = pg_time_to_label(end_pg)
-
-            hrs = 0.0
-            if start_pg and end_pg:
-                try:
-                    hrs = hours_between(start_pg, end_pg)
-                except Exception:
-                    hrs = 0.0
+            # first start and last end of the day's sessions; Hours is their worked time summed
+            start_label = pg_time_to_label(r.get("StartTime"))
+            end_label = pg_time_to_label(r.get("EndTime"))
+            hrs = float(r.get("Hours") or 0)
 
             total_flower += flower_val
             total_smalls += smalls_val
@@ -721,8 +691,15 @@ class SummaryScreen(ctk.CTkFrame):
         end = start + timedelta(days=6)
         self.start_date = start
 
-        data = GetTrimSummary(trimmer_name=self.selected_trimmer, start_date=start, end_date=end)
+        def fetch():
+            # grouped per day, trimmer and crop/strain on the server
+            return LoadTrimRollup(start, end, self.selected_trimmer), GetRatesMap()
+
+        TaskRunner.Run(self, fetch,
+                       on_done=lambda res: self.show_data(start, *res),
+                       disable=(self.refresh_btn,))
 
+    def show_data(self, start, data, rates_map):
         # Clear any previous day widgets
         for child in list(self.days_frame.children.values()):
             try:
@@ -731,32 +708,23 @@ class SummaryScreen(ctk.CTkFrame):
                 pass
         self.days_info = []
 
+        # One pass over the rollup: rows by day and week totals
+        by_day = {}
+        grand_total_flower = 0.0
+        grand_total_smalls = 0.0
+        for r in data:
+            by_day.setdefault((r.get("TrimDate") or "")[:10], []).append(r)
+            grand_total_flower += float(r.get("FlowerGrams") or 0)
+            grand_total_smalls += float(r.get("SmallsGrams") or 0)
+
         # For each day in the week, create a tree and populate with that day's rows
-        lunch_count = 0
         first_tree_created = False
         for d_off in range(7):
             d = start + timedelta(days=d_off)
-            iso = d.isoformat()
-            # Filter rows for this date (TrimDate may include a time portion)
-            rows_for_day = [r for r in data if (r.get('TrimDate') or '').startswith(iso)]
-
-            # compute total hours for the day from all rows that have start & end
-            day_total_hours = 0.0
-            for r in rows_for_day:
-                st = r.get('StartTime')
-                en = r.get('EndTime')
-                if st and en:
-                    try:
-                        day_total_hours += hours_between(st, en)
-                    except Exception:
-                        pass
-
-            # Lunch counter: add one if total day hours >= 6
-            try:
-                if day_total_hours >= 6.0:
-                    lunch_count += 1
-            except Exception:
-                pass
+            rows_for_day = by_day.get(d.isoformat(), [])
+
+            # total hours worked that day
+            day_total_hours = sum(float(r.get("Hours") or 0) for r in rows_for_day)
 
             # skip creating a box for days with zero total hours
             if not day_total_hours:
@@ -773,7 +741,7 @@ class SummaryScreen(ctk.CTkFrame):
             show_headings = not first_tree_created
             tree = self.create_treeview(master=tree_widget_parent, show_headings=show_headings)
             first_tree_created = True
-            # Compute how many rows we'll display: one per DB row + 1 TOTAL row
+            # Compute how many rows we'll display: one per rollup row + 1 TOTAL row
             data_rows = len(rows_for_day)
             # Ensure at least 1 visible data row; add 1 for the TOTAL row. Cap to avoid extremely tall widgets.
             rows_to_show = min(max(data_rows, 1) + 1, 20)
@@ -788,34 +756,12 @@ class SummaryScreen(ctk.CTkFrame):
             self.days_info.append((d, tree))
             self.insert_day_summary(tree, rows_for_day)
 
-        # Calculate grand totals across all data
-        grand_total_flower = sum(float(r.get("FlowerGrams") or 0) for r in data)
-        grand_total_smalls = sum(float(r.get("SmallsGrams") or 0) for r in data)
-        
         # Update grand total labels
         self.grand_total_flower_label.configure(text=f"{grand_total_flower:.2f} g")
         self.grand_total_smalls_label.configure(text=f"{grand_total_smalls:.2f} g")
 
-        # Pay tables
-        rates_map = GetRatesMap()
-        bigs_map = self.build_pay_aggregates(data)
-        # pass lunch_count so insert_pay_table can add Lunch rows and include them in totals
-        self.insert_pay_table(self.pay_bigs_tree, bigs_map, "bigs", rates_map, lunch_count=lunch_count)
-
-        # Compute overall totals (bigs + smalls)
-        total_grams_bigs = sum(bigs_map.values())
-
-        def _sum_pay(grams_map, rate_key):
-            # rate_key is ignored because we only return bigs rates from GetRatesMap
-            total = 0.0
-            for (crop, strain), grams in grams_map.items():
-                rate = float(rates_map.get((crop, strain), 0.0))
-                total += grams * rate
-            return total
-
-
-        total_pay_bigs = _sum_pay(bigs_map, "bigs")
-
+        # Pay table: flower pay per crop/strain plus lunches, summed as Payroll --check expects
+        self.insert_pay_table(self.pay_bigs_tree, TrimPay.WeekPay(data, rates_map))
 
     def insert_summary(self, tree, rows):
         tree.delete(*tree.get_children())
@@ -5,9 +5,10 @@ Workflow:
  - Select CropNo (SubSupa.LoadCrops)
  - Select Strain (SubSupa.LoadStrains)
  - When Strain selected, load BagNo combo via SubSupa.LoadTrimBagNos
- - Weight display is populated from SubScale.GetWeight polled every 500ms
- - Save Weight validates selections and weight > 0 then calls SubSupa.InsertTrimBag
-   (TrimDate passed as ISO datetime string).
+ - Weight display is pushed from the SubScale.ScaleReader background thread
+ - Save Weight validates selections and weight > 0 then queues the bag in
+   Common.WriteJournal (TrimDate passed as ISO datetime string), which sends it
+   to Supabase with InsertTrimBag.
 """
 import math
 from datetime import datetime
@@ -28,11 +29,8 @@ if ROOT_DIR not in sys.path:
 
 import Common.SubScale as SubScale
 import Common.SubReadQRCode as SubReadQRCode
-
-# Connect to hardware after imports (before GUI creation)
-SubReadQRCode.ConnectScanner()
-
-ScoutConnected, RangerConnected = SubScale.GetScaleStatus()
+import Common.TaskRunner as TaskRunner
+import Common.WriteJournal as WriteJournal
 
 # BASE_DIR is the folder that contains menu.py
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -89,6 +87,12 @@ class WeighTrimApp(ctk.CTk):
                                              text_color="#ff8800", corner_radius=6, 
                                              fg_color="#2b2b2b", padx=10, pady=5)
         self.ScaleStatusLabel.pack(side="right", padx=6, pady=4)
+
+        # Bags waiting in the local journal to reach Supabase
+        self.SyncLabel = ctk.CTkLabel(menu_bar, text="Sync: ...", font=("Arial", 12), corner_radius=6,
+                                      fg_color="#2b2b2b", padx=10, pady=5, cursor="hand2")
+        self.SyncLabel.pack(side="right", padx=6, pady=4)
+        WriteJournal.Watch(self, self.SyncLabel)
         
         # Set dark mode theme
         ctk.set_appearance_mode("dark")
@@ -147,12 +151,15 @@ class WeighTrimApp(ctk.CTk):
 
         # scale poll
         self.PrevScaleWeight = None
+        self.StableWeight = None    # settled weight from the scale, not yet saved
+        self.ScanPending = False    # tag came from a scan and is waiting for a weight
+        self.Saving = False         # a bag is being saved to Supabase
         self.PrevScoutStatus = None
         self.PrevRangerStatus = None
         self.PrevQrStatus = None
         self.StatusCheckCounter = 0
         self.ScalePollId = None
-        self.StartScalePoll()
+        self.after(100, self.StartScalePoll)   # open the scale once the window is up
 
         try:
             self.protocol("WM_DELETE_WINDOW", self._on_close)
@@ -166,12 +173,13 @@ class WeighTrimApp(ctk.CTk):
             pass
 
     def LoadLists(self):
-        try:
-            crops = SubSupa.LoadCrops() or []
-            self.CmbCrop.configure(values=crops)
+        def show(crops):
+            self.CmbCrop.configure(values=crops or [])
             self.CmbCrop.set("Select")
-        except Exception as e:
-            self.SetStatus(f"LoadCrops failed: {e}")
+
+        TaskRunner.Run(self, SubSupa.LoadCrops, on_done=show,
+                       on_error=lambda e: self.SetStatus(f"LoadCrops failed: {e}"),
+                       disable=(self.BtnRefresh,))
         try:
             self.CmbStrain.configure(values=["Select"])
             self.CmbStrain.set("Select")
@@ -190,12 +198,13 @@ class WeighTrimApp(ctk.CTk):
         except Exception:
             self.SetStatus("Cannot parse Crop number")
             return
-        try:
-            strains = SubSupa.LoadStrains(crop_no) or ["Select"]
-            self.CmbStrain.configure(values=strains)
+        def show(strains):
+            self.CmbStrain.configure(values=strains or ["Select"])
             self.CmbStrain.set("Select")
-        except Exception as e:
-            self.SetStatus(f"LoadStrains failed: {e}")
+
+        TaskRunner.Run(self, SubSupa.LoadStrains, crop_no, on_done=show,
+                       on_error=lambda e: self.SetStatus(f"LoadStrains failed: {e}"),
+                       disable=(self.CmbStrain, self.BtnSave))
 
     def OnStrainChanged(self, value):
         try:
@@ -255,28 +264,33 @@ class WeighTrimApp(ctk.CTk):
             return
 
         # Get harvest date from database
-        try:
-            harvest_date = SubSupa.GetHarvestDate(crop_no)
+        def print_label(harvest_date):
             if not harvest_date:
                 messagebox.showwarning("No Harvest Date", "Cannot retrieve harvest date for this crop")
                 return
-        except Exception as e:
-            self.SetStatus(f"GetHarvestDate failed: {e}")
-            return
+            # Print label
+            try:
+                SubPrintLabels.PrintOneLabel(strain, label_type, harvest_date, metric_tag, int(weight))
+                self.SetStatus(f"Label printed for {strain} - {label_type} ({weight} g)")
+            except Exception as e:
+                self.SetStatus(f"Print failed: {e}")
 
-        # Print label
-        try:
-            SubPrintLabels.PrintOneLabel(strain, label_type, harvest_date, metric_tag, int(weight))
-            self.SetStatus(f"Label printed for {strain} - {label_type} ({weight} g)")
-        except Exception as e:
-            self.SetStatus(f"Print failed: {e}")
+        TaskRunner.Run(self, SubSupa.GetHarvestDate, crop_no, on_done=print_label,
+                       on_error=lambda e: self.SetStatus(f"GetHarvestDate failed: {e}"),
+                       disable=(self.BtnPrintLabel,))
 
     def OnSave(self):
+        if self.Saving:
+            return
+        self.ScanPending = False
         crop_display = (self.CmbCrop.get() or "").strip()
         strain = (self.CmbStrain.get() or "").strip()
         trim_type = (self.CmbType.get() or "").strip()
         metric_tag = (self.EntMetricTag.get() or "").strip()
-        wstr = (self.EntWeight.get() or "").strip()
+        if self.StableWeight is not None:
+            wstr = str(self.StableWeight)
+        else:
+            wstr = (self.EntWeight.get() or "").strip()
 
         if not crop_display or crop_display.lower().startswith("select"):
             messagebox.showwarning("Select Crop", "Please select a crop")
@@ -304,39 +318,61 @@ class WeighTrimApp(ctk.CTk):
             self.SetStatus("Cannot parse Crop number")
             return
 
-        # Check if tag exists in database
-        try:
-            check_result = SubSupa.CheckTrimBag(crop_no, strain, metric_tag)
-            
-            if check_result == "Error":
-                messagebox.showerror("Tag Mismatch", f"Metric tag {metric_tag} belongs to a different strain/crop. Cannot use this tag.")
+        # Check if tag exists in database, or in a bag saved here that the journal hasn't sent yet
+        def check():
+            pending = WriteJournal.Pending("InsertTrimBag", MetrcId=metric_tag)
+            if pending:
+                same = all(str(p.get("CropNo")) == str(crop_no) and p.get("Strain") == strain for p in pending)
+                return "InUse" if same else "Error"
+            return SubSupa.CheckTrimBag(crop_no, strain, metric_tag)
+
+        def failed(e):
+            if WriteJournal.Offline(e):
+                # Save it anyway; the journal checks the tag again when it syncs
+                self.SaveTrimBag(crop_no, strain, trim_type, metric_tag, weight, "OkToAdd")
                 return
-            elif check_result == "InUse":
-                resp = messagebox.askyesno("Tag In Use", f"Metric tag {metric_tag} already has data. Update weight to {weight} g?")
-                if not resp:
-                    self.SetStatus("Update cancelled")
-                    return
-                # Update existing bag using new signature
-                try:
-                    SubSupa.InsertTrimBag(crop_no, strain, trim_type, metric_tag, weight, datetime.now().isoformat())
-                    self.SetStatus(f"Updated tag {metric_tag} weight to {weight} g")
-                except Exception as e:
-                    self.SetStatus(f"Update failed: {e}")
-                    return
-            else:  # "OkToAdd"
-                # Insert new bag with new signature
-                try:
-                    SubSupa.InsertTrimBag(crop_no, strain, trim_type, metric_tag, weight, datetime.now().isoformat())
-                    self.SetStatus(f"Saved tag {metric_tag} for {strain} ({weight} g)")
-                except Exception as e:
-                    self.SetStatus(f"InsertTrimBag failed: {e}")
-                    return
-        except Exception as e:
+            self.Saving = False
             self.SetStatus(f"CheckTrimBag failed: {e}")
+
+        self.Saving = True
+        TaskRunner.Run(self, check,
+                       on_done=lambda check_result: self.SaveTrimBag(crop_no, strain, trim_type, metric_tag, weight, check_result),
+                       on_error=failed,
+                       disable=(self.BtnSave,))
+
+    def SaveTrimBag(self, crop_no, strain, trim_type, metric_tag, weight, check_result):
+        if check_result == "Error":
+            self.Saving = False
+            messagebox.showerror("Tag Mismatch", f"Metric tag {metric_tag} belongs to a different strain/crop. Cannot use this tag.")
             return
+        elif check_result == "InUse":
+            resp = messagebox.askyesno("Tag In Use", f"Metric tag {metric_tag} already has data. Update weight to {weight} g?")
+            if not resp:
+                self.Saving = False
+                self.SetStatus("Update cancelled")
+                return
+            # Update existing bag using new signature
+            done = f"Updated tag {metric_tag} weight to {weight} g"
+            fail = "Update failed"
+        else:  # "OkToAdd"
+            # Insert new bag with new signature
+            done = f"Saved tag {metric_tag} for {strain} ({weight} g)"
+            fail = "InsertTrimBag failed"
+
+        def saved(res):
+            self.Saving = False
+            self.SetStatus(done)
+            # Clear metric tag for next bag; this weight is used
+            self.EntMetricTag.delete(0, 'end')
+            self.StableWeight = None
+
+        def failed(e):
+            self.Saving = False
+            self.SetStatus(f"{fail}: {e}")
 
-        # Clear metric tag for next bag
-        self.EntMetricTag.delete(0, 'end')
+        TaskRunner.Run(self, WriteJournal.InsertTrimBag, crop_no, strain, trim_type, metric_tag, weight, datetime.now().isoformat(),
+                       on_done=saved, on_error=failed,
+                       disable=(self.BtnSave,))
 
     # ---------- Scale polling ----------
     def StartScalePoll(self, IntervalMs: int = 500):
@@ -345,21 +381,17 @@ class WeighTrimApp(ctk.CTk):
                 self.after_cancel(self.ScalePollId)
         except Exception:
             pass
+        SubReadQRCode.Connect()
+        ScoutConnected, RangerConnected = SubScale.GetScaleStatus()
+        if ScoutConnected or RangerConnected:
+            self.Reader = SubScale.StartReader(IntervalMs / 1000)
+            self.Reader.on_change(self, self._show_weight)
+            self.Reader.on_stable(self, self._on_stable_weight)
         self._poll_scale(IntervalMs)
 
-    def _poll_scale(self, IntervalMs: int = 500):
-        WStr = '0'
-        try:
-            ScoutConnected, RangerConnected
-            if RangerConnected:
-                W = SubScale.GetRangerWeight()
-                WStr = str(W)
-            elif ScoutConnected:
-                W = SubScale.GetScoutWeight()
-                WStr = str(W)
-        except Exception:
-            WStr = '0'
-
+    def _show_weight(self, W):
+        """Called on the Tk thread by SubScale.ScaleReader when the weight changes."""
+        WStr = '0' if W == 'Error' else str(W)
         if WStr != getattr(self, 'PrevScaleWeight', None):
             self.PrevScaleWeight = WStr
             try:
@@ -370,6 +402,18 @@ class WeighTrimApp(ctk.CTk):
             except Exception:
                 pass
 
+    def _on_stable_weight(self, W):
+        """Called on the Tk thread when the scale settles (W) or moves (None).
+
+        Saves the bag as soon as both a scanned tag and a stable weight exist.
+        """
+        self.StableWeight = W
+        if W is not None and self.ScanPending:
+            self.OnSave()
+
+    def _poll_scale(self, IntervalMs: int = 500):
+        # Weight display is driven by the background reader (see _show_weight);
+        # this loop checks the QR reader and refreshes the status indicators.
         # Check QR reader for metric tag
         try:
             if hasattr(SubReadQRCode, 'QrReader'):
@@ -379,6 +423,12 @@ class WeighTrimApp(ctk.CTk):
                     self.EntMetricTag.delete(0, 'end')
                     self.EntMetricTag.insert(0, qr_code)
                     self.SetStatus(f"Scanned metric tag: {qr_code}")
+                    # save automatically once the weight has settled
+                    self.ScanPending = True
+                    if self.StableWeight is not None:
+                        self.OnSave()
+                    else:
+                        self.SetStatus(f"Scanned metric tag: {qr_code}. Waiting for stable weight...")
         except Exception as e:
             # Silently ignore QR reader errors
             pass
@@ -432,6 +482,10 @@ class WeighTrimApp(ctk.CTk):
             self.ScalePollId = None
 
     def StopScalePoll(self):
+        try:
+            SubScale.StopReader()
+        except Exception:
+            pass
         try:
             if getattr(self, 'ScalePollId', None):
                 self.after_cancel(self.ScalePollId)
@@ -0,0 +1,159 @@
+"""Payroll.Pay() and TrimPay.WeekPay() against the pay TrimmerSummary showed
+before it read dailytrim_rollup: build_pay_aggregates, the lunch loop of
+load_data (hours_between per session) and insert_pay_table's sums.
+
+Run from the scale folder:  python -m pytest -q tests
+"""
+import os
+import sys
+from datetime import date, datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # this is the "scale" folder
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+import Common.FakeSupa as FakeSupa
+import Common.Payroll as Payroll
+import Common.TrimPay as TrimPay
+
+START = date(2026, 6, 1)        # a Monday; the sessions cover two weeks
+END = date(2026, 6, 14)
+
+RATES = {
+    (19, "Gelato"): 0.3,
+    (19, "Runtz"): 0.2,
+    (20, "Gelato"): 0.45,
+    # (20, "OG Kush") has no rate: paid 0
+}
+
+
+def Session(day, trimmer, crop, strain, ampm, start, end, flower, smalls=0.0):
+    return {"TrimDate": f"2026-06-{day:02d}", "TrimmerName": trimmer, "CropNo": crop, "Strain": strain,
+            "AmPm": ampm, "StartTime": start, "EndTime": end, "FlowerGrams": flower, "SmallsGrams": smalls}
+
+
+SESSIONS = [
+    # Alex, June 1: 3 + 3 hours, exactly LUNCH_HOURS; each line is 10.004 before rounding
+    Session(1, "Alex", 19, "Gelato", "AM", "08:00:00", "11:00:00", 33.348),
+    Session(1, "Alex", 19, "Runtz", "PM", "12:00:00", "15:00", 50.022),
+    Session(2, "Alex", 20, "Gelato", "AM", "08:00", "13:59:24", 22.231111),        # 5.99 hours: no lunch
+    Session(3, "Alex", 20, "OG Kush", "AM", "07:00:00", "14:00:00", 812.5, 40.0),  # no rate
+    # Bailey, June 1 and 2: 3.5 hours a day, no lunch of their own; with Alex's, "All" gets one on June 2
+    Session(1, "Bailey", 19, "Gelato", "AM", "08:00:00", "11:30:00", 100.0),
+    Session(2, "Bailey", 19, "Gelato", "AM", "08:00:00", "11:30:00", 101.11),
+    Session(2, "Bailey", 19, "Gelato", "PM", "12:00:00", "12:20:00", 3.33),       # 0.33 hours, rounded per session
+    # second week: a session without times counts no hours
+    Session(8, "Alex", 19, "Gelato", "AM", None, None, 250.0),
+    Session(9, "Casey", 19, "Runtz", "AM", "06:00:00", "12:00:00", 400.05),
+    Session(9, "Casey", 19, "Runtz", "PM", "13:00:00", "12:00:00", 1.0),          # ends before it starts: 0 hours
+]
+
+
+#################################################################################################
+#
+# The screen before the rollup (TrimmerSummary at the baseline)
+#
+#################################################################################################
+
+def hours_between(start_pg, end_pg):
+    """Return hours (float) between start and end DB times. Returns 0.0 if invalid."""
+    if not start_pg or not end_pg:
+        return 0.0
+    try:
+        s = datetime.strptime(start_pg, "%H:%M:%S")
+    except Exception:
+        try:
+            s = datetime.strptime(start_pg, "%H:%M")
+        except Exception:
+            return 0.0
+    try:
+        e = datetime.strptime(end_pg, "%H:%M:%S")
+    except Exception:
+        try:
+            e = datetime.strptime(end_pg, "%H:%M")
+        except Exception:
+            return 0.0
+    total_seconds = max((e - s).total_seconds(), 0.0)
+    return round(total_seconds / 3600.0, 2)
+
+
+def BaselinePay(sessions, rates_map):
+    """(flower pay, lunch count, total pay) for the sessions of one week, as the screen summed them."""
+    bigs = {}
+    for r in sessions:
+        key = (int(r.get("CropNo") or 0), (r.get("Strain") or "").strip())
+        bigs[key] = bigs.get(key, 0.0) + float(r.get("FlowerGrams") or 0)
+    lunch_count = 0
+    for day in sorted({r["TrimDate"] for r in sessions}):
+        day_total_hours = sum(hours_between(r.get("StartTime"), r.get("EndTime"))
+                              for r in sessions if r["TrimDate"].startswith(day))
+        if day_total_hours >= 6.0:
+            lunch_count += 1
+    flower_pay = 0.0
+    for key, grams in sorted(bigs.items()):
+        flower_pay += round(grams * float(rates_map.get(key, 0.0)), 2)
+    return flower_pay, lunch_count, flower_pay + round(lunch_count * 20.0, 2)
+
+
+#################################################################################################
+#
+# Helpers
+#
+#################################################################################################
+
+def Rollup(sessions):
+    """The dailytrim_rollup rows of the sessions (FakeSupa groups them as the SQL view does)."""
+    return list(FakeSupa._TrimGroups(sessions).values())
+
+
+def Week(rows, week_start, trimmer=None):
+    return [r for r in rows
+            if 0 <= (date.fromisoformat(r["TrimDate"][:10]) - week_start).days < 7
+            and (trimmer is None or r["TrimmerName"] == trimmer)]
+
+
+WEEKS = [(date(2026, 6, 1), "Alex"), (date(2026, 6, 1), "Bailey"), (date(2026, 6, 8), "Alex"),
+         (date(2026, 6, 8), "Casey"), (date(2026, 6, 1), None), (date(2026, 6, 8), None)]
+
+
+#################################################################################################
+#
+# Tests
+#
+#################################################################################################
+
+def test_week_pay_matches_the_baseline_screen():
+    rollup = Rollup(SESSIONS)
+    for week_start, trimmer in WEEKS:
+        flower_pay, lunches, gross = BaselinePay(Week(SESSIONS, week_start, trimmer), RATES)
+        pay = TrimPay.WeekPay(Week(rollup, week_start, trimmer), RATES)
+        assert pay["LunchCount"] == lunches, (week_start, trimmer)
+        assert abs(pay["FlowerPay"] - flower_pay) < 0.001, (week_start, trimmer)
+        assert abs(pay["GrossPay"] - gross) < 0.001, (week_start, trimmer)
+
+
+def test_payroll_matches_week_pay_per_trimmer_and_for_all():
+    rollup = Rollup(SESSIONS)
+    cols = Payroll.Columns(rollup)
+    lines = {(p["PeriodStart"], p["TrimmerName"]): p for p in Payroll.Pay(cols, RATES, START, END, 7)}
+    everyone = dict(cols, TrimmerName=Payroll.np.full(len(rollup), Payroll.ALL))
+    lines.update({(p["PeriodStart"], p["TrimmerName"]): p for p in Payroll.Pay(everyone, RATES, START, END, 7)})
+    assert len(lines) == len(WEEKS)
+    for week_start, trimmer in WEEKS:
+        p = lines[(week_start.isoformat(), trimmer or Payroll.ALL)]
+        pay = TrimPay.WeekPay(Week(rollup, week_start, trimmer), RATES)
+        assert p["LunchCredits"] == pay["LunchCount"], (week_start, trimmer)
+        assert abs(p["FlowerPay"] - pay["FlowerPay"]) < 0.001, (week_start, trimmer)
+        assert abs(p["GrossPay"] - pay["GrossPay"]) < 0.001, (week_start, trimmer)
+    assert Payroll.Check(rollup, RATES, START, END) == 0
+
+
+def test_fixture_edges():
+    """The cases above are the ones they claim to be."""
+    rollup = Rollup(SESSIONS)
+    alex = TrimPay.WeekPay(Week(rollup, START, "Alex"), RATES)
+    # each line rounded to the cent: 10.00 + 10.00, not 20.01
+    assert [line[4] for line in alex["Lines"][:2]] == [10.0, 10.0]
+    assert alex["Lines"][3][2:] == (0.0, 812.5, 0.0)             # OG Kush, no rate
+    assert alex["LunchCount"] == 2                               # June 1 at 6.00 hours and June 3, not June 2 at 5.99
+    assert TrimPay.WeekPay(Week(rollup, START, "Bailey"), RATES)["LunchCount"] == 0
+    assert TrimPay.WeekPay(Week(rollup, START), RATES)["LunchCount"] == 3    # June 2 through Alex and Bailey together